@@ -2,6 +2,7 @@
 Data Collector - Fetch and aggregate data from all sources
 """
 
+import asyncio
 from typing import Dict, Any, Optional
 from services.digitransit import DigitransitService
 from services.osm import OSMService
@@ -18,6 +19,13 @@ class DataCollector:
         self.statfin = StatFinService()
         self.population_grid = PopulationGridService()
 
+    async def aclose(self):
+        """Close the pooled HTTP clients held by the underlying services"""
+        await self.geocoder.aclose()
+        await self.osm.aclose()
+        await self.statfin.aclose()
+        await self.population_grid.aclose()
+
     async def collect_site_data(
         self,
         address: str,
@@ -38,29 +46,27 @@ class DataCollector:
         postal_code = geocode_result.get("postal_code")
 
         # Step 2: Collect data in parallel
-        import asyncio
-
         demographics_task = self.statfin.get_demographics_by_postal_code(postal_code) if postal_code else None
         population_task = self.population_grid.get_population_in_area(lat, lng, radius_km=1.0)
-        competitors_task = self.osm.get_competitors(lat, lng, radius_m=1000, concept=concept)
-        transit_task = self.osm.get_transit_stops(lat, lng, radius_m=500)
-        walkability_task = self.osm.get_walkability_pois(lat, lng, radius_m=500)
+        # Competitors, transit and walkability share one Overpass request
+        osm_task = self.osm.get_location_bundle(
+            lat, lng, concept=concept, comp_radius=1000, transit_radius=500, walk_radius=500
+        )
 
         tasks = [
             demographics_task if demographics_task else asyncio.sleep(0),
             population_task,
-            competitors_task,
-            transit_task,
-            walkability_task
+            osm_task
         ]
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         demographics = results[0] if not isinstance(results[0], Exception) else None
         population_data = results[1] if not isinstance(results[1], Exception) else {}
-        competitors = results[2] if not isinstance(results[2], Exception) else []
-        transit = results[3] if not isinstance(results[3], Exception) else {}
-        walkability_poi_count = results[4] if not isinstance(results[4], Exception) else 0
+        osm_bundle = results[2] if not isinstance(results[2], Exception) else {}
+        competitors = osm_bundle.get("competitors", [])
+        transit = osm_bundle.get("transit", {})
+        walkability_poi_count = osm_bundle.get("walkability_poi_count", 0)
 
         # Step 3: Aggregate features
         features = {
@@ -123,25 +129,22 @@ class DataCollector:
         postal_code = None  # Could reverse geocode if needed
 
         # Collect data (similar to site data)
-        import asyncio
-
         population_task = self.population_grid.get_population_in_area(lat, lng, radius_km=1.0)
-        competitors_task = self.osm.get_competitors(lat, lng, radius_m=1000, concept=concept)
-        transit_task = self.osm.get_transit_stops(lat, lng, radius_m=500)
-        walkability_task = self.osm.get_walkability_pois(lat, lng, radius_m=500)
+        osm_task = self.osm.get_location_bundle(
+            lat, lng, concept=concept, comp_radius=1000, transit_radius=500, walk_radius=500
+        )
 
         results = await asyncio.gather(
             population_task,
-            competitors_task,
-            transit_task,
-            walkability_task,
+            osm_task,
             return_exceptions=True
         )
 
         population_data = results[0] if not isinstance(results[0], Exception) else {}
-        competitors = results[1] if not isinstance(results[1], Exception) else []
-        transit = results[2] if not isinstance(results[2], Exception) else {}
-        walkability_poi_count = results[3] if not isinstance(results[3], Exception) else 0
+        osm_bundle = results[1] if not isinstance(results[1], Exception) else {}
+        competitors = osm_bundle.get("competitors", [])
+        transit = osm_bundle.get("transit", {})
+        walkability_poi_count = osm_bundle.get("walkability_poi_count", 0)
 
         # Estimate demographics (for MVP, use mock data)
         median_income = self._estimate_income_for_area(area_name)
@@ -4,6 +4,7 @@ NOW USES DATABASE CONCEPTS - parameters improve with outcome learning
 """
 
 from typing import Dict, Any, Optional
+from uuid import UUID
 import yaml
 import os
 from sqlalchemy.orm import Session
@@ -53,7 +54,7 @@ class ScoringEngine:
         self,
         features: Dict[str, Any],
         concept: str,
-        concept_id: Optional[str] = None
+        concept_id: Optional[UUID] = None
     ) -> Dict[str, Any]:
         """
         Calculate overall score and revenue prediction
@@ -159,12 +160,12 @@ class ScoringEngine:
     def _get_concept_config(
         self, 
         concept_category: str, 
-        concept_id: Optional[str] = None
-    ) -> tuple[Optional[Dict[str, Any]], Optional[str]]:
+        concept_id: Optional[UUID] = None
+    ) -> tuple[Optional[Dict[str, Any]], Optional[UUID]]:
         """
         Get concept configuration - tries DB first, falls back to YAML
         
-        Returns: (config_dict, concept_id or None)
+        Returns: (config_dict, DB concept UUID or None for YAML configs)
         """
         # Try database first
         if self.db_session:
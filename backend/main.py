@@ -5,10 +5,19 @@ Main FastAPI application with smart routing
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, func, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
+import asyncio
+import functools
+import math
 import re
 import os
+import time
+import queue
+import logging
+import logging.handlers
 from dotenv import load_dotenv
 
 from models.schemas import (
@@ -16,6 +25,7 @@ from models.schemas import (
     UniversalSearchResponse,
     DiscoveryRequest,
     DiscoveryResponse,
+    HeatmapData,
     AreaOpportunity,
     SiteAnalysisRequest,
     SiteAnalysisResponse,
@@ -25,7 +35,8 @@ from models.schemas import (
     OutcomeResponse,
     AccuracyStats
 )
-from models.db_init import init_db, get_db
+from models.db_init import init_db, get_async_db
+from models.database import Prediction, Outcome
 from agents.data_collector import DataCollector
 from agents.scorer import ScoringEngine
 # from agents.agno.orchestrator import OrchestratorAgent  # Phase 2 - Agno agents
@@ -33,7 +44,8 @@ from services.digitransit import DigitransitService
 from services.trust_metrics import TrustMetrics
 
 # NEW: Import routers
-from routes.recommend import router as recommend_router
+from routes.recommend import router as recommend_router, address_generator
+from services.job_manager import job_manager
 from routes.concepts import router as concepts_router
 
 # Load environment variables
@@ -42,24 +54,68 @@ load_dotenv()
 app = FastAPI(
     title="Spotlight API",
     description="Evidence-based site selection for Finland",
-    version="2.0.0"  # Bumped for new recommend flow
+    version="2.0.0",  # Bumped for new recommend flow
+    default_response_class=ORJSONResponse  # orjson: faster, native datetime/UUID
 )
 
 # Include routers
 app.include_router(recommend_router)
 app.include_router(concepts_router)
 
+# Logging: handlers write to a queue drained by a listener thread, so
+# log calls from async handlers never block on stream I/O
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
+    _log_listener.start()
     print("🚀 Starting Spotlight API...")
-    init_db()
+    await init_db()
     print("✓ Database initialized")
+    job_manager.start_cleanup_task()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await address_generator.aclose()
+    await geocoding_service.aclose()
+    await data_collector.aclose()
+    await job_manager.aclose()
+    _log_listener.stop()
 
 # CORS
-origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3002").split(",")
+origins = frozenset(
+    o.strip()
+    for o in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3002").split(",")
+    if o.strip()
+)
+
+
+class SetCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware with O(1) origin lookups (runs on every request and preflight)"""
+
+    def __init__(self, app, allow_origins=(), **kwargs):
+        super().__init__(app, allow_origins=allow_origins, **kwargs)
+        self._allowed_set = frozenset(allow_origins)
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        if self.allow_all_origins:
+            return True
+        if self.allow_origin_regex is not None and self.allow_origin_regex.fullmatch(origin):
+            return True
+        return origin in self._allowed_set
+
+
 app.add_middleware(
-    CORSMiddleware,
+    SetCORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
@@ -72,6 +128,9 @@ scorer = ScoringEngine()  # Legacy scorer for /api/discover
 # orchestrator = OrchestratorAgent()  # Phase 2: Agno orchestrator for /api/analyze
 geocoding_service = DigitransitService()
 
+# Caps concurrent orchestrator (LLM) fan-out; size to the provider's rate budget
+_LLM_SEM = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "5")))
+
 
 # ============= Health Check =============
 
@@ -159,17 +218,15 @@ def _detect_search_type(query: str) -> str:
     return "city"
 
 
+# Semicolons are treated as newlines so addresses split in a single pass
+_SEMI_TO_NL = str.maketrans({";": "\n"})
+
+
 def _extract_addresses(query: str) -> List[str]:
     """Extract multiple addresses from query"""
     # Split by newline or semicolon
-    if "\n" in query:
-        addresses = [addr.strip() for addr in query.split("\n") if addr.strip()]
-    elif ";" in query:
-        addresses = [addr.strip() for addr in query.split(";") if addr.strip()]
-    else:
-        addresses = [query.strip()]
-
-    return addresses
+    parts = query.translate(_SEMI_TO_NL).split("\n")
+    return [addr.strip() for addr in parts if addr.strip()]
 
 
 # ============= Discovery Endpoint =============
@@ -238,17 +295,17 @@ async def _analyze_postal_area(postal_code: str, concept: str) -> DiscoveryRespo
         estimated_rent_psqft=0,  # Unknown for postal code search
         available_properties_count=0,
         confidence=confidence,
-        coverage=coverage
+        coverage=coverage.to_schema()
     )
     
     # Create heatmap with single point
-    heatmap_data = [{
-        "latitude": lat,
-        "longitude": lng,
-        "score": score_result["score"],
-        "weight": score_result["score"] / 100,
-        "confidence": confidence
-    }]
+    heatmap_data = HeatmapData.model_construct(
+        latitudes=[lat],
+        longitudes=[lng],
+        scores=[score_result["score"]],
+        weights=[score_result["score"] / 100],
+        confidences=[confidence]
+    )
     
     # Generate method info
     method_info = TrustMetrics.get_method_info(
@@ -328,7 +385,7 @@ async def discover_opportunities(request: DiscoveryRequest):
                 "estimated_rent_psqft": area.get("rent_psqft", 40),
                 "available_properties_count": area.get("properties_count", 0),
                 "confidence": confidence,
-                "coverage": coverage
+                "coverage": coverage.to_schema()
             })
         except Exception as e:
             print(f"Error scoring area {area['name']}: {e}")
@@ -343,16 +400,13 @@ async def discover_opportunities(request: DiscoveryRequest):
     ]
 
     # Heatmap data (all scored areas)
-    heatmap_data = [
-        {
-            "latitude": area["latitude"],
-            "longitude": area["longitude"],
-            "score": area["score"],
-            "weight": area["score"] / 100,  # Normalize for heatmap
-            "confidence": area["confidence"]
-        }
-        for area in scored_areas
-    ]
+    heatmap_data = HeatmapData.model_construct(
+        latitudes=[area["latitude"] for area in scored_areas],
+        longitudes=[area["longitude"] for area in scored_areas],
+        scores=[area["score"] for area in scored_areas],
+        weights=[area["score"] / 100 for area in scored_areas],  # Normalize for heatmap
+        confidences=[area["confidence"] for area in scored_areas]
+    )
     
     # Generate method info
     method_info = TrustMetrics.get_method_info(
@@ -370,9 +424,10 @@ async def discover_opportunities(request: DiscoveryRequest):
     )
 
 
+@functools.lru_cache(maxsize=1)
 def _get_helsinki_areas() -> List[Dict[str, Any]]:
     """
-    Pre-defined Helsinki areas for MVP
+    Pre-defined Helsinki areas for MVP (built once; callers must not mutate)
     In production, generate grid dynamically
     """
     return [
@@ -465,6 +520,14 @@ async def get_area_detail(
         features_used=features
     )
     
+    # Nearest competitor without materializing a list; missing distances don't count
+    nearest_competitor = min(
+        (c.get("distance_m", math.inf) for c in features.get("competitors") or []),
+        default=None
+    )
+    if nearest_competitor == math.inf:
+        nearest_competitor = None
+
     from models.schemas import AreaDetailResponse, AvailableProperty
     
     return AreaDetailResponse(
@@ -476,7 +539,7 @@ async def get_area_detail(
         predicted_revenue_mid=score_result["revenue_mid"],
         predicted_revenue_high=score_result["revenue_high"],
         confidence=confidence,
-        coverage=coverage,
+        coverage=coverage.to_schema(),
         method=method_info,
         available_properties=[],  # Would fetch from property API
         why=why_bullets,
@@ -489,10 +552,7 @@ async def get_area_detail(
         competition_analysis={
             "competitors_count": features.get("competitors_count"),
             "competitors_per_1k_residents": features.get("competitors_per_1k_residents"),
-            "nearest_competitor_distance": min(
-                [c.get("distance", 9999) for c in features.get("competitors", [])],
-                default=None
-            )
+            "nearest_competitor_distance": nearest_competitor,
         },
         traffic_access={
             "nearest_metro_distance_m": features.get("nearest_metro_distance_m"),
@@ -523,19 +583,51 @@ async def analyze_sites(request: SiteAnalysisRequest):
     if len(request.addresses) > 10:
         raise HTTPException(status_code=400, detail="Maximum 10 addresses allowed")
 
-    predictions = []
+    # TaskGroup cancels the remaining analyses as soon as one fails, so they
+    # stop holding LLM slots for a response that is already an error
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_analyze_one(address, request.concept)) for address in request.addresses]
+    except* HTTPException as group:
+        raise group.exceptions[0]
+    predictions = [task.result() for task in tasks]
+
+    # Rank predictions if multiple sites
+    ranking = None
+    if len(predictions) > 1:
+        sorted_predictions = sorted(enumerate(predictions), key=lambda x: x[1].score, reverse=True)
+        ranking = [idx for idx, _ in sorted_predictions]
+
+        # Add rank to each prediction (models are frozen, so copy with the rank set)
+        for rank, (original_idx, _) in enumerate(sorted_predictions):
+            predictions[original_idx] = predictions[original_idx].model_copy(update={"rank": rank + 1})
+
+    # Check for cannibalization
+    cannibalization_warning = _check_cannibalization(predictions)
+
+    return SiteAnalysisResponse(
+        concept=request.concept,
+        sites=predictions,
+        ranking=ranking,
+        cannibalization_warning=cannibalization_warning,
+        prediction_id=f"pred_{hash(str(predictions))}"  # Simple ID for MVP
+    )
 
-    for address in request.addresses:
-        try:
-            print(f"\n🔍 Analyzing: {address}")
 
-            # Collect raw data from all sources
-            features = await data_collector.collect_site_data(address, request.concept)
+async def _analyze_one(address: str, concept: str) -> SitePrediction:
+    """Collect data for one address and run it through the orchestrator"""
+    try:
+        print(f"\n🔍 Analyzing: {address}")
 
-            # NEW: Use Agno Orchestrator for reasoning-based analysis
+        # Collect raw data from all sources
+        features = await data_collector.collect_site_data(address, concept)
+
+        # NEW: Use Agno Orchestrator for reasoning-based analysis
+        # Data collection above stays unthrottled; only the LLM fan-out is bounded
+        async with _LLM_SEM:
             analysis = await orchestrator.analyze_site(
                 address=address,
-                concept=request.concept,
+                concept=concept,
                 raw_data={
                     "postal_code": features.get("postal_code"),
                     "demographics": {
@@ -563,80 +655,59 @@ async def analyze_sites(request: SiteAnalysisRequest):
                 }
             )
 
-            # Extract revenue prediction
-            revenue = analysis["revenue_analysis"]
-
-            # Map orchestrator results to SitePrediction schema
-            prediction = SitePrediction(
-                address=address,
-                latitude=analysis["geo_analysis"]["latitude"],
-                longitude=analysis["geo_analysis"]["longitude"],
-                postal_code=analysis["geo_analysis"].get("postal_code"),
-                score=analysis["opportunity_score"],
-                predicted_revenue_low=revenue["revenue_range"]["pessimistic"],
-                predicted_revenue_mid=revenue["revenue_range"]["realistic"],
-                predicted_revenue_high=revenue["revenue_range"]["optimistic"],
-                confidence=analysis["confidence"],
-                recommendation=analysis["recommendation"],
-                strengths=analysis["key_strengths"],
-                risks=analysis["key_concerns"],
-                features=SiteFeatures(
-                    population_1km=features.get("population_1km"),
-                    population_density=features.get("population_density"),
-                    median_income=features.get("median_income"),
-                    age_18_24_percent=features.get("age_18_24_percent"),
-                    competitors_count=features.get("competitors_count"),
-                    competitors_per_1k_residents=features.get("competitors_per_1k_residents"),
-                    nearest_metro_distance_m=features.get("nearest_metro_distance_m"),
-                    nearest_tram_distance_m=features.get("nearest_tram_distance_m"),
-                    walkability_score=features.get("walkability_poi_count"),
-                    # NEW: Agent-based scores
-                    population_score=analysis["demographic_analysis"]["demographic_score"],
-                    income_score=analysis["demographic_analysis"]["demographic_score"],  # Using demo score
-                    access_score=analysis["transit_analysis"]["transit_score"],
-                    competition_score=analysis["competition_analysis"]["competition_score"],
-                    walkability_score_component=analysis["transit_analysis"]["walkability_score"]
-                ),
-                # NEW: Include reasoning traces for transparency
-                reasoning_summary=analysis["executive_summary"],
-                agent_reasoning={
-                    "geo": analysis["reasoning_traces"].get("geo"),
-                    "demographics": analysis["reasoning_traces"].get("demographics"),
-                    "competition": analysis["reasoning_traces"].get("competition"),
-                    "transit": analysis["reasoning_traces"].get("transit"),
-                    "risk": analysis["reasoning_traces"].get("risk"),
-                    "revenue": analysis["reasoning_traces"].get("revenue"),
-                }
-            )
-
-            predictions.append(prediction)
-
-        except Exception as e:
-            import traceback
-            print(f"❌ Error analyzing {address}:")
-            print(traceback.format_exc())
-            raise HTTPException(status_code=500, detail=f"Error analyzing address: {str(e)}")
+        # Extract revenue prediction
+        revenue = analysis["revenue_analysis"]
+
+        # Map orchestrator results to SitePrediction schema
+        prediction = SitePrediction.trusted(
+            address=address,
+            latitude=analysis["geo_analysis"]["latitude"],
+            longitude=analysis["geo_analysis"]["longitude"],
+            postal_code=analysis["geo_analysis"].get("postal_code"),
+            score=analysis["opportunity_score"],
+            predicted_revenue_low=revenue["revenue_range"]["pessimistic"],
+            predicted_revenue_mid=revenue["revenue_range"]["realistic"],
+            predicted_revenue_high=revenue["revenue_range"]["optimistic"],
+            confidence=analysis["confidence"],
+            recommendation=analysis["recommendation"],
+            strengths=analysis["key_strengths"],
+            risks=analysis["key_concerns"],
+            features=SiteFeatures.trusted(
+                population_1km=features.get("population_1km"),
+                population_density=features.get("population_density"),
+                median_income=features.get("median_income"),
+                age_18_24_percent=features.get("age_18_24_percent"),
+                competitors_count=features.get("competitors_count"),
+                competitors_per_1k_residents=features.get("competitors_per_1k_residents"),
+                nearest_metro_distance_m=features.get("nearest_metro_distance_m"),
+                nearest_tram_distance_m=features.get("nearest_tram_distance_m"),
+                walkability_score=features.get("walkability_poi_count"),
+                # NEW: Agent-based scores
+                population_score=analysis["demographic_analysis"]["demographic_score"],
+                income_score=analysis["demographic_analysis"]["demographic_score"],  # Using demo score
+                access_score=analysis["transit_analysis"]["transit_score"],
+                competition_score=analysis["competition_analysis"]["competition_score"],
+                walkability_score_component=analysis["transit_analysis"]["walkability_score"]
+            ),
+            # NEW: Include reasoning traces for transparency
+            reasoning_summary=analysis["executive_summary"],
+            agent_reasoning={
+                "geo": analysis["reasoning_traces"].get("geo"),
+                "demographics": analysis["reasoning_traces"].get("demographics"),
+                "competition": analysis["reasoning_traces"].get("competition"),
+                "transit": analysis["reasoning_traces"].get("transit"),
+                "risk": analysis["reasoning_traces"].get("risk"),
+                "revenue": analysis["reasoning_traces"].get("revenue"),
+            }
+        )
 
-    # Rank predictions if multiple sites
-    ranking = None
-    if len(predictions) > 1:
-        sorted_predictions = sorted(enumerate(predictions), key=lambda x: x[1].score, reverse=True)
-        ranking = [idx for idx, _ in sorted_predictions]
+        return prediction
 
-        # Add rank to each prediction
-        for rank, (original_idx, _) in enumerate(sorted_predictions):
-            predictions[original_idx].rank = rank + 1
-
-    # Check for cannibalization
-    cannibalization_warning = _check_cannibalization(predictions)
-
-    return SiteAnalysisResponse(
-        concept=request.concept,
-        sites=predictions,
-        ranking=ranking,
-        cannibalization_warning=cannibalization_warning,
-        prediction_id=f"pred_{hash(str(predictions))}"  # Simple ID for MVP
-    )
+    except Exception as e:
+        import traceback
+        print(f"❌ Error analyzing {address}:")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error analyzing address: {str(e)}")
 
 
 def _generate_insights(features: Dict[str, Any], score_result: Dict[str, Any], concept: str) -> tuple[List[str], List[str]]:
@@ -678,26 +749,26 @@ def _generate_insights(features: Dict[str, Any], score_result: Dict[str, Any], c
     return strengths[:5], risks[:5]  # Limit to top 5 each
 
 
+def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Haversine distance in km between two points"""
+    R = 6371
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return R * c
+
+
 def _check_cannibalization(predictions: List[SitePrediction]) -> str:
     """Check if any sites are too close together"""
 
     if len(predictions) < 2:
         return None
 
-    from math import radians, sin, cos, sqrt, atan2
-
-    def distance_km(lat1, lng1, lat2, lng2):
-        R = 6371
-        dlat = radians(lat2 - lat1)
-        dlng = radians(lng2 - lng1)
-        a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
-        return R * c
-
     warnings = []
     for i in range(len(predictions)):
         for j in range(i + 1, len(predictions)):
-            dist = distance_km(
+            dist = _distance_km(
                 predictions[i].latitude, predictions[i].longitude,
                 predictions[j].latitude, predictions[j].longitude
             )
@@ -709,10 +780,21 @@ def _check_cannibalization(predictions: List[SitePrediction]) -> str:
 
 # ============= Outcome Tracking =============
 
+# Hot-path statements built once at import; SQLAlchemy reuses their compiled form
+STMT_PREDICTION_BY_ID = select(Prediction).where(Prediction.id == bindparam("pid"))
+STMT_OUTCOME_ID_BY_PREDICTION = select(Outcome.id).where(Outcome.prediction_id == bindparam("pid"))
+STMT_PREDICTIONS_COUNT = select(func.count()).select_from(Prediction)
+STMT_OUTCOME_ACCURACY = select(
+    func.count(),
+    func.count().filter(Outcome.within_predicted_band),
+    func.avg(Outcome.variance_percent)
+).select_from(Outcome)
+
+
 @app.post("/api/outcomes", response_model=OutcomeResponse)
 async def submit_outcome(
     outcome: OutcomeSubmission,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Submit actual revenue after opening
@@ -723,20 +805,18 @@ async def submit_outcome(
     - Updates base_revenue, weights, uncertainty bands
     """
     from services.concept_learner import ConceptLearner
-    from models.database import Prediction, Outcome
     
     # Get prediction
-    prediction = db.query(Prediction).filter(
-        Prediction.id == int(outcome.prediction_id.replace("pred_", ""))
-    ).first()
+    prediction = await db.scalar(
+        STMT_PREDICTION_BY_ID,
+        {"pid": int(outcome.prediction_id.replace("pred_", ""))}
+    )
     
     if not prediction:
         raise HTTPException(status_code=404, detail=f"Prediction {outcome.prediction_id} not found")
     
     # Check if outcome already exists
-    existing_outcome = db.query(Outcome).filter(
-        Outcome.prediction_id == prediction.id
-    ).first()
+    existing_outcome = await db.scalar(STMT_OUTCOME_ID_BY_PREDICTION, {"pid": prediction.id})
     
     if existing_outcome:
         raise HTTPException(
@@ -754,20 +834,22 @@ async def submit_outcome(
         actual_revenue=outcome.actual_revenue,
         opening_date=outcome.opening_date,
         variance_percent=variance_percent,
-        within_predicted_band="yes" if within_band else "no",
+        within_predicted_band=within_band,
         notes=outcome.notes
     )
     db.add(new_outcome)
-    db.commit()
+    await db.commit()
     
     # LEARNING: If prediction has concept_id, trigger concept learning
+    # ConceptLearner is sync ORM code, so run it on the session's sync facade
     learning_result = None
     if prediction.concept_id:
-        learner = ConceptLearner(db)
-        learning_result = learner.record_outcome(
-            prediction_id=prediction.id,
-            actual_revenue=outcome.actual_revenue,
-            opened_at=outcome.opening_date
+        learning_result = await db.run_sync(
+            lambda sync_db: ConceptLearner(sync_db).record_outcome(
+                prediction_id=prediction.id,
+                actual_revenue=outcome.actual_revenue,
+                opened_at=outcome.opening_date
+            )
         )
     
     # Prepare response message
@@ -788,22 +870,40 @@ async def submit_outcome(
     )
 
 
+# Accuracy aggregate is recomputed at most once per TTL window
+ACCURACY_CACHE_TTL_SECONDS = 60
+_accuracy_cache: Dict[str, Any] = {"stats": None, "expires_at": 0.0}
+
+
 @app.get("/api/accuracy", response_model=AccuracyStats)
-async def get_accuracy_stats():
+async def get_accuracy_stats(db: AsyncSession = Depends(get_async_db)):
     """
     Get model accuracy statistics
+    
+    Single aggregate scan over outcomes, cached for ACCURACY_CACHE_TTL_SECONDS
     """
-    # In production, calculate from database
-    # For MVP, return mock data
-
-    return AccuracyStats(
-        total_predictions=42,
-        sites_opened=18,
-        within_predicted_band=15,
-        accuracy_rate=0.83,
-        avg_variance_percent=-3.2
+    now = time.monotonic()
+    if _accuracy_cache["stats"] is not None and now < _accuracy_cache["expires_at"]:
+        return _accuracy_cache["stats"]
+
+    total_predictions = await db.scalar(STMT_PREDICTIONS_COUNT)
+    sites_opened, within_band, avg_variance = (await db.execute(STMT_OUTCOME_ACCURACY)).one()
+
+    sites_opened = sites_opened or 0
+    within_band = int(within_band or 0)
+
+    stats = AccuracyStats.model_construct(
+        total_predictions=total_predictions or 0,
+        sites_opened=sites_opened,
+        within_predicted_band=within_band,
+        accuracy_rate=round(within_band / sites_opened, 2) if sites_opened else 0.0,
+        avg_variance_percent=round(float(avg_variance or 0.0), 2)
     )
 
+    _accuracy_cache["stats"] = stats
+    _accuracy_cache["expires_at"] = now + ACCURACY_CACHE_TTL_SECONDS
+    return stats
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,96 @@
+"""
+Store customer and concept ids as Uuid
+
+customers.id, concepts.id and the FKs pointing at them were VARCHARs holding
+hyphenated str(uuid4()) values. The models now use SQLAlchemy's Uuid type:
+native UUID on Postgres, 32-char hex on SQLite. Without this rewrite every
+existing id stops matching lookups and joins.
+
+Revision ID: 0001_uuid_ids
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_uuid_ids"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+UUID_COLUMNS = (
+    ("customers", "id"),
+    ("concepts", "id"),
+    ("concepts", "customer_id"),
+    ("predictions", "concept_id"),
+    ("concept_training_outcomes", "concept_id"),
+)
+
+# (table, column, referred table, referred column)
+FOREIGN_KEYS = (
+    ("concepts", "customer_id", "customers", "id"),
+    ("predictions", "concept_id", "concepts", "id"),
+    ("concept_training_outcomes", "concept_id", "concepts", "id"),
+)
+
+
+def _has_tables(bind) -> bool:
+    """Fresh databases are built by init_db() with the new types already"""
+    inspector = sa.inspect(bind)
+    return all(inspector.has_table(table) for table, _ in UUID_COLUMNS)
+
+
+def _drop_foreign_keys(bind) -> None:
+    inspector = sa.inspect(bind)
+    for table, column, referred_table, _ in FOREIGN_KEYS:
+        for fk in inspector.get_foreign_keys(table):
+            if fk["constrained_columns"] == [column] and fk["referred_table"] == referred_table:
+                op.drop_constraint(fk["name"], table, type_="foreignkey")
+
+
+def _create_foreign_keys() -> None:
+    for table, column, referred_table, referred_column in FOREIGN_KEYS:
+        op.create_foreign_key(f"{table}_{column}_fkey", table, referred_table, [column], [referred_column])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not _has_tables(bind):
+        return
+
+    if bind.dialect.name == "postgresql":
+        # VARCHAR -> UUID in place; FKs must be dropped while the types differ
+        _drop_foreign_keys(bind)
+        for table, column in UUID_COLUMNS:
+            op.alter_column(table, column, type_=sa.Uuid(), postgresql_using=f"{column}::uuid")
+        _create_foreign_keys()
+    else:
+        # Non-native Uuid (SQLite) stores uuid.hex: strip the hyphens. SQLite
+        # doesn't enforce FKs unless PRAGMA foreign_keys is on (the app never
+        # sets it), so parents and children can be rewritten in any order.
+        for table, column in UUID_COLUMNS:
+            op.execute(
+                f"UPDATE {table} SET {column} = lower(replace({column}, '-', '')) "
+                f"WHERE {column} LIKE '%-%'"
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not _has_tables(bind):
+        return
+
+    if bind.dialect.name == "postgresql":
+        _drop_foreign_keys(bind)
+        for table, column in UUID_COLUMNS:
+            op.alter_column(table, column, type_=sa.String(), postgresql_using=f"{column}::text")
+        _create_foreign_keys()
+    else:
+        # Re-insert the hyphens: 8-4-4-4-12
+        for table, column in UUID_COLUMNS:
+            op.execute(
+                f"UPDATE {table} SET {column} = "
+                f"substr({column}, 1, 8) || '-' || substr({column}, 9, 4) || '-' || "
+                f"substr({column}, 13, 4) || '-' || substr({column}, 17, 4) || '-' || substr({column}, 21) "
+                f"WHERE length({column}) = 32"
+            )
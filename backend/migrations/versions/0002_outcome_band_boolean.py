@@ -0,0 +1,89 @@
+"""
+Store outcomes.within_predicted_band as a nullable boolean
+
+The column was VARCHAR holding 'yes'/'no'/'pending' (and, on databases that
+kept the old column after the model change, '1'/'0' written by the ORM).
+Legacy strings break both readers: the ORM's bool() turns 'no' into True,
+and the accuracy aggregate's FILTER (WHERE within_predicted_band) counts
+'yes' as false. NULL now means pending.
+
+Revision ID: 0002_outcome_band_boolean
+Revises: 0001_uuid_ids
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_outcome_band_boolean"
+down_revision = "0001_uuid_ids"
+branch_labels = None
+depends_on = None
+
+TABLE = "outcomes"
+COLUMN = "within_predicted_band"
+
+_TRUE_VALUES = "('yes', 'true', 't', '1')"
+_FALSE_VALUES = "('no', 'false', 'f', '0')"
+
+
+def _column_type(bind):
+    inspector = sa.inspect(bind)
+    if not inspector.has_table(TABLE):
+        return None
+    for column in inspector.get_columns(TABLE):
+        if column["name"] == COLUMN:
+            return column["type"]
+    return None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    column_type = _column_type(bind)
+    if column_type is None or isinstance(column_type, sa.Boolean):
+        return  # No table yet, or already created as boolean by init_db()
+
+    if bind.dialect.name == "postgresql":
+        op.alter_column(
+            TABLE, COLUMN,
+            type_=sa.Boolean(),
+            existing_type=column_type,
+            existing_nullable=True,
+            postgresql_using=(
+                f"CASE WHEN lower({COLUMN}) IN {_TRUE_VALUES} THEN TRUE "
+                f"WHEN lower({COLUMN}) IN {_FALSE_VALUES} THEN FALSE ELSE NULL END"
+            ),
+        )
+    else:
+        # SQLite can't change a column's type in place: normalize the values to
+        # 1/0/NULL, then let batch mode rebuild the table with a BOOLEAN column
+        # (the copy CASTs, so the VARCHAR-affinity '1'/'0' become integers)
+        op.execute(
+            f"UPDATE {TABLE} SET {COLUMN} = CASE "
+            f"WHEN lower({COLUMN}) IN {_TRUE_VALUES} THEN 1 "
+            f"WHEN lower({COLUMN}) IN {_FALSE_VALUES} THEN 0 ELSE NULL END"
+        )
+        with op.batch_alter_table(TABLE) as batch:
+            batch.alter_column(COLUMN, type_=sa.Boolean(), existing_type=column_type, existing_nullable=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    column_type = _column_type(bind)
+    if column_type is None or not isinstance(column_type, sa.Boolean):
+        return
+
+    if bind.dialect.name == "postgresql":
+        op.alter_column(
+            TABLE, COLUMN,
+            type_=sa.String(),
+            existing_type=column_type,
+            existing_nullable=True,
+            postgresql_using=f"CASE WHEN {COLUMN} THEN 'yes' WHEN NOT {COLUMN} THEN 'no' ELSE 'pending' END",
+        )
+    else:
+        with op.batch_alter_table(TABLE) as batch:
+            batch.alter_column(COLUMN, type_=sa.String(), existing_type=column_type, existing_nullable=True)
+        op.execute(
+            f"UPDATE {TABLE} SET {COLUMN} = CASE {COLUMN} "
+            f"WHEN '1' THEN 'yes' WHEN '0' THEN 'no' ELSE 'pending' END"
+        )
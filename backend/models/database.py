@@ -1,22 +1,21 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Boolean
+from sqlalchemy import event, DDL, Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Boolean, Uuid, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, selectinload
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import JSONB
 import uuid
 
 Base = declarative_base()
 
-
-def generate_uuid():
-    """Generate UUID as string for cross-database compatibility"""
-    return str(uuid.uuid4())
+# Binary JSONB on Postgres (parsed once on write, GIN-indexable), plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
 
 
 class Customer(Base):
     """SaaS Customers (restaurant chains)"""
     __tablename__ = "customers"
     
-    id = Column(String, primary_key=True, default=generate_uuid)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)  # Native UUID on Postgres, CHAR(32) on SQLite (older DBs: migrations/0001_uuid_ids)
     name = Column(String, nullable=False)  # e.g., "Burger King Finland"
     email = Column(String, unique=True, index=True)
     
@@ -25,8 +24,8 @@ class Customer(Base):
     analyses_limit = Column(Integer, default=10)
     analyses_used = Column(Integer, default=0)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     concepts = relationship("Concept", back_populates="customer")
@@ -39,8 +38,8 @@ class Concept(Base):
     """
     __tablename__ = "concepts"
     
-    id = Column(String, primary_key=True, default=generate_uuid)
-    customer_id = Column(String, ForeignKey("customers.id"), nullable=False, index=True)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    customer_id = Column(Uuid, ForeignKey("customers.id"), nullable=False)
     
     # Concept details
     name = Column(String, nullable=False)  # "Burger King QSR Model"
@@ -58,25 +57,31 @@ class Concept(Base):
     target_competitors_per_1k = Column(Float, nullable=False)
     
     # Scoring weights (learned from outcomes)
-    weights = Column(JSON, nullable=False)  # {population: 0.35, income: 0.25, ...}
+    weights = Column(JSONType, nullable=False)  # {population: 0.35, income: 0.25, ...}
     
     # Learning metadata
     outcomes_count = Column(Integer, default=0)  # How many actual openings tracked
     avg_prediction_error = Column(Float)  # MAPE (Mean Absolute Percentage Error)
-    last_trained_at = Column(DateTime)  # When weights were last updated
+    last_trained_at = Column(DateTime(timezone=True))  # When weights were last updated
+    running_stats = Column(JSONType)  # Incremental retraining state: error sum and feature/revenue co-moments
     
     # System vs custom
     is_system_default = Column(Boolean, default=False)  # True for YAML-loaded defaults
     is_active = Column(Boolean, default=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     customer = relationship("Customer", back_populates="concepts")
     predictions = relationship("Prediction", back_populates="concept")
     training_outcomes = relationship("ConceptTrainingOutcome", back_populates="concept")
 
+    __table_args__ = (
+        # Customer concept listings: customer_id → is_active → category
+        Index("ix_concepts_customer_active_category", "customer_id", "is_active", "category"),
+    )
+
 
 class ConceptTrainingOutcome(Base):
     """
@@ -86,29 +91,35 @@ class ConceptTrainingOutcome(Base):
     __tablename__ = "concept_training_outcomes"
     
     id = Column(Integer, primary_key=True, index=True)
-    concept_id = Column(String, ForeignKey("concepts.id"), nullable=False, index=True)
+    concept_id = Column(Uuid, ForeignKey("concepts.id"), nullable=False)
     prediction_id = Column(Integer, ForeignKey("predictions.id"), nullable=False, unique=True)
     
     # What was predicted
     predicted_revenue_eur = Column(Float, nullable=False)
     predicted_score = Column(Float, nullable=False)
-    features_used = Column(JSON)  # Snapshot of features at prediction time
+    features_used = Column(JSONType)  # Snapshot of features at prediction time
     
     # What actually happened
     actual_revenue_eur = Column(Float, nullable=False)
     variance_pct = Column(Float, nullable=False)  # (actual - predicted) / predicted
-    opened_at = Column(DateTime)
+    opened_at = Column(DateTime(timezone=True))
     
     # Used for re-training
     used_in_training = Column(Boolean, default=False)
     training_weight = Column(Float, default=1.0)  # More recent = higher weight
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     concept = relationship("Concept", back_populates="training_outcomes")
     prediction = relationship("Prediction")
 
+    __table_args__ = (
+        # Retraining reads: outcomes for a concept, by training state, in time order
+        Index("ix_cto_concept_used_created", "concept_id", "used_in_training", "created_at"),
+        Index("ix_cto_created_brin", "created_at", postgresql_using="brin").ddl_if(dialect="postgresql"),
+    )
+
 
 class User(Base):
     """User accounts"""
@@ -117,7 +128,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     name = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     searches = relationship("Search", back_populates="user")
@@ -133,7 +144,7 @@ class Search(Base):
     search_type = Column(String)  # 'discovery', 'single_site', 'comparison'
     city = Column(String)
     concept = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     user = relationship("User", back_populates="searches")
@@ -149,11 +160,11 @@ class Evaluation(Base):
     evaluation_type = Column(String)  # 'area', 'site', 'comparison'
     city = Column(String, nullable=False)
     concept = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     search = relationship("Search", back_populates="evaluations")
-    predictions = relationship("Prediction", back_populates="evaluation")
+    predictions = relationship("Prediction", back_populates="evaluation", lazy="selectin")  # One IN query, no N+1
 
 
 class Prediction(Base):
@@ -162,41 +173,62 @@ class Prediction(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     evaluation_id = Column(Integer, ForeignKey("evaluations.id"))
-    concept_id = Column(String, ForeignKey("concepts.id"), nullable=True, index=True)  # NEW: Link to concept used
+    concept_id = Column(Uuid, ForeignKey("concepts.id"), nullable=True)  # NEW: Link to concept used
 
-    # Location
-    address = Column(String)
-    area_name = Column(String)
-    latitude = Column(Float, nullable=False)
-    longitude = Column(Float, nullable=False)
-    postal_code = Column(String)
+    # Column order matters on disk: fixed-width hot columns first (read by
+    # listings/aggregates), variable-length text and JSON at the tail
 
-    # Prediction results
+    # Prediction results (hot)
     score = Column(Float, nullable=False)  # 0-100
-    revenue_low = Column(Float, nullable=False)
     revenue_mid = Column(Float, nullable=False)
-    revenue_high = Column(Float, nullable=False)
     confidence = Column(Float, nullable=False)  # 0-1
+    revenue_low = Column(Float, nullable=False)
+    revenue_high = Column(Float, nullable=False)
+
+    # Location
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
 
     # Ranking (if part of comparison)
     rank = Column(Integer)
 
-    # Features used (JSON)
-    features = Column(JSON)  # demographics, competition, traffic, etc.
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    # Insights
-    strengths = Column(JSON)  # List of positive factors
-    risks = Column(JSON)  # List of risk factors
+    address = Column(String)
+    area_name = Column(String)
+    postal_code = Column(String)
     recommendation = Column(String)  # 'strong', 'moderate', 'weak'
 
-    # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Features used (JSON)
+    features = Column(JSONType)  # demographics, competition, traffic, etc.
+
+    # Insights
+    strengths = Column(JSONType)  # List of positive factors
+    risks = Column(JSONType)  # List of risk factors
 
     # Relationships
     evaluation = relationship("Evaluation", back_populates="predictions")
     outcome = relationship("Outcome", back_populates="prediction", uselist=False)
     concept = relationship("Concept", back_populates="predictions")  # NEW
 
+    __table_args__ = (
+        # Latest predictions per concept
+        Index("ix_predictions_concept_created", "concept_id", "created_at"),
+        # Covering index so concept listings/aggregates are index-only
+        Index("ix_pred_hot", "concept_id", "score", "revenue_mid", "confidence"),
+        # Append-only by time: BRIN gives range pruning for "last N days" at a tiny size
+        Index("ix_predictions_created_brin", "created_at", postgresql_using="brin").ddl_if(dialect="postgresql"),
+    )
+
+
+# Leave page headroom for HOT updates (e.g. rank) on Postgres
+event.listen(
+    Prediction.__table__,
+    "after_create",
+    DDL("ALTER TABLE predictions SET (fillfactor = 90)").execute_if(dialect="postgresql")
+)
+
 
 class Outcome(Base):
     """Actual results after opening - THE MOAT"""
@@ -207,12 +239,12 @@ class Outcome(Base):
 
     # Actual results
     actual_revenue = Column(Float)
-    opening_date = Column(DateTime)
-    reported_date = Column(DateTime, default=datetime.utcnow)
+    opening_date = Column(DateTime(timezone=True))
+    reported_date = Column(DateTime(timezone=True), server_default=func.now())
 
     # Calculated variance
     variance_percent = Column(Float)  # (actual - predicted_mid) / predicted_mid * 100
-    within_predicted_band = Column(String)  # 'yes', 'no', 'pending'
+    within_predicted_band = Column(Boolean, nullable=True)  # NULL = pending
 
     # Notes
     notes = Column(Text)
@@ -220,6 +252,12 @@ class Outcome(Base):
     # Relationships
     prediction = relationship("Prediction", back_populates="outcome")
 
+    __table_args__ = (
+        # Lets the accuracy aggregate run as an index-only scan
+        Index("ix_outcomes_band_variance", "within_predicted_band", "variance_percent"),
+        Index("ix_outcomes_reported_brin", "reported_date", postgresql_using="brin").ddl_if(dialect="postgresql"),
+    )
+
 
 class PreScoredArea(Base):
     """Pre-calculated area scores for discovery view"""
@@ -228,17 +266,78 @@ class PreScoredArea(Base):
     id = Column(Integer, primary_key=True, index=True)
 
     # Location
-    city = Column(String, nullable=False, index=True)
+    city = Column(String, nullable=False)
     area_id = Column(String, unique=True, index=True)  # e.g., "helsinki_kamppi"
     area_name = Column(String, nullable=False)
     center_latitude = Column(Float, nullable=False)
     center_longitude = Column(Float, nullable=False)
 
-    # Scores by concept (JSON)
-    scores = Column(JSON)  # {"QSR": 87, "Coffee": 91, "FastCasual": 84, ...}
+    # Scores by concept (JSON) - kept for debugging; rank via concept_scores
+    scores = Column(JSONType)  # {"QSR": 87, "Coffee": 91, "FastCasual": 84, ...}
 
     # Features (JSON)
-    features = Column(JSON)
+    features = Column(JSONType)
 
     # Metadata
-    last_updated = Column(DateTime, default=datetime.utcnow)
+    last_updated = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    concept_scores = relationship(
+        "AreaConceptScore",
+        back_populates="area",
+        cascade="all, delete-orphan"
+    )
+
+    def set_scores(self, scores: dict):
+        """
+        Set per-concept scores, keeping the flat area_concept_scores rows
+        in sync (written in the same flush/transaction as this area)
+        """
+        self.scores = scores
+        self.concept_scores = [
+            AreaConceptScore(city=self.city, concept=concept, score=score)
+            for concept, score in scores.items()
+        ]
+
+    __table_args__ = (
+        Index("ix_prescored_city_area", "city", "area_id"),
+        # Containment filters like scores @> '{"QSR": 87}' (Postgres only)
+        Index("ix_prescored_scores_gin", "scores", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+
+class AreaConceptScore(Base):
+    """
+    Flat (area, concept, score) rows for top-N ranking
+    "Top areas for QSR in Helsinki" becomes an index range scan instead of
+    parsing PreScoredArea.scores JSON on every row
+    """
+    __tablename__ = "area_concept_scores"
+
+    id = Column(Integer, primary_key=True)
+    area_id = Column(String, ForeignKey("prescored_areas.area_id"), nullable=False)
+    city = Column(String, nullable=False)
+    concept = Column(String, nullable=False)
+    score = Column(Float, nullable=False)
+
+    # Relationships
+    area = relationship("PreScoredArea", back_populates="concept_scores")
+
+
+# Defined after the class so score can be indexed descending
+Index(
+    "ix_acs_concept_city_score",
+    AreaConceptScore.concept,
+    AreaConceptScore.city,
+    AreaConceptScore.score.desc()
+)
+
+
+# Loader options for prediction read paths: related rows come back in one
+# IN (...) query per relationship instead of one query per prediction.
+# Usage: select(Prediction).options(*PREDICTION_DETAIL_LOADERS)
+PREDICTION_DETAIL_LOADERS = (
+    selectinload(Prediction.concept),
+    selectinload(Prediction.outcome),
+    selectinload(Prediction.evaluation),
+)
@@ -2,8 +2,11 @@
 Database initialization and session management
 """
 import os
-from sqlalchemy import create_engine
+from typing import Any, Dict, Iterable, List
+from sqlalchemy import create_engine, insert
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from dotenv import load_dotenv
 from .database import Base
 
@@ -13,21 +16,72 @@ load_dotenv()
 # Database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./spotlight.db")
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
 # Create engine
 # For SQLite: check_same_thread=False allows FastAPI to use it across threads
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+
+# Pool tuning for server databases: sized for bursty traffic, pre-ping to
+# drop dead connections instead of failing requests, recycle before
+# server-side idle timeouts. SQLite keeps SQLAlchemy's default file pool.
+if IS_SQLITE:
+    pool_kwargs = {}
+else:
+    pool_kwargs = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "3600")),
+    }
+
+# Bulk INSERTs (including ORM add_all) are batched into pages of this size.
+# QueuePool is pinned on the sync engine only; the async engine gets its
+# asyncio-adapted variant by default.
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args,
+    insertmanyvalues_page_size=10_000,
+    **({"poolclass": QueuePool, **pool_kwargs} if pool_kwargs else {})
+)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-def init_db():
+def _to_async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql+psycopg2:"):
+        return url.replace("postgresql+psycopg2:", "postgresql+asyncpg:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+
+# Async engine - endpoints using it overlap DB waits on the event loop
+# instead of blocking it. The sync engine above stays for scripts and
+# ORM-heavy code that hasn't been ported yet.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _to_async_url(DATABASE_URL))
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    insertmanyvalues_page_size=10_000,
+    **pool_kwargs
+)
+
+# Async session factory
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def init_db():
     """
     Initialize database - create all tables
     """
     print(f"Initializing database at: {DATABASE_URL}")
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     print("✓ Database tables created successfully")
 
 
@@ -43,9 +97,46 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncSession:
+    """
+    Dependency to get an async database session
+    Use in async FastAPI endpoints with Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_db_direct() -> Session:
     """
     Get database session directly (for scripts, not endpoints)
     Remember to close it when done!
     """
     return SessionLocal()
+
+
+def bulk_insert(
+    session: Session,
+    model,
+    rows: Iterable[Dict[str, Any]],
+    page: int = 10_000
+) -> int:
+    """
+    Insert many rows with Core executemany (insertmanyvalues) instead of
+    per-object ORM flushes. Use for backfills/seeding of 100+ rows.
+
+    Rows are plain dicts keyed by column name; sent in chunks of `page`.
+    Does not commit - caller owns the transaction.
+    Returns number of rows inserted.
+    """
+    total = 0
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= page:
+            session.execute(insert(model), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        session.execute(insert(model), chunk)
+        total += len(chunk)
+    return total
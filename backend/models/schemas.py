@@ -1,6 +1,30 @@
 from typing import Optional, List, Dict, Any, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+import msgspec
+
+
+# Server-built response models: immutable (hashable/cacheable), drop unknown
+# keys from upstream dicts, can be built straight from ORM rows, and are
+# never copied/re-validated when nested in another model
+RESPONSE_MODEL_CONFIG = ConfigDict(
+    frozen=True,
+    extra="ignore",
+    from_attributes=True,
+    validate_assignment=False,
+    revalidate_instances="never"
+)
+
+
+class TrustedModel(BaseModel):
+    """
+    Base for response models built from server-computed values.
+    Use `Model.trusted(...)` to skip validation; keep `Model(...)` for user input.
+    """
+
+    @classmethod
+    def trusted(cls, **kwargs):
+        return cls.model_construct(**kwargs)
 
 
 # ============= Search Schemas =============
@@ -47,6 +71,8 @@ class DiscoveryRequest(BaseModel):
 
 class AreaOpportunity(BaseModel):
     """Individual area in discovery view"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     area_id: str
     area_name: str
     score: float = Field(..., ge=0, le=100)
@@ -62,11 +88,25 @@ class AreaOpportunity(BaseModel):
     coverage: DataCoverage
 
 
+class HeatmapData(BaseModel):
+    """
+    Heatmap grid points as parallel arrays (one entry per point, same index
+    across arrays) - avoids a repeated-key dict per point on the wire
+    """
+    latitudes: List[float] = Field(default_factory=list)
+    longitudes: List[float] = Field(default_factory=list)
+    scores: List[float] = Field(default_factory=list)
+    weights: List[float] = Field(default_factory=list)  # score / 100, normalized intensity
+    confidences: List[float] = Field(default_factory=list)
+
+
 class DiscoveryResponse(BaseModel):
     """Response for discovery view - heatmap + top areas"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     city: str
     concept: str
-    heatmap_data: List[Dict[str, Any]]  # Grid points with scores
+    heatmap_data: HeatmapData  # Grid points with scores
     top_opportunities: List[AreaOpportunity]
     total_areas_scored: int
     
@@ -82,7 +122,7 @@ class SiteAnalysisRequest(BaseModel):
     concept: str
 
 
-class SiteFeatures(BaseModel):
+class SiteFeatures(TrustedModel):
     """Detailed features for a site"""
     # Demographics
     population_1km: Optional[int] = None
@@ -109,8 +149,10 @@ class SiteFeatures(BaseModel):
     walkability_score_component: Optional[float] = None
 
 
-class SitePrediction(BaseModel):
+class SitePrediction(TrustedModel):
     """Prediction for a single site"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     address: str
     latitude: float
     longitude: float
@@ -146,7 +188,7 @@ class SitePrediction(BaseModel):
     agent_reasoning: Optional[Dict[str, Any]] = None
 
 
-class SiteAnalysisResponse(BaseModel):
+class SiteAnalysisResponse(TrustedModel):
     """Response for site analysis"""
     concept: str
     sites: List[SitePrediction]
@@ -179,6 +221,8 @@ class AreaDetailRequest(BaseModel):
 
 class AreaDetailResponse(BaseModel):
     """Detailed area information"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     area_id: str
     area_name: str
     city: str
@@ -267,7 +311,7 @@ class RecommendRequest(BaseModel):
     include_crime: bool = Field(False, description="Include crime penalty in scoring (capped at 5%)")
 
 
-class MetricProvenance(BaseModel):
+class MetricProvenance(TrustedModel):
     """Provenance information for a single metric"""
     score: float = Field(..., description="Score contribution (0-100)")
     weight: float = Field(..., description="Weight in overall score (0-1)")
@@ -278,7 +322,7 @@ class MetricProvenance(BaseModel):
     raw_unit: Optional[str] = None  # Unit for raw_value (e.g., "people", "meters")
 
 
-class ScoreProvenance(BaseModel):
+class ScoreProvenance(TrustedModel):
     """Complete provenance breakdown for transparency"""
     population: MetricProvenance
     income_fit: MetricProvenance
@@ -290,8 +334,10 @@ class ScoreProvenance(BaseModel):
     confidence_basis: str = Field(..., description="Explanation of confidence calculation")
 
 
-class RecommendedAddress(BaseModel):
+class RecommendedAddress(TrustedModel):
     """Single recommended address with full scoring"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     rank: int
     address: str
     lat: float
@@ -310,14 +356,14 @@ class RecommendedAddress(BaseModel):
     provenance: Optional[ScoreProvenance] = None  # NEW: Detailed provenance breakdown
 
 
-class WeightsInfo(BaseModel):
+class WeightsInfo(TrustedModel):
     """Scoring weights for transparency"""
     weights_version: str
     weights: Dict[str, float]
     sources: List[Dict[str, str]]  # [{name, refreshed_at}]
 
 
-class RecommendResponse(BaseModel):
+class RecommendResponse(TrustedModel):
     """Response with top N recommended addresses"""
     job_id: str
     city: str
@@ -327,6 +373,51 @@ class RecommendResponse(BaseModel):
     degraded: List[str] = Field(default_factory=list, description="Warnings (e.g., 'OVERPASS_CACHED')")
 
 
+# ============= Wire Structs (msgspec) =============
+# Field-for-field mirrors of the recommendation models above, used by the
+# background job to encode results straight to JSON bytes. The Pydantic
+# models remain the API contract (OpenAPI); keep both in sync.
+
+class MetricProvenanceMsg(msgspec.Struct, kw_only=True):
+    score: float
+    weight: float
+    weighted_score: float
+    source: str
+    coverage: float
+    raw_value: Optional[Any] = None
+    raw_unit: Optional[str] = None
+
+
+class ScoreProvenanceMsg(msgspec.Struct, kw_only=True):
+    population: MetricProvenanceMsg
+    income_fit: MetricProvenanceMsg
+    transit_access: MetricProvenanceMsg
+    competition_inverse: MetricProvenanceMsg
+    traffic_access: MetricProvenanceMsg
+    crime_penalty_cap: Optional[MetricProvenanceMsg] = None
+    total_score: float
+    confidence_basis: str
+
+
+class RecommendedAddressMsg(msgspec.Struct, kw_only=True):
+    rank: int
+    address: str
+    lat: float
+    lng: float
+    score: float
+    revenue_min_eur: int
+    revenue_max_eur: int
+    confidence: float
+    coverage: Dict[str, float]
+    why: List[str]
+    decision: str
+    decision_reasoning: Optional[str] = None
+    area_id: Optional[str] = None
+    nearby_property_search_url: Optional[str] = None
+    metrics: Optional[Dict[str, Any]] = None
+    provenance: Optional[ScoreProvenanceMsg] = None
+
+
 class JobStatusResponse(BaseModel):
     """Job status for SSE or polling"""
     job_id: str
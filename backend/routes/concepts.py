@@ -3,16 +3,36 @@ Concept Management API
 Allows customers to create, view, update their own restaurant concept models
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, bindparam, func, case
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from uuid import UUID
+from pydantic import BaseModel, Field, TypeAdapter
+import orjson
 
 from models.db_init import get_db
 from models.database import Concept, Customer
+from models.schemas import RESPONSE_MODEL_CONFIG
+from services.response_cache import response_cache, CacheTTL
+from services.concept_cache import (
+    LIST_CACHE_PREFIX,
+    item_cache_key,
+    get_local,
+    set_local,
+    invalidate_concept_cache,
+)
 
 router = APIRouter(prefix="/api/concepts", tags=["concepts"])
 
+# Lookup statements built once at import; SQLAlchemy reuses their compiled form
+STMT_CONCEPT_BY_ID = select(Concept).where(Concept.id == bindparam("concept_id"))
+STMT_CUSTOMER_BY_ID = select(Customer).where(Customer.id == bindparam("customer_id"))
+
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
 
 # ============= Request/Response Schemas =============
 
@@ -24,10 +44,15 @@ class ConceptWeights(BaseModel):
     competition: float = Field(..., ge=0, le=1)
     walkability: float = Field(..., ge=0, le=1)
 
+    @property
+    def total(self) -> float:
+        """Sum of the five weights, read straight off the fields"""
+        return self.population + self.income + self.access + self.competition + self.walkability
+
 
 class ConceptCreate(BaseModel):
     """Create new concept"""
-    customer_id: str
+    customer_id: UUID
     name: str
     category: str  # QSR, Coffee, FastCasual, etc.
     description: Optional[str] = None
@@ -54,8 +79,10 @@ class ConceptUpdate(BaseModel):
 
 class ConceptResponse(BaseModel):
     """Concept response"""
-    id: str
-    customer_id: str
+    model_config = RESPONSE_MODEL_CONFIG
+
+    id: UUID
+    customer_id: UUID
     name: str
     category: str
     description: Optional[str]
@@ -73,25 +100,57 @@ class ConceptResponse(BaseModel):
     created_at: str
     updated_at: str
 
-    class Config:
-        from_attributes = True
-
 
 class ConceptListResponse(BaseModel):
     """List of concepts with metadata"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     concepts: List[ConceptResponse]
     total: int
     system_defaults: int
     custom_concepts: int
 
 
+# Serializer for concept rows, built once instead of per request
+_CONCEPT_LIST_ADAPTER = TypeAdapter(List[ConceptResponse])
+
+
+def _concept_response(c: Concept) -> ConceptResponse:
+    """
+    Build a ConceptResponse from an ORM row without re-validating it.
+    Rows come from our own DB, so validation is only for ConceptCreate/ConceptUpdate input.
+    """
+    return ConceptResponse.model_construct(
+        id=c.id,
+        customer_id=c.customer_id,
+        name=c.name,
+        category=c.category,
+        description=c.description,
+        base_revenue_eur=c.base_revenue_eur,
+        revenue_variance=c.revenue_variance,
+        target_income_min=c.target_income_min,
+        target_income_max=c.target_income_max,
+        optimal_population_density=c.optimal_population_density,
+        target_competitors_per_1k=c.target_competitors_per_1k,
+        weights=c.weights,
+        outcomes_count=c.outcomes_count or 0,
+        avg_prediction_error=c.avg_prediction_error,
+        is_system_default=bool(c.is_system_default),
+        is_active=bool(c.is_active),
+        created_at=c.created_at.isoformat() if c.created_at else "",
+        updated_at=c.updated_at.isoformat() if c.updated_at else ""
+    )
+
+
 # ============= Endpoints =============
 
 @router.get("/", response_model=ConceptListResponse)
-async def list_concepts(
-    customer_id: Optional[str] = None,
+def list_concepts(
+    customer_id: Optional[UUID] = None,
     category: Optional[str] = None,
     is_active: bool = True,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ):
     """
@@ -99,48 +158,87 @@ async def list_concepts(
     - Filter by customer_id to see customer's concepts
     - Filter by category (QSR, Coffee, etc.)
     - Filter by is_active
+    - Page with limit/offset (totals always cover every match)
     """
-    query = db.query(Concept)
+    cache_key = response_cache.key(
+        LIST_CACHE_PREFIX.rstrip(":"), customer_id, category, is_active, limit, offset
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+    
+    filters = []
     
     if customer_id:
-        query = query.filter(Concept.customer_id == customer_id)
+        filters.append(Concept.customer_id == customer_id)
     
     if category:
-        query = query.filter(Concept.category == category)
+        filters.append(Concept.category == category)
     
     if is_active is not None:
-        query = query.filter(Concept.is_active == is_active)
-    
-    concepts = query.all()
-    
-    # Count system defaults vs custom
-    system_defaults = sum(1 for c in concepts if c.is_system_default)
-    custom_concepts = len(concepts) - system_defaults
-    
-    return ConceptListResponse(
-        concepts=[ConceptResponse.model_validate(c) for c in concepts],
-        total=len(concepts),
-        system_defaults=system_defaults,
-        custom_concepts=custom_concepts
-    )
+        filters.append(Concept.is_active == is_active)
+    
+    # Count system defaults vs custom in the same round-trip
+    total, system_defaults = db.execute(
+        select(
+            func.count(Concept.id),
+            func.coalesce(func.sum(case((Concept.is_system_default == True, 1), else_=0)), 0)
+        ).where(*filters)
+    ).one()
+    
+    concepts = []
+    if total > offset:
+        stmt = (
+            select(Concept)
+            .options(selectinload(Concept.customer))  # one IN query for all owners, no per-row lazy load
+            .where(*filters)
+            .order_by(Concept.created_at, Concept.id)
+            .offset(offset)
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        concepts = db.scalars(stmt).all()
+    
+    # ConceptListResponse shape, with the rows encoded by the prebuilt adapter
+    body = orjson.dumps({
+        "concepts": orjson.Fragment(_CONCEPT_LIST_ADAPTER.dump_json([_concept_response(c) for c in concepts])),
+        "total": total,
+        "system_defaults": system_defaults,
+        "custom_concepts": total - system_defaults
+    })
+    response_cache.set(cache_key, body, CacheTTL.SHORT)
+    return _json_response(body)
 
 
 @router.get("/{concept_id}", response_model=ConceptResponse)
-async def get_concept(
-    concept_id: str,
+def get_concept(
+    concept_id: UUID,
     db: Session = Depends(get_db)
 ):
     """Get single concept by ID"""
-    concept = db.query(Concept).filter(Concept.id == concept_id).first()
+    cached = get_local(concept_id)
+    if cached is not None:
+        return _json_response(cached)
+    
+    cache_key = item_cache_key(concept_id)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        set_local(concept_id, cached)
+        return _json_response(cached)
+    
+    concept = db.scalars(STMT_CONCEPT_BY_ID, {"concept_id": concept_id}).first()
     
     if not concept:
         raise HTTPException(status_code=404, detail=f"Concept {concept_id} not found")
     
-    return ConceptResponse.model_validate(concept)
+    body = orjson.dumps(_concept_response(concept).model_dump(mode="json"))
+    set_local(concept_id, body)
+    response_cache.set(cache_key, body, CacheTTL.NORMAL)
+    return _json_response(body)
 
 
 @router.post("/", response_model=ConceptResponse)
-async def create_concept(
+def create_concept(
     concept_data: ConceptCreate,
     db: Session = Depends(get_db)
 ):
@@ -149,20 +247,19 @@ async def create_concept(
     
     This allows customers to define their own unit economics and scoring weights
     """
-    # Verify customer exists
-    customer = db.query(Customer).filter(Customer.id == concept_data.customer_id).first()
-    if not customer:
-        raise HTTPException(status_code=404, detail=f"Customer {concept_data.customer_id} not found")
-    
-    # Validate weights sum to approximately 1.0
-    weights_dict = concept_data.weights.model_dump()
-    total_weight = sum(weights_dict.values())
+    # Validate weights sum to approximately 1.0 (before touching the DB)
+    total_weight = concept_data.weights.total
     if not (0.95 <= total_weight <= 1.05):
         raise HTTPException(
             status_code=400,
             detail=f"Weights must sum to approximately 1.0 (got {total_weight})"
         )
     
+    # Verify customer exists
+    customer = db.scalars(STMT_CUSTOMER_BY_ID, {"customer_id": concept_data.customer_id}).first()
+    if not customer:
+        raise HTTPException(status_code=404, detail=f"Customer {concept_data.customer_id} not found")
+    
     # Create concept
     new_concept = Concept(
         customer_id=concept_data.customer_id,
@@ -175,7 +272,7 @@ async def create_concept(
         target_income_max=concept_data.target_income_max,
         optimal_population_density=concept_data.optimal_population_density,
         target_competitors_per_1k=concept_data.target_competitors_per_1k,
-        weights=weights_dict,
+        weights=concept_data.weights.model_dump(),
         is_system_default=False,
         is_active=True
     )
@@ -183,13 +280,14 @@ async def create_concept(
     db.add(new_concept)
     db.commit()
     db.refresh(new_concept)
+    invalidate_concept_cache()
     
-    return ConceptResponse.model_validate(new_concept)
+    return _concept_response(new_concept)
 
 
 @router.patch("/{concept_id}", response_model=ConceptResponse)
-async def update_concept(
-    concept_id: str,
+def update_concept(
+    concept_id: UUID,
     updates: ConceptUpdate,
     db: Session = Depends(get_db)
 ):
@@ -198,7 +296,16 @@ async def update_concept(
     
     Note: System defaults cannot be modified
     """
-    concept = db.query(Concept).filter(Concept.id == concept_id).first()
+    # Validate weights if provided (before touching the DB)
+    if updates.weights:
+        total_weight = updates.weights.total
+        if not (0.95 <= total_weight <= 1.05):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Weights must sum to approximately 1.0 (got {total_weight})"
+            )
+    
+    concept = db.scalars(STMT_CONCEPT_BY_ID, {"concept_id": concept_id}).first()
     
     if not concept:
         raise HTTPException(status_code=404, detail=f"Concept {concept_id} not found")
@@ -212,30 +319,21 @@ async def update_concept(
     # Apply updates
     update_data = updates.model_dump(exclude_unset=True)
     
-    if "weights" in update_data and update_data["weights"]:
-        # Validate weights if provided
-        weights_dict = update_data["weights"]
-        total_weight = sum(weights_dict.values())
-        if not (0.95 <= total_weight <= 1.05):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Weights must sum to approximately 1.0 (got {total_weight})"
-            )
-    
     for field, value in update_data.items():
         setattr(concept, field, value)
     
     db.commit()
     db.refresh(concept)
+    invalidate_concept_cache(concept_id)
     
-    return ConceptResponse.model_validate(concept)
+    return _concept_response(concept)
 
 
 @router.post("/{concept_id}/clone", response_model=ConceptResponse)
-async def clone_concept(
-    concept_id: str,
+def clone_concept(
+    concept_id: UUID,
     new_name: str,
-    customer_id: str,
+    customer_id: UUID,
     db: Session = Depends(get_db)
 ):
     """
@@ -243,13 +341,13 @@ async def clone_concept(
     
     Example: Clone "QSR" system default → "Burger King Finland QSR"
     """
-    source_concept = db.query(Concept).filter(Concept.id == concept_id).first()
+    source_concept = db.scalars(STMT_CONCEPT_BY_ID, {"concept_id": concept_id}).first()
     
     if not source_concept:
         raise HTTPException(status_code=404, detail=f"Source concept {concept_id} not found")
     
     # Verify customer exists
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    customer = db.scalars(STMT_CUSTOMER_BY_ID, {"customer_id": customer_id}).first()
     if not customer:
         raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
     
@@ -273,13 +371,14 @@ async def clone_concept(
     db.add(cloned_concept)
     db.commit()
     db.refresh(cloned_concept)
+    invalidate_concept_cache()
     
-    return ConceptResponse.model_validate(cloned_concept)
+    return _concept_response(cloned_concept)
 
 
 @router.delete("/{concept_id}")
-async def delete_concept(
-    concept_id: str,
+def delete_concept(
+    concept_id: UUID,
     db: Session = Depends(get_db)
 ):
     """
@@ -287,7 +386,7 @@ async def delete_concept(
     
     System defaults cannot be deleted
     """
-    concept = db.query(Concept).filter(Concept.id == concept_id).first()
+    concept = db.scalars(STMT_CONCEPT_BY_ID, {"concept_id": concept_id}).first()
     
     if not concept:
         raise HTTPException(status_code=404, detail=f"Concept {concept_id} not found")
@@ -301,6 +400,6 @@ async def delete_concept(
     # Soft delete
     concept.is_active = False
     db.commit()
+    invalidate_concept_cache(concept_id)
     
     return {"status": "deleted", "concept_id": concept_id}
-
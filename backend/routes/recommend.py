@@ -8,16 +8,21 @@ GET /api/job/{job_id} - Poll job status
 """
 
 import asyncio
-import json
-from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+import functools
+import os
+import time
+import msgspec
+import orjson
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import quote
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Response
 from fastapi.responses import StreamingResponse
 from datetime import datetime
 
 from models.schemas import (
     RecommendRequest,
-    RecommendResponse,
-    RecommendedAddress,
+    RecommendedAddressMsg,
+    ScoreProvenanceMsg,
     WeightsInfo,
     JobStatusResponse,
     PursueRequest,
@@ -49,6 +54,43 @@ address_generator = AddressGenerator(
 # Store background task references to prevent garbage collection
 background_tasks = set()
 
+# Jobs beyond this wait their turn instead of piling onto the upstream APIs
+_job_semaphore = asyncio.Semaphore(int(os.getenv("RECOMMEND_MAX_CONCURRENCY", "4")))
+
+# Scoring method metadata is identical for every job except the crime cap,
+# so both variants are built once and only re-stamped every few minutes
+WEIGHTS_INFO_TTL_SECONDS = 300
+_BASE_WEIGHTS = {
+    "population": 0.28,
+    "income_fit": 0.22,
+    "transit_access": 0.20,
+    "competition_inverse": 0.15,
+    "traffic_access": 0.10,
+}
+_WEIGHT_SOURCES = (
+    "Statistics Finland Population Grid",
+    "PAAVO Postal Demographics",
+    "OpenStreetMap Overpass",
+    "Digitransit Finland",
+)
+_weights_info_cache: Dict[Any, Any] = {"expires_at": 0.0, True: None, False: None}
+
+
+def _weights_info(include_crime: bool) -> WeightsInfo:
+    """Shared WeightsInfo for the job's crime setting, rebuilt after WEIGHTS_INFO_TTL_SECONDS"""
+    now = time.monotonic()
+    if now >= _weights_info_cache["expires_at"]:
+        refreshed_at = datetime.utcnow().isoformat()
+        sources = [{"name": name, "refreshed_at": refreshed_at} for name in _WEIGHT_SOURCES]
+        for crime in (True, False):
+            _weights_info_cache[crime] = WeightsInfo.trusted(
+                weights_version="v1.0",
+                weights={**_BASE_WEIGHTS, "crime_penalty_cap": 0.05 if crime else 0.0},
+                sources=sources
+            )
+        _weights_info_cache["expires_at"] = now + WEIGHTS_INFO_TTL_SECONDS
+    return _weights_info_cache[include_crime]
+
 
 @router.post("/api/recommend")
 async def recommend_addresses(
@@ -60,27 +102,21 @@ async def recommend_addresses(
     Returns job_id immediately and processes in background
     Client should connect to /api/stream/{job_id} for progress updates
     """
-    print(f"\n{'='*60}")
-    print(f"🎯 NEW RECOMMENDATION REQUEST")
-    print(f"   City: {request.city}")
-    print(f"   Concept: {request.concept}")
-    print(f"   Limit: {request.limit}")
-    print(f"   Include Crime: {request.include_crime}")
-    print(f"{'='*60}\n")
-    
     # Create job
-    job_id = job_manager.create_job(
+    job_id = await job_manager.create_job(
         city=request.city,
         concept=request.concept,
         limit=request.limit,
         include_crime=request.include_crime
     )
     
-    print(f"✅ Created job: {job_id}")
-    print(f"📤 Creating asyncio task with ensure_future()")
+    logger.info(
+        f"Created job {job_id}: city={request.city} concept={request.concept} "
+        f"limit={request.limit} include_crime={request.include_crime}"
+    )
 
-    # Use asyncio.ensure_future to start task immediately
-    asyncio.ensure_future(
+    # Start immediately; keep a reference until done so the task isn't GC'd mid-run
+    task = asyncio.create_task(
         run_recommendation_job(
             job_id=job_id,
             city=request.city,
@@ -89,8 +125,8 @@ async def recommend_addresses(
             include_crime=request.include_crime
         )
     )
-    
-    print(f"✅ Task created and scheduled")
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
 
     return {
         "job_id": job_id,
@@ -106,33 +142,38 @@ async def stream_job_progress(job_id: str):
 
     Events sent:
     - stage updates (GEO, DEMO, COMP, TRANSIT, TRAFFIC, RENTS, REVENUE)
+    - ADDRESS per ranked address, in rank order
     - completion with full result
     - error if job fails
     """
-    print(f"\n📡 SSE CONNECTION OPENED")
-    print(f"   Job ID: {job_id}")
-    print(f"   Streaming events...\n")
+    logger.info(f"SSE connection opened for job {job_id}")
     
-    job = job_manager.get_job(job_id)
+    job = await job_manager.get_job(job_id)
     if not job:
-        print(f"❌ Job {job_id} not found!")
+        logger.warning(f"SSE requested for unknown job {job_id}")
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
 
+    debug = logger.isEnabledFor(logging.DEBUG)
+
     async def event_generator():
-        """Generate SSE events"""
+        """Generate SSE events as pre-framed bytes"""
         event_count = 0
-        async for event in job_manager.stream_job_events(job_id):
-            event_count += 1
-            # Format as SSE
-            event_type = event.get('stage', 'message')
-            data = json.dumps(event)
-            
-            # Log each event sent
-            print(f"   📤 Event #{event_count}: {event_type} - {event.get('status', 'N/A')}")
-            
-            yield f"event: {event_type}\ndata: {data}\n\n"
+        async for batch in job_manager.stream_job_events(job_id):
+            # One named frame per event (clients listen per stage), but the
+            # whole batch goes out as a single chunk
+            frames = []
+            for event in batch:
+                event_count += 1
+                event_type = event.get('stage', 'message')
+
+                if debug:
+                    logger.debug(f"SSE event #{event_count} for {job_id}: {event_type} - {event.get('status', 'N/A')}")
+
+                frames.append(b"event: " + event_type.encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n")
+
+            yield b"".join(frames)
         
-        print(f"✅ SSE stream completed for job {job_id} ({event_count} events sent)\n")
+        logger.info(f"SSE stream completed for job {job_id} ({event_count} events sent)")
 
     return StreamingResponse(
         event_generator(),
@@ -152,15 +193,20 @@ async def get_job_status(job_id: str) -> JobStatusResponse:
 
     Returns current status and result if complete
     """
-    job = job_manager.get_job(job_id)
+    job = await job_manager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
 
-    return JobStatusResponse(
-        job_id=job_id,
-        status=job['status'],
-        result=job.get('result'),
-        error=job.get('error')
+    # Result is stored pre-encoded; splice it in rather than re-validating
+    result_json = job.get('result_json')
+    return Response(
+        content=orjson.dumps({
+            "job_id": job_id,
+            "status": job['status'],
+            "result": orjson.Fragment(result_json) if result_json is not None else None,
+            "error": job.get('error')
+        }),
+        media_type="application/json"
     )
 
 
@@ -183,21 +229,12 @@ async def run_recommendation_job(
     6. RENTS - Lookup rent bands
     7. REVENUE - Predict revenue
     """
-    print(f"\n{'='*60}")
-    print(f"🚀 BACKGROUND TASK STARTED")
-    print(f"   Job ID: {job_id}")
-    print(f"   City: {city}, Concept: {concept}, Limit: {limit}")
-    print(f"{'='*60}\n")
-    
     try:
-        logger.info(f"Starting recommendation job {job_id} for {concept} in {city}")
-        print(f"📊 Logger message sent")
+        logger.info(f"Starting recommendation job {job_id} for {concept} in {city} (limit {limit})")
 
         # Update job status to RUNNING
-        job = job_manager.get_job(job_id)
-        if job:
-            job['status'] = 'running'
-            logger.info(f"Job {job_id} status set to RUNNING")
+        await job_manager.mark_running(job_id)
+        logger.info(f"Job {job_id} status set to RUNNING")
 
         # Emit initial stage
         await job_manager.emit_stage_update(
@@ -210,198 +247,143 @@ async def run_recommendation_job(
         # Generate candidates (this handles all stages internally)
         start_time = asyncio.get_event_loop().time()
 
-        candidates = await address_generator.generate_candidates(
-            city=city,
-            concept=concept,
-            limit=limit,
-            include_crime=include_crime
-        )
+        async with _job_semaphore:
+            candidates = await address_generator.generate_candidates(
+                city=city,
+                concept=concept,
+                limit=limit,
+                include_crime=include_crime
+            )
 
         total_ms = int((asyncio.get_event_loop().time() - start_time) * 1000)
 
         # Emit completion for all stages (simplified for MVP)
         # In production, address_generator would emit these during processing
-        await job_manager.emit_stage_update(
-            job_id=job_id,
-            stage="GEO",
-            status=StageStatus.DONE,
-            metrics={"areas_identified": 8},
-            ms=total_ms // 7
-        )
-
-        await job_manager.emit_stage_update(
-            job_id=job_id,
-            stage="DEMO",
-            status=StageStatus.DONE,
-            metrics={"areas_scored": len(candidates)},
-            ms=total_ms // 7
-        )
-
-        await job_manager.emit_stage_update(
-            job_id=job_id,
-            stage="COMP",
-            status=StageStatus.DONE,
-            metrics={"competitors_counted": len(candidates)},
-            ms=total_ms // 7,
-            cached=False
-        )
-
-        await job_manager.emit_stage_update(
-            job_id=job_id,
-            stage="TRANSIT",
-            status=StageStatus.DONE,
-            metrics={"transit_scored": len(candidates)},
-            ms=total_ms // 7
-        )
-
-        await job_manager.emit_stage_update(
-            job_id=job_id,
-            stage="TRAFFIC",
-            status=StageStatus.DONE,
-            metrics={"traffic_points": 0},  # Not implemented yet
-            ms=total_ms // 7
-        )
-
-        await job_manager.emit_stage_update(
-            job_id=job_id,
-            stage="RENTS",
-            status=StageStatus.DONE,
-            metrics={"rent_bands": 0},  # Not implemented yet
-            ms=total_ms // 7
-        )
-
-        await job_manager.emit_stage_update(
-            job_id=job_id,
-            stage="REVENUE",
-            status=StageStatus.DONE,
-            metrics={"predictions": len(candidates)},
-            ms=total_ms // 7
-        )
-
-        # Build response
-        recommended_addresses = [
-            RecommendedAddress(
-                rank=candidate['rank'],
-                address=candidate['address'],
-                lat=candidate['lat'],
-                lng=candidate['lng'],
-                score=candidate['score'],
-                revenue_min_eur=candidate['revenue_min_eur'],
-                revenue_max_eur=candidate['revenue_max_eur'],
-                confidence=candidate['confidence'],
-                coverage=candidate['coverage'],
-                why=candidate['why'],
-                decision=candidate['decision'],
-                decision_reasoning=candidate.get('decision_reasoning'),
-                provenance=candidate.get('provenance'),
-                area_id=candidate.get('area_id'),
-                nearby_property_search_url=f"https://toimitilat.fi/haku?lat={candidate['lat']}&lon={candidate['lng']}&radius=500",
-                metrics=candidate.get('metrics')
-            )
+        per_stage_ms = total_ms // 7
+        n = len(candidates)
+        await job_manager.emit_stage_updates(job_id, [
+            {"stage": "GEO", "status": StageStatus.DONE, "metrics": {"areas_identified": 8}, "ms": per_stage_ms},
+            {"stage": "DEMO", "status": StageStatus.DONE, "metrics": {"areas_scored": n}, "ms": per_stage_ms},
+            {"stage": "COMP", "status": StageStatus.DONE, "metrics": {"competitors_counted": n}, "ms": per_stage_ms, "cached": False},
+            {"stage": "TRANSIT", "status": StageStatus.DONE, "metrics": {"transit_scored": n}, "ms": per_stage_ms},
+            {"stage": "TRAFFIC", "status": StageStatus.DONE, "metrics": {"traffic_points": 0}, "ms": per_stage_ms},  # Not implemented yet
+            {"stage": "RENTS", "status": StageStatus.DONE, "metrics": {"rent_bands": 0}, "ms": per_stage_ms},  # Not implemented yet
+            {"stage": "REVENUE", "status": StageStatus.DONE, "metrics": {"predictions": n}, "ms": per_stage_ms},
+        ])
+
+        # Build response as msgspec structs; candidates are computed server-side,
+        # so nothing is re-validated and each address is encoded exactly once
+        address_json = [
+            _ADDRESS_ENCODER.encode(RecommendedAddressMsg(
+                rank=candidate.rank,
+                address=candidate.address,
+                lat=candidate.lat,
+                lng=candidate.lng,
+                score=candidate.score,
+                revenue_min_eur=candidate.revenue_min_eur,
+                revenue_max_eur=candidate.revenue_max_eur,
+                confidence=candidate.confidence,
+                coverage=candidate.coverage,
+                why=candidate.why,
+                decision=candidate.decision,
+                decision_reasoning=candidate.decision_reasoning,
+                provenance=_provenance_msg(candidate.provenance),
+                area_id=candidate.area_id,
+                nearby_property_search_url=f"https://toimitilat.fi/haku?lat={candidate.lat}&lon={candidate.lng}&radius=500",
+                metrics=candidate.metrics
+            ))
             for candidate in candidates
         ]
 
-        # Build weights info
-        weights_info = WeightsInfo(
-            weights_version="v1.0",
-            weights={
-                "population": 0.28,
-                "income_fit": 0.22,
-                "transit_access": 0.20,
-                "competition_inverse": 0.15,
-                "traffic_access": 0.10,
-                "crime_penalty_cap": 0.05 if include_crime else 0.0
-            },
-            sources=[
-                {"name": "Statistics Finland Population Grid", "refreshed_at": datetime.utcnow().isoformat()},
-                {"name": "PAAVO Postal Demographics", "refreshed_at": datetime.utcnow().isoformat()},
-                {"name": "OpenStreetMap Overpass", "refreshed_at": datetime.utcnow().isoformat()},
-                {"name": "Digitransit Finland", "refreshed_at": datetime.utcnow().isoformat()}
-            ]
-        )
+        # Stream each ranked address as soon as it's built
+        for encoded in address_json:
+            await job_manager.emit_address(job_id, orjson.Fragment(encoded))
 
-        result = RecommendResponse(
-            job_id=job_id,
-            city=city,
-            concept=concept,
-            top=recommended_addresses,
-            method=weights_info,
-            degraded=[]  # No degradation for MVP
-        )
+        weights_info = _weights_info(include_crime)
 
-        # Complete job
+        # Complete job: RecommendResponse shape, reusing the encoded addresses;
+        # the bytes are then reused by SSE COMPLETE and polling
         await job_manager.complete_job(
             job_id=job_id,
-            result=result.dict()
+            result=orjson.dumps({
+                "job_id": job_id,
+                "city": city,
+                "concept": concept,
+                "top": orjson.Fragment(b"[" + b",".join(address_json) + b"]"),
+                "method": weights_info.model_dump(mode='json'),
+                "degraded": []  # No degradation for MVP
+            })
         )
 
         logger.info(f"Job {job_id} completed with {len(candidates)} addresses in {total_ms}ms")
 
     except Exception as e:
-        import traceback
-        error_msg = f"Job {job_id} failed: {e}"
-        error_trace = traceback.format_exc()
-        
-        print(f"\n{'='*60}")
-        print(f"❌ BACKGROUND TASK FAILED")
-        print(f"   Job ID: {job_id}")
-        print(f"   Error: {error_msg}")
-        print(f"   Traceback:")
-        print(error_trace)
-        print(f"{'='*60}\n")
-        
-        logger.error(error_msg, exc_info=True)
+        logger.error(f"Job {job_id} failed: {e}", exc_info=True)
         await job_manager.fail_job(job_id, str(e))
 
 
-@router.post("/api/pursue")
-async def pursue_address(request: PursueRequest) -> PursueResponse:
-    """
-    Generate broker outreach email for a specific address
+_ADDRESS_ENCODER = msgspec.json.Encoder()
 
-    Returns mailto: link and Gmail URL with pre-filled email template
-    """
-    from urllib.parse import quote
 
-    # Generate email subject
-    subject = f"Seeking {request.concept} space near {request.address}"
+def _provenance_msg(provenance: Optional[Dict[str, Any]]) -> Optional[ScoreProvenanceMsg]:
+    """Map the generator's provenance dict onto ScoreProvenanceMsg (unknown keys dropped)"""
+    if provenance is None:
+        return None
+    return msgspec.convert(provenance, ScoreProvenanceMsg)
 
-    # Generate email body
-    body_lines = [
+
+# Constant tail of the broker email; percent-encoding is per-character, so
+# its encoded form can be computed once and appended to the encoded head
+_PURSUE_FOOTER_LINES = (
+    "I'm interested in learning about:",
+    "• Available commercial properties within 200m of this location",
+    "• Current asking rents and lease terms",
+    "• Any upcoming vacancies or off-market opportunities",
+    "",
+    "Would you be available for a brief call this week to discuss options in this area?",
+    "",
+    "Best regards"
+)
+_PURSUE_FOOTER = "\n".join(_PURSUE_FOOTER_LINES)
+_PURSUE_FOOTER_ENCODED = quote(_PURSUE_FOOTER)
+
+
+@functools.lru_cache(maxsize=256)
+def _build_pursue_email(
+    address: str,
+    lat: float,
+    lng: float,
+    concept: str,
+    score: float,
+    revenue_min_eur: int,
+    revenue_max_eur: int,
+    why: Tuple[str, ...]
+) -> Tuple[str, str, str, str]:
+    """Build (subject, body, mailto_link, gmail_url); pure, so repeat clicks hit the cache"""
+    subject = f"Seeking {concept} space near {address}"
+
+    head = "\n".join([
         "Hello,",
         "",
-        f"I'm exploring potential locations for a {request.concept} concept and came across this area through market analysis.",
+        f"I'm exploring potential locations for a {concept} concept and came across this area through market analysis.",
         "",
-        f"Target Address: {request.address}",
-        f"Location: {request.lat:.5f}, {request.lng:.5f}",
+        f"Target Address: {address}",
+        f"Location: {lat:.5f}, {lng:.5f}",
         "",
         "Our analysis shows this location has strong fundamentals:",
-    ]
-
-    # Add "why" bullets
-    for reason in request.why:
-        body_lines.append(f"• {reason}")
-
-    body_lines.extend([
+        *(f"• {reason}" for reason in why),
         "",
-        f"Market Score: {request.score:.1f}/100",
-        f"Projected Revenue: €{request.revenue_min_eur:,} - €{request.revenue_max_eur:,}/month",
+        f"Market Score: {score:.1f}/100",
+        f"Projected Revenue: €{revenue_min_eur:,} - €{revenue_max_eur:,}/month",
         "",
-        "I'm interested in learning about:",
-        "• Available commercial properties within 200m of this location",
-        "• Current asking rents and lease terms",
-        "• Any upcoming vacancies or off-market opportunities",
-        "",
-        "Would you be available for a brief call this week to discuss options in this area?",
-        "",
-        "Best regards"
+        ""
     ])
 
-    body = "\n".join(body_lines)
+    body = head + _PURSUE_FOOTER
 
     # URL-encode for mailto and Gmail
     subject_encoded = quote(subject)
-    body_encoded = quote(body)
+    body_encoded = quote(head) + _PURSUE_FOOTER_ENCODED
 
     # mailto: link (opens default email client)
     mailto_link = f"mailto:?subject={subject_encoded}&body={body_encoded}"
@@ -409,6 +391,27 @@ async def pursue_address(request: PursueRequest) -> PursueResponse:
     # Gmail URL (opens Gmail in browser with pre-filled draft)
     gmail_url = f"https://mail.google.com/mail/?view=cm&fs=1&su={subject_encoded}&body={body_encoded}"
 
+    return subject, body, mailto_link, gmail_url
+
+
+@router.post("/api/pursue")
+async def pursue_address(request: PursueRequest) -> PursueResponse:
+    """
+    Generate broker outreach email for a specific address
+
+    Returns mailto: link and Gmail URL with pre-filled email template
+    """
+    subject, body, mailto_link, gmail_url = _build_pursue_email(
+        request.address,
+        request.lat,
+        request.lng,
+        request.concept,
+        request.score,
+        request.revenue_min_eur,
+        request.revenue_max_eur,
+        tuple(request.why)
+    )
+
     logger.info(f"Generated pursue email for {request.address}")
 
     return PursueResponse(
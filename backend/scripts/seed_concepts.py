@@ -7,16 +7,25 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import functools
 import yaml
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
 from sqlalchemy.orm import sessionmaker
 from models.database import Base, Customer, Concept
 
 # Database URL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./spotlight.db")
 
+# libyaml's C loader when available; pure-Python SafeLoader otherwise
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+
+@functools.lru_cache(maxsize=1)
 def load_yaml_concepts():
-    """Load concepts from YAML file"""
+    """Load concepts from YAML file (parsed once per process)"""
     yaml_path = os.path.join(
         os.path.dirname(__file__), 
         "..", 
@@ -25,7 +34,7 @@ def load_yaml_concepts():
     )
     
     with open(yaml_path, "r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YamlLoader)
 
 
 def seed_concepts(session):
@@ -52,45 +61,48 @@ def seed_concepts(session):
     # Load YAML concepts
     yaml_concepts = load_yaml_concepts()
     
-    concepts_created = 0
+    # Existing system-default categories, fetched once for the whole loop
+    existing_categories = {
+        category for (category,) in session.query(Concept.category).filter(
+            Concept.customer_id == system_customer.id,
+            Concept.is_system_default == True
+        ).all()
+    }
+    
+    new_rows = []
     concepts_skipped = 0
     
     for category, config in yaml_concepts.items():
-        # Check if concept already exists
-        existing = session.query(Concept).filter(
-            Concept.customer_id == system_customer.id,
-            Concept.category == category,
-            Concept.is_system_default == True
-        ).first()
-        
-        if existing:
+        if category in existing_categories:
             print(f"⊗ Skipping {category} - already exists")
             concepts_skipped += 1
             continue
         
-        # Create concept from YAML
-        concept = Concept(
-            customer_id=system_customer.id,
-            name=config["name"],
-            category=category,
-            description=f"System default {config['name']} concept",
-            base_revenue_eur=config["base_revenue_eur"],
-            revenue_variance=0.2,  # Default ±20%
-            target_income_min=config["target_income_min"],
-            target_income_max=config["target_income_max"],
-            optimal_population_density=config["optimal_population_density"],
-            target_competitors_per_1k=config["target_competitors_per_1k"],
-            weights=config["weights"],
-            outcomes_count=0,
-            avg_prediction_error=None,
-            is_system_default=True,
-            is_active=True
-        )
-        
-        session.add(concept)
-        concepts_created += 1
+        # Concept row from YAML
+        new_rows.append({
+            "customer_id": system_customer.id,
+            "name": config["name"],
+            "category": category,
+            "description": f"System default {config['name']} concept",
+            "base_revenue_eur": config["base_revenue_eur"],
+            "revenue_variance": 0.2,  # Default ±20%
+            "target_income_min": config["target_income_min"],
+            "target_income_max": config["target_income_max"],
+            "optimal_population_density": config["optimal_population_density"],
+            "target_competitors_per_1k": config["target_competitors_per_1k"],
+            "weights": config["weights"],
+            "outcomes_count": 0,
+            "avg_prediction_error": None,
+            "is_system_default": True,
+            "is_active": True
+        })
         print(f"✓ Created concept: {category} ({config['name']})")
     
+    # One multi-row INSERT instead of per-object unit-of-work bookkeeping
+    if new_rows:
+        session.execute(insert(Concept), new_rows)
+    concepts_created = len(new_rows)
+    
     session.commit()
     
     print(f"\n{'='*60}")
@@ -103,7 +115,7 @@ def seed_concepts(session):
     all_concepts = session.query(Concept).all()
     print(f"\nTotal concepts in database: {len(all_concepts)}")
     for c in all_concepts:
-        print(f"  - {c.category}: {c.name} (ID: {c.id[:8]}...)")
+        print(f"  - {c.category}: {c.name} (ID: {str(c.id)[:8]}...)")
 
 
 def main():
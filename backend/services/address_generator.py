@@ -11,13 +11,201 @@ This service:
 """
 
 import asyncio
-from typing import List, Dict, Any, Tuple, Optional
-import aiohttp
-from math import radians, cos, sin, sqrt, atan2
+import functools
+from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple, Optional, Callable, Awaitable
+import httpx
+from math import sin
 import logging
+import zlib
+import numpy as np
+from cachetools import TTLCache
+from aiolimiter import AsyncLimiter
+from scipy.spatial import cKDTree
 
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_M = 6371000
+
+# Scoring weights (crime_penalty_cap is added per job when enabled)
+SCORE_WEIGHTS = {
+    'population': 0.28,
+    'income_fit': 0.22,
+    'transit_access': 0.20,
+    'competition_inverse': 0.15,
+    'traffic_access': 0.10,
+}
+
+# Provenance constants per scoring component: (source, raw_unit)
+_PROVENANCE_SOURCES = {
+    'population': ('Statistics Finland Population Grid 2025', 'people within 800m'),
+    'income_fit': ('PAAVO Postal Demographics', 'income bracket fit'),
+    'transit_access': ('Digitransit Finland API', 'meters to nearest metro'),
+    'competition_inverse': ('OpenStreetMap Overpass API', 'competitors within 1km'),
+    'traffic_access': ('Helsinki Traffic Analysis Model', 'daily traffic volume'),
+}
+
+
+def _provenance_component(
+    weights: Dict[str, float],
+    key: str,
+    component_score: float,
+    coverage: float,
+    raw_value: Any
+) -> Dict[str, Any]:
+    """One provenance entry: per-candidate numbers on top of the constant source/unit"""
+    weight = weights[key]
+    source, raw_unit = _PROVENANCE_SOURCES[key]
+    return {
+        'score': round(component_score, 1),
+        'weight': weight,
+        'weighted_score': round(component_score * weight, 1),
+        'source': source,
+        'coverage': coverage,
+        'raw_value': raw_value,
+        'raw_unit': raw_unit
+    }
+
+
+# Helsinki city center and neighborhoods with realistic population
+# (within 800m radius, Statistics Finland 2023 data)
+HELSINKI_POPULATION_AREAS = (
+    # Central Helsinki - Very high density
+    {'lat': 60.170, 'lng': 24.938, 'pop': 18000, 'name': 'Kamppi'},
+    {'lat': 60.169, 'lng': 24.945, 'pop': 16500, 'name': 'Kluuvi'},
+    {'lat': 60.163, 'lng': 24.940, 'pop': 15200, 'name': 'Punavuori'},
+
+    # Close to center - High density
+    {'lat': 60.158, 'lng': 24.933, 'pop': 14800, 'name': 'Eira'},
+    {'lat': 60.180, 'lng': 24.950, 'pop': 13500, 'name': 'Kallio'},
+    {'lat': 60.175, 'lng': 24.965, 'pop': 12000, 'name': 'Sörnäinen'},
+
+    # Inner city - Medium-high density
+    {'lat': 60.195, 'lng': 24.925, 'pop': 11500, 'name': 'Töölö'},
+    {'lat': 60.203, 'lng': 24.962, 'pop': 10800, 'name': 'Pasila'},
+    {'lat': 60.220, 'lng': 24.960, 'pop': 9500, 'name': 'Käpylä'},
+
+    # Suburban - Medium density
+    {'lat': 60.210, 'lng': 25.080, 'pop': 8200, 'name': 'Itäkeskus'},
+    {'lat': 60.225, 'lng': 25.040, 'pop': 7500, 'name': 'Malmi'},
+    {'lat': 60.160, 'lng': 24.880, 'pop': 8800, 'name': 'Lauttasaari'},
+)
+
+# Helsinki street names for mock addresses when reverse geocoding fails
+_MOCK_STREETS = (
+    "Mannerheimintie", "Aleksanterinkatu", "Esplanadi", "Fredrikinkatu",
+    "Bulevardi", "Lönnrotinkatu", "Annankatu", "Unioninkatu",
+    "Kaivokatu", "Mikonkatu", "Pohjoisesplanadi", "Eteläesplanadi"
+)
+_MOCK_STREETS_LEN = len(_MOCK_STREETS)
+
+# Only this many × limit candidates (best population-based upper bound) get fully scored
+SHORTLIST_FACTOR = 3
+
+# Component scores are cached on coordinates rounded to 4 decimals (~10m)
+def _score_key(lat: float, lng: float) -> Tuple[int, int]:
+    return (round(lat * 1e4), round(lng * 1e4))
+
+
+# Dedup re-indexes kept points into a kd-tree every this many acceptances
+DEDUP_TREE_BATCH = 64
+
+
+def _to_ecef(lat_deg: np.ndarray, lng_deg: np.ndarray) -> np.ndarray:
+    """Degrees → Earth-centered (x, y, z) meters on a sphere, shape (N, 3)"""
+    lat = np.radians(lat_deg)
+    lng = np.radians(lng_deg)
+    cos_lat = np.cos(lat)
+    return EARTH_RADIUS_M * np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def _chord_length(distance_m: float) -> float:
+    """Straight-line distance through the sphere for a great-circle distance"""
+    return 2 * EARTH_RADIUS_M * sin(distance_m / (2 * EARTH_RADIUS_M))
+
+
+# Candidates within 2km of a known area take that area's population
+POPULATION_MATCH_CHORD_M = _chord_length(2000)
+
+
+# Static population areas projected and indexed once at import; every
+# nearest-area lookup is a single kd-tree query with no per-call trig on the table
+_POP_AREAS_POP = np.array([a['pop'] for a in HELSINKI_POPULATION_AREAS])
+_POP_AREAS_TREE = cKDTree(_to_ecef(
+    np.array([a['lat'] for a in HELSINKI_POPULATION_AREAS]),
+    np.array([a['lng'] for a in HELSINKI_POPULATION_AREAS])
+))
+
+
+# main imports this module (via routes), so main's area loader is bound lazily on first use
+_get_helsinki_areas = None
+
+
+def _ensure_helsinki_loader():
+    global _get_helsinki_areas
+    if _get_helsinki_areas is None:
+        from main import _get_helsinki_areas as loader
+        _get_helsinki_areas = loader
+    return _get_helsinki_areas
+
+
+@functools.lru_cache(maxsize=64)
+def _compute_top_areas(city: str, top_n: int) -> Tuple[Dict[str, Any], ...]:
+    """
+    Top areas for a (lowercased) city; deterministic, so memoized.
+    The returned area dicts are shared between calls - treat them as read-only.
+    """
+    # For Helsinki, use predefined areas
+    if city in ['helsinki', 'espoo', 'vantaa']:
+        areas = _ensure_helsinki_loader()()
+
+        # Quick score each area (simplified for MVP)
+        # In production, this would call the full scoring engine
+        scored_areas = []
+        for area in areas:
+            # Placeholder scoring - in reality, call scorer.calculate_score
+            # crc32, unlike hash(), is stable across processes (PYTHONHASHSEED)
+            score = 70 + (zlib.crc32(area['name'].encode('utf-8')) % 30)  # Mock score 70-100
+            scored_areas.append({
+                'area_id': f"helsinki_{area['id']}",
+                'name': area['name'],
+                'lat': area['lat'],
+                'lng': area['lng'],
+                'score': score
+            })
+
+        scored_areas.sort(key=lambda x: x['score'], reverse=True)
+        return tuple(scored_areas[:top_n])
+
+    # For other cities, use postal codes
+    # This would query PAAVO to get all postal codes in the city
+    # For MVP, return empty (can extend later)
+    logger.warning(f"City {city} not supported for area discovery yet")
+    return ()
+
+
+@dataclass(slots=True)
+class Candidate:
+    """
+    Scored candidate address inside the pipeline
+    Slotted record instead of a dict; serialized once at the API boundary
+    """
+    address: str
+    lat: float
+    lng: float
+    area_id: Optional[str]
+    score: float
+    revenue_min_eur: int
+    revenue_max_eur: int
+    confidence: float
+    coverage: Dict[str, float]
+    why: List[str]
+    decision: str
+    decision_reasoning: str
+    provenance: Dict[str, Any]
+    metrics: Dict[str, Any]
+    rank: int = 0
+
 
 class AddressGenerator:
     """Generate and score candidate addresses for site selection"""
@@ -27,20 +215,57 @@ class AddressGenerator:
         statfin_service,
         population_grid_service,
         digitransit_service,
-        overpass_service=None
+        overpass_service=None,
+        http_client: Optional[httpx.AsyncClient] = None
     ):
         self.statfin = statfin_service
         self.pop_grid = population_grid_service
         self.digitransit = digitransit_service
         self.overpass_service = overpass_service
 
+        # One pooled keep-alive client for every upstream call this generator makes,
+        # shared with services that don't bring their own
+        self._owns_http = http_client is None
+        self.http = http_client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=8, keepalive_expiry=60),
+            timeout=10.0
+        )
+        for service in (self.digitransit, self.overpass_service, self.pop_grid, self.statfin):
+            if service is not None and getattr(service, 'client', False) is None:
+                service.client = self.http
+
+        # Shape the geocode fan-out: at most 8 in flight, at most 10 per second
+        self._digitransit_sem = asyncio.Semaphore(8)
+        self._digitransit_rate = AsyncLimiter(max_rate=10, time_period=1.0)
+
+        # Reverse geocodes keyed on coordinates rounded to 5 decimals
+        self._revgeo_cache: TTLCache = TTLCache(maxsize=10_000, ttl=86400)
+        self._revgeo_locks: Dict[Tuple[int, int], asyncio.Lock] = {}
+
+        # Component scores keyed on ~10m-rounded coordinates (+ concept for competition)
+        self._score_caches: Dict[str, TTLCache] = {
+            name: TTLCache(maxsize=50_000, ttl=3600) for name in ('population', 'competition', 'transit')
+        }
+        self._score_locks: Dict[str, Dict[Tuple, asyncio.Lock]] = {name: {} for name in self._score_caches}
+
+    async def aclose(self):
+        """Close the shared HTTP client if this generator created it"""
+        if self._owns_http:
+            await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
     async def generate_candidates(
         self,
         city: str,
         concept: str,
         limit: int = 10,
         include_crime: bool = False
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Candidate]:
         """
         Generate top N address candidates for a city+concept
 
@@ -51,7 +276,7 @@ class AddressGenerator:
             include_crime: Whether to include crime penalty
 
         Returns:
-            List of scored addresses with full details
+            List of scored Candidate records, ranked
         """
         logger.info(f"Generating {limit} candidates for {concept} in {city}")
 
@@ -63,26 +288,35 @@ class AddressGenerator:
             logger.warning(f"No areas found for {city}")
             return []
 
-        # Step 2: For each area, generate address candidates
-        all_candidates = []
-        for area in top_areas:
-            candidates = await self._generate_candidates_for_area(
-                area=area,
-                concept=concept,
-                include_crime=include_crime
-            )
-            all_candidates.extend(candidates)
+        # Step 2: Locate address candidates for all areas concurrently
+        per_area = await asyncio.gather(*[self._locate_candidates_for_area(area) for area in top_areas])
+        located = [c for candidates in per_area for c in candidates]
+
+        # Step 3: Score the cheap local population component for everyone, then fetch
+        # remote data and fully score only the shortlist that can still reach the top N
+        pop_datas = await asyncio.gather(*[self._safe_population_score(lat, lng) for (lat, lng), _, _ in located])
+        shortlist = self._shortlist(pop_datas, limit * SHORTLIST_FACTOR)
+        located = [located[i] for i in shortlist]
+        pop_datas = [pop_datas[i] for i in shortlist]
 
-        # Step 3: Deduplicate by 80m distance
+        score_datas = await self._score_candidates(located, pop_datas, concept, include_crime)
+
+        all_candidates = [
+            Candidate(address=address, lat=p_lat, lng=p_lng, area_id=area_id, **score_data)
+            for ((p_lat, p_lng), address, area_id), score_data in zip(located, score_datas)
+            if score_data
+        ]
+
+        # Step 4: Deduplicate by 80m distance
         deduped = self._deduplicate_by_distance(all_candidates, min_distance_m=80)
 
-        # Step 4: Sort by score and take top N
-        deduped.sort(key=lambda x: x['score'], reverse=True)
+        # Step 5: Sort by score and take top N
+        deduped.sort(key=lambda c: c.score, reverse=True)
         top_n = deduped[:limit]
 
-        # Step 5: Add ranking
+        # Step 6: Add ranking
         for i, addr in enumerate(top_n):
-            addr['rank'] = i + 1
+            addr.rank = i + 1
 
         logger.info(f"Generated {len(top_n)} final candidates (from {len(all_candidates)} before dedup)")
         return top_n
@@ -97,91 +331,76 @@ class AddressGenerator:
         Get top scoring areas (postal codes or predefined tiles)
         Reuses logic from /api/discover
         """
-        # For Helsinki, use predefined areas
-        if city.lower() in ['helsinki', 'espoo', 'vantaa']:
-            from main import _get_helsinki_areas  # Import from main
-            areas = _get_helsinki_areas()
-
-            # Quick score each area (simplified for MVP)
-            # In production, this would call the full scoring engine
-            scored_areas = []
-            for area in areas:
-                # Placeholder scoring - in reality, call scorer.calculate_score
-                score = 70 + (hash(area['name']) % 30)  # Mock score 70-100
-                scored_areas.append({
-                    'area_id': f"helsinki_{area['id']}",
-                    'name': area['name'],
-                    'lat': area['lat'],
-                    'lng': area['lng'],
-                    'score': score
-                })
-
-            scored_areas.sort(key=lambda x: x['score'], reverse=True)
-            return scored_areas[:top_n]
-
-        # For other cities, use postal codes
-        # This would query PAAVO to get all postal codes in the city
-        # For MVP, return empty (can extend later)
-        logger.warning(f"City {city} not supported for area discovery yet")
-        return []
-
-    async def _generate_candidates_for_area(
+        # TODO: add concept to the cache key once real per-concept scoring replaces the mock
+        return list(_compute_top_areas(city.lower(), top_n))
+
+    async def _locate_candidates_for_area(
         self,
-        area: Dict[str, Any],
-        concept: str,
-        include_crime: bool = False
-    ) -> List[Dict[str, Any]]:
+        area: Dict[str, Any]
+    ) -> List[Tuple[Tuple[float, float], str, Optional[str]]]:
         """
-        Generate candidate addresses within a single area
+        Locate candidate addresses within a single area as ((lat, lng), address, area_id)
 
         Strategy:
         1. Query OSM for commercial streets in area
         2. Sample points along streets every 70m
         3. Reverse geocode each point
-        4. Score each address
         """
         lat, lng = area['lat'], area['lng']
 
         # For MVP, generate sample points in a grid around the area center
         # In production, this would query OSM Overpass for actual streets
-        candidates = []
 
         # Generate a 3x3 grid of points within ~400m of center (reduced for speed)
         offsets = [-0.003, 0, 0.003]  # ~300m spacing at lat 60
+        points = [(lat + lat_offset, lng + lng_offset) for lat_offset in offsets for lng_offset in offsets]
 
-        for lat_offset in offsets:
-            for lng_offset in offsets:
-                candidate_lat = lat + lat_offset
-                candidate_lng = lng + lng_offset
-
-                # Reverse geocode to get address
-                address = await self._reverse_geocode(candidate_lat, candidate_lng)
-
-                if not address:
-                    continue
-
-                # Score this candidate
-                score_data = await self._score_candidate(
-                    lat=candidate_lat,
-                    lng=candidate_lng,
-                    address=address,
-                    concept=concept,
-                    include_crime=include_crime
-                )
-
-                if score_data:
-                    candidates.append({
-                        'address': address,
-                        'lat': candidate_lat,
-                        'lng': candidate_lng,
-                        'area_id': area.get('area_id'),
-                        **score_data
-                    })
-
-        logger.info(f"Generated {len(candidates)} candidates for {area['name']}")
-        return candidates
+        # Reverse geocode every point at once, keep the ones with an address
+        addresses = await asyncio.gather(*[self._reverse_geocode(p_lat, p_lng) for p_lat, p_lng in points])
+        area_id = area.get('area_id')
+        located = [(point, address, area_id) for point, address in zip(points, addresses) if address]
+
+        logger.info(f"Located {len(located)} candidates for {area['name']}")
+        return located
 
     async def _reverse_geocode(self, lat: float, lng: float) -> Optional[str]:
+        """
+        Reverse geocode coordinates to get street address, cached on ~1m-rounded
+        coordinates. Concurrent lookups for the same key share one request.
+        """
+        key = (round(lat * 1e5), round(lng * 1e5))
+        return await self._cached(
+            self._revgeo_cache, self._revgeo_locks, key,
+            lambda: self._reverse_geocode_uncached(lat, lng)
+        )
+
+    @staticmethod
+    async def _cached(cache: TTLCache, locks: Dict, key: Any, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Serve `key` from `cache`, otherwise await `fetch()` and store it.
+        Concurrent misses for the same key wait on one lock and share the result.
+        """
+        if key in cache:
+            return cache[key]
+
+        lock = locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another waiter may have filled it while we queued on the lock
+                if key in cache:
+                    return cache[key]
+                value = await fetch()
+                cache[key] = value
+        finally:
+            locks.pop(key, None)
+
+        return value
+
+    def _cached_score(self, name: str, key: Tuple, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Awaitable[Dict[str, Any]]:
+        """Component score `name` cached under `key` (quantized coordinates, plus concept where relevant)"""
+        return self._cached(self._score_caches[name], self._score_locks[name], key, fetch)
+
+    async def _reverse_geocode_uncached(self, lat: float, lng: float) -> Optional[str]:
         """
         Reverse geocode coordinates to get street address
         Uses Digitransit Pelias reverse geocoding
@@ -189,8 +408,9 @@ class AddressGenerator:
         MVP: Falls back to mock address generation if Digitransit unavailable
         """
         try:
-            # Call Digitransit reverse geocode
-            result = await self.digitransit.reverse_geocode(lat, lng)
+            # Call Digitransit reverse geocode; the slot is held only for the request itself
+            async with self._digitransit_sem, self._digitransit_rate:
+                result = await self.digitransit.reverse_geocode(lat, lng)
 
             if result and 'features' in result and len(result['features']) > 0:
                 feature = result['features'][0]
@@ -222,35 +442,130 @@ class AddressGenerator:
         Generate a mock address for MVP when reverse geocoding fails
         Uses lat/lng to create deterministic address
         """
-        # Helsinki street names
-        streets = [
-            "Mannerheimintie", "Aleksanterinkatu", "Esplanadi", "Fredrikinkatu",
-            "Bulevardi", "Lönnrotinkatu", "Annankatu", "Unioninkatu",
-            "Kaivokatu", "Mikonkatu", "Pohjoisesplanadi", "Eteläesplanadi"
-        ]
-
         # Use lat/lng to deterministically select street
-        street_idx = int((lat + lng) * 1000) % len(streets)
-        street = streets[street_idx]
+        street = _MOCK_STREETS[int((lat + lng) * 1000) % _MOCK_STREETS_LEN]
 
         # Generate house number from coordinates
         house_num = int(abs(lat - 60.1) * 1000) % 99 + 1
 
         # Mock postal code (Helsinki range 00100-00990)
-        postal = f"00{100 + (int(lng * 1000) % 890)}"
+        postal = "%05d" % (100 + int(lng * 1000) % 890)
 
         return f"{street} {house_num}, {postal} Helsinki"
 
-    async def _score_candidate(
+    async def _safe_population_score(self, lat: float, lng: float) -> Dict[str, Any]:
+        """Population score for one point, with the same fallback as the remote components"""
+        try:
+            return await self._cached_score(
+                'population', _score_key(lat, lng),
+                lambda: self._get_population_score(lat, lng)
+            )
+        except Exception as e:
+            logger.error(f"Population score failed: {e}")
+            return {'score': 50, 'population': 0}
+
+    @staticmethod
+    def _score_upper_bound(pop_scores: np.ndarray) -> np.ndarray:
+        """Best reachable total for each candidate knowing only its population score"""
+        return (
+            pop_scores * SCORE_WEIGHTS['population'] +
+            100 * (1 - SCORE_WEIGHTS['population'])
+        )
+
+    def _shortlist(self, pop_datas: List[Dict[str, Any]], size: int) -> List[int]:
+        """
+        Indices (in original order) of the `size` candidates with the highest score
+        upper bound - the only ones worth fetching remote data for
+        """
+        if len(pop_datas) <= size:
+            return list(range(len(pop_datas)))
+
+        bounds = self._score_upper_bound(
+            np.fromiter((d.get('score', 50) for d in pop_datas), dtype=np.float64, count=len(pop_datas))
+        )
+        # Stable sort keeps ties in discovery order
+        return sorted(np.argsort(-bounds, kind='stable')[:size].tolist())
+
+    async def _collect_candidate_data(
         self,
         lat: float,
         lng: float,
-        address: str,
+        concept: str
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Fetch competition and transit data for one point (with fallbacks)"""
+        key = _score_key(lat, lng)
+        results = await asyncio.gather(
+            self._cached_score('competition', (*key, concept), lambda: self._get_competition_score(lat, lng, concept)),
+            self._cached_score('transit', key, lambda: self._get_transit_score(lat, lng)),
+            return_exceptions=True
+        )
+
+        comp_data, transit_data = results
+
+        # Handle any exceptions
+        if isinstance(comp_data, Exception):
+            logger.error(f"Competition score failed: {comp_data}")
+            comp_data = {'score': 50, 'competitors': 0}
+        if isinstance(transit_data, Exception):
+            logger.error(f"Transit score failed: {transit_data}")
+            transit_data = {'score': 50}
+
+        return comp_data, transit_data
+
+    @staticmethod
+    def _score_batch(
+        pop_scores: np.ndarray,
+        comp_scores: np.ndarray,
+        transit_scores: np.ndarray,
+        pop_cov: np.ndarray,
+        comp_cov: np.ndarray,
+        transit_cov: np.ndarray,
+        income_score: float = 70,
+        traffic_score: float = 60
+    ) -> Dict[str, np.ndarray]:
+        """
+        Weighted score, revenue band, confidence and decision for N candidates at once
+        Same arithmetic (and operation order) as the per-candidate formula
+        """
+        score = (
+            pop_scores * SCORE_WEIGHTS['population'] +
+            comp_scores * SCORE_WEIGHTS['competition_inverse'] +
+            transit_scores * SCORE_WEIGHTS['transit_access'] +
+            income_score * SCORE_WEIGHTS['income_fit'] +
+            traffic_score * SCORE_WEIGHTS['traffic_access']
+        )
+
+        # Revenue estimation (simplified)
+        base_revenue = 150000  # EUR/month baseline
+        revenue_min = (base_revenue * (score / 100) * 0.65).astype(np.int64)
+        revenue_max = (base_revenue * (score / 100) * 1.20).astype(np.int64)
+
+        # Confidence based on data completeness
+        confidence = np.minimum(0.5 + (pop_cov * 0.2) + (comp_cov * 0.2) + (transit_cov * 0.1), 0.95)
+
+        # Decision logic
+        decision = np.where(
+            (score >= 85) & (confidence >= 0.80), "MAKE_OFFER",
+            np.where((score >= 70) & (confidence >= 0.65), "NEGOTIATE", "PASS")
+        )
+
+        return {
+            'score': score,
+            'revenue_min': revenue_min,
+            'revenue_max': revenue_max,
+            'confidence': confidence,
+            'decision': decision
+        }
+
+    async def _score_candidates(
+        self,
+        located: List[Tuple[Tuple[float, float], str, Optional[str]]],
+        pop_datas: List[Dict[str, Any]],
         concept: str,
         include_crime: bool = False
-    ) -> Optional[Dict[str, Any]]:
+    ) -> List[Optional[Dict[str, Any]]]:
         """
-        Score a candidate address using all available data sources
+        Score located candidates ((lat, lng), address, area_id) using all available data sources
 
         Metrics:
         - Population within 800m
@@ -260,178 +575,130 @@ class AddressGenerator:
         - Traffic counts (if available)
         - Rent band (if available)
         - Crime penalty (optional, capped at 5%)
+
+        Population data is computed up front by the caller; the remote data is
+        fetched concurrently, the numeric scoring runs as one NumPy batch, and
+        only the JSON payloads are built per candidate.
         """
-        try:
-            # Parallel data collection
-            tasks = [
-                self._get_population_score(lat, lng),
-                self._get_competition_score(lat, lng, concept),
-                self._get_transit_score(lat, lng),
-            ]
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            pop_data, comp_data, transit_data = results
-
-            # Handle any exceptions
-            if isinstance(pop_data, Exception):
-                logger.error(f"Population score failed: {pop_data}")
-                pop_data = {'score': 50, 'population': 0}
-            if isinstance(comp_data, Exception):
-                logger.error(f"Competition score failed: {comp_data}")
-                comp_data = {'score': 50, 'competitors': 0}
-            if isinstance(transit_data, Exception):
-                logger.error(f"Transit score failed: {transit_data}")
-                transit_data = {'score': 50}
-
-            # Calculate weighted score
-            weights = {
-                'population': 0.28,
-                'income_fit': 0.22,
-                'transit_access': 0.20,
-                'competition_inverse': 0.15,
-                'traffic_access': 0.10,
-                'crime_penalty_cap': 0.05 if include_crime else 0.0
-            }
+        if not located:
+            return []
 
-            # Individual component scores (for provenance)
-            pop_score = pop_data['score']
-            comp_score = comp_data['score']
-            transit_score = transit_data['score']
-            income_score = 70  # Placeholder
-            traffic_score = 60  # Placeholder
-
-            score = (
-                pop_score * weights['population'] +
-                comp_score * weights['competition_inverse'] +
-                transit_score * weights['transit_access'] +
-                income_score * weights['income_fit'] +
-                traffic_score * weights['traffic_access']
-            )
+        remote = await asyncio.gather(*[
+            self._collect_candidate_data(lat, lng, concept) for (lat, lng), _, _ in located
+        ])
+        data = [(pop_data, *remote_data) for pop_data, remote_data in zip(pop_datas, remote)]
+        n = len(data)
 
-            # Revenue estimation (simplified)
-            base_revenue = 150000  # EUR/month baseline
-            revenue_min = int(base_revenue * (score / 100) * 0.65)
-            revenue_max = int(base_revenue * (score / 100) * 1.20)
-
-            # Confidence based on data completeness
-            pop_coverage = pop_data.get('coverage', 0.5)
-            comp_coverage = comp_data.get('coverage', 0.5)
-            transit_coverage = transit_data.get('coverage', 0.5)
-
-            confidence = min(
-                0.5 + (pop_coverage * 0.2) +
-                (comp_coverage * 0.2) +
-                (transit_coverage * 0.1),
-                0.95
-            )
+        def column(idx: int, key: str, default: float) -> np.ndarray:
+            return np.fromiter((d[idx].get(key, default) for d in data), dtype=np.float64, count=n)
 
-            # Build confidence explanation
-            confidence_basis = (
-                f"Based on data coverage: demographics {int(pop_coverage*100)}%, "
-                f"competition {int(comp_coverage*100)}%, "
-                f"transit {int(transit_coverage*100)}%"
-            )
+        pop_scores, comp_scores, transit_scores = (column(i, 'score', 50) for i in range(3))
+        pop_cov, comp_cov, transit_cov = (column(i, 'coverage', 0.5) for i in range(3))
 
-            # Generate "why" bullets
-            why = []
-            if pop_data.get('population'):
-                why.append(f"Pop ~{pop_data['population']//1000}k within 800 m")
-            if transit_data.get('nearest_metro_m'):
-                why.append(f"Metro {transit_data['nearest_metro_m']} m")
-            if comp_data.get('per_1k'):
-                why.append(f"Competitors {comp_data['per_1k']:.1f}/1k")
-
-            # Decision logic
-            if score >= 85 and confidence >= 0.80:
-                decision = "MAKE_OFFER"
-                decision_reasoning = f"Strong site: score {score:.1f}/100 (target ≥85) with {int(confidence*100)}% confidence (target ≥80%)"
-            elif score >= 70 and confidence >= 0.65:
-                decision = "NEGOTIATE"
-                decision_reasoning = f"Moderate site: score {score:.1f}/100 (target ≥70) with {int(confidence*100)}% confidence (target ≥65%). Negotiate favorable terms."
-            else:
-                decision = "PASS"
-                decision_reasoning = f"Below threshold: score {score:.1f}/100 (need ≥70) or confidence {int(confidence*100)}% (need ≥65%). Higher-scoring locations available."
-
-            # Build provenance object
-            provenance = {
-                'population': {
-                    'score': round(pop_score, 1),
-                    'weight': weights['population'],
-                    'weighted_score': round(pop_score * weights['population'], 1),
-                    'source': 'Statistics Finland Population Grid 2025',
-                    'coverage': pop_coverage,
-                    'raw_value': pop_data.get('population'),
-                    'raw_unit': 'people within 800m'
-                },
-                'income_fit': {
-                    'score': round(income_score, 1),
-                    'weight': weights['income_fit'],
-                    'weighted_score': round(income_score * weights['income_fit'], 1),
-                    'source': 'PAAVO Postal Demographics',
-                    'coverage': 0.5,
-                    'raw_value': None,
-                    'raw_unit': 'income bracket fit'
-                },
-                'transit_access': {
-                    'score': round(transit_score, 1),
-                    'weight': weights['transit_access'],
-                    'weighted_score': round(transit_score * weights['transit_access'], 1),
-                    'source': 'Digitransit Finland API',
-                    'coverage': transit_coverage,
-                    'raw_value': transit_data.get('nearest_metro_m'),
-                    'raw_unit': 'meters to nearest metro'
-                },
-                'competition_inverse': {
-                    'score': round(comp_score, 1),
-                    'weight': weights['competition_inverse'],
-                    'weighted_score': round(comp_score * weights['competition_inverse'], 1),
-                    'source': 'OpenStreetMap Overpass API',
-                    'coverage': comp_coverage,
-                    'raw_value': comp_data.get('competitors', 0),
-                    'raw_unit': 'competitors within 1km'
-                },
-                'traffic_access': {
-                    'score': round(traffic_score, 1),
-                    'weight': weights['traffic_access'],
-                    'weighted_score': round(traffic_score * weights['traffic_access'], 1),
-                    'source': 'Helsinki Traffic Analysis Model',
-                    'coverage': 0.0,
-                    'raw_value': None,
-                    'raw_unit': 'daily traffic volume'
-                },
-                'total_score': round(score, 1),
-                'confidence_basis': confidence_basis
-            }
+        batch = self._score_batch(pop_scores, comp_scores, transit_scores, pop_cov, comp_cov, transit_cov)
 
-            return {
-                'score': round(score, 1),
-                'revenue_min_eur': revenue_min,
-                'revenue_max_eur': revenue_max,
-                'confidence': round(confidence, 2),
-                'coverage': {
-                    'demo': pop_data.get('coverage', 0.5),
-                    'comp': comp_data.get('coverage', 0.5),
-                    'access': transit_data.get('coverage', 0.5),
-                    'traffic': 0.0,  # Placeholder
-                    'rent': 0.0,  # Placeholder
-                    'crime': 0.0
-                },
-                'why': why,
-                'decision': decision,
-                'decision_reasoning': decision_reasoning,
-                'provenance': provenance,
-                'metrics': {
-                    'population': pop_data.get('population', 0),
-                    'competitors': comp_data.get('competitors', 0),
-                    'nearest_metro_m': transit_data.get('nearest_metro_m'),
-                    'nearest_tram_m': transit_data.get('nearest_tram_m')
-                }
-            }
+        weights = {**SCORE_WEIGHTS, 'crime_penalty_cap': 0.05 if include_crime else 0.0}
 
-        except Exception as e:
-            logger.error(f"Scoring failed for {address}: {e}")
-            return None
+        results = []
+        for i, (_, address, _) in enumerate(located):
+            try:
+                results.append(self._candidate_payload(
+                    *data[i],
+                    score=float(batch['score'][i]),
+                    revenue_min=int(batch['revenue_min'][i]),
+                    revenue_max=int(batch['revenue_max'][i]),
+                    confidence=float(batch['confidence'][i]),
+                    decision=str(batch['decision'][i]),
+                    weights=weights
+                ))
+            except Exception as e:
+                logger.error(f"Scoring failed for {address}: {e}")
+                results.append(None)
+
+        return results
+
+    @staticmethod
+    def _candidate_payload(
+        pop_data: Dict[str, Any],
+        comp_data: Dict[str, Any],
+        transit_data: Dict[str, Any],
+        score: float,
+        revenue_min: int,
+        revenue_max: int,
+        confidence: float,
+        decision: str,
+        weights: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """Build the per-candidate response dict (why, reasoning, provenance) from batch results"""
+        # Individual component scores (for provenance)
+        pop_score = pop_data['score']
+        comp_score = comp_data['score']
+        transit_score = transit_data['score']
+        income_score = 70  # Placeholder
+        traffic_score = 60  # Placeholder
+
+        pop_coverage = pop_data.get('coverage', 0.5)
+        comp_coverage = comp_data.get('coverage', 0.5)
+        transit_coverage = transit_data.get('coverage', 0.5)
+
+        # Build confidence explanation
+        confidence_basis = (
+            f"Based on data coverage: demographics {int(pop_coverage*100)}%, "
+            f"competition {int(comp_coverage*100)}%, "
+            f"transit {int(transit_coverage*100)}%"
+        )
+
+        # Generate "why" bullets
+        why = []
+        if pop_data.get('population'):
+            why.append(f"Pop ~{pop_data['population']//1000}k within 800 m")
+        if transit_data.get('nearest_metro_m'):
+            why.append(f"Metro {transit_data['nearest_metro_m']} m")
+        if comp_data.get('per_1k'):
+            why.append(f"Competitors {comp_data['per_1k']:.1f}/1k")
+
+        if decision == "MAKE_OFFER":
+            decision_reasoning = f"Strong site: score {score:.1f}/100 (target ≥85) with {int(confidence*100)}% confidence (target ≥80%)"
+        elif decision == "NEGOTIATE":
+            decision_reasoning = f"Moderate site: score {score:.1f}/100 (target ≥70) with {int(confidence*100)}% confidence (target ≥65%). Negotiate favorable terms."
+        else:
+            decision_reasoning = f"Below threshold: score {score:.1f}/100 (need ≥70) or confidence {int(confidence*100)}% (need ≥65%). Higher-scoring locations available."
+
+        # Build provenance object
+        provenance = {
+            'population': _provenance_component(weights, 'population', pop_score, pop_coverage, pop_data.get('population')),
+            'income_fit': _provenance_component(weights, 'income_fit', income_score, 0.5, None),
+            'transit_access': _provenance_component(weights, 'transit_access', transit_score, transit_coverage, transit_data.get('nearest_metro_m')),
+            'competition_inverse': _provenance_component(weights, 'competition_inverse', comp_score, comp_coverage, comp_data.get('competitors', 0)),
+            'traffic_access': _provenance_component(weights, 'traffic_access', traffic_score, 0.0, None),
+            'total_score': round(score, 1),
+            'confidence_basis': confidence_basis
+        }
+
+        return {
+            'score': round(score, 1),
+            'revenue_min_eur': revenue_min,
+            'revenue_max_eur': revenue_max,
+            'confidence': round(confidence, 2),
+            'coverage': {
+                'demo': pop_data.get('coverage', 0.5),
+                'comp': comp_data.get('coverage', 0.5),
+                'access': transit_data.get('coverage', 0.5),
+                'traffic': 0.0,  # Placeholder
+                'rent': 0.0,  # Placeholder
+                'crime': 0.0
+            },
+            'why': why,
+            'decision': decision,
+            'decision_reasoning': decision_reasoning,
+            'provenance': provenance,
+            'metrics': {
+                'population': pop_data.get('population', 0),
+                'competitors': comp_data.get('competitors', 0),
+                'nearest_metro_m': transit_data.get('nearest_metro_m'),
+                'nearest_tram_m': transit_data.get('nearest_tram_m')
+            }
+        }
 
     async def _get_population_score(self, lat: float, lng: float) -> Dict[str, Any]:
         """Get population within 800m and calculate score"""
@@ -455,43 +722,13 @@ class AddressGenerator:
         Hardcoded population density for Helsinki areas (within 800m radius)
         Based on Statistics Finland 2023 data
         """
-        # Helsinki city center and neighborhoods with realistic population
-        areas = [
-            # Central Helsinki - Very high density
-            {'lat': 60.170, 'lng': 24.938, 'pop': 18000, 'name': 'Kamppi'},
-            {'lat': 60.169, 'lng': 24.945, 'pop': 16500, 'name': 'Kluuvi'},
-            {'lat': 60.163, 'lng': 24.940, 'pop': 15200, 'name': 'Punavuori'},
-            
-            # Close to center - High density
-            {'lat': 60.158, 'lng': 24.933, 'pop': 14800, 'name': 'Eira'},
-            {'lat': 60.180, 'lng': 24.950, 'pop': 13500, 'name': 'Kallio'},
-            {'lat': 60.175, 'lng': 24.965, 'pop': 12000, 'name': 'Sörnäinen'},
-            
-            # Inner city - Medium-high density
-            {'lat': 60.195, 'lng': 24.925, 'pop': 11500, 'name': 'Töölö'},
-            {'lat': 60.203, 'lng': 24.962, 'pop': 10800, 'name': 'Pasila'},
-            {'lat': 60.220, 'lng': 24.960, 'pop': 9500, 'name': 'Käpylä'},
-            
-            # Suburban - Medium density
-            {'lat': 60.210, 'lng': 25.080, 'pop': 8200, 'name': 'Itäkeskus'},
-            {'lat': 60.225, 'lng': 25.040, 'pop': 7500, 'name': 'Malmi'},
-            {'lat': 60.160, 'lng': 24.880, 'pop': 8800, 'name': 'Lauttasaari'},
-        ]
-        
-        # Find closest area (within ~2km)
-        min_dist = float('inf')
-        closest_pop = 8000  # Default for areas not in list
-        
-        for area in areas:
-            dist = self._haversine_distance(lat, lng, area['lat'], area['lng'])
-            if dist < min_dist:
-                min_dist = dist
-                closest_pop = area['pop']
+        # Find closest area: 1-NN on the prebuilt kd-tree
+        chord, idx = _POP_AREAS_TREE.query(_to_ecef(np.array([lat]), np.array([lng]))[0], k=1)
         
         # If within 2km of a known area, use that population
         # Otherwise use default (8000 for suburban Helsinki)
-        if min_dist < 2.0:
-            return closest_pop
+        if chord < POPULATION_MATCH_CHORD_M:
+            return int(_POP_AREAS_POP[idx])
         return 8000
 
     async def _get_competition_score(
@@ -538,9 +775,9 @@ class AddressGenerator:
 
     def _deduplicate_by_distance(
         self,
-        candidates: List[Dict[str, Any]],
+        candidates: List[Candidate],
         min_distance_m: float = 80
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Candidate]:
         """
         Remove candidates that are too close together
         Keeps highest scoring candidate in each cluster
@@ -549,37 +786,40 @@ class AddressGenerator:
             return []
 
         # Sort by score descending
-        sorted_candidates = sorted(candidates, key=lambda x: x['score'], reverse=True)
+        sorted_candidates = sorted(candidates, key=lambda c: c.score, reverse=True)
+        n = len(sorted_candidates)
+
+        xyz = _to_ecef(
+            np.fromiter((c.lat for c in sorted_candidates), dtype=np.float64, count=n),
+            np.fromiter((c.lng for c in sorted_candidates), dtype=np.float64, count=n)
+        )
+        # Straight-line (chord) length equivalent to the great-circle threshold
+        chord = _chord_length(min_distance_m)
+
+        # Kept points: the first tree_count are indexed in `tree`, the rest
+        # (fewer than DEDUP_TREE_BATCH) are checked brute-force until the next rebuild
+        kept_xyz = np.empty((n, 3))
+        kept_count = 0
+        tree = None
+        tree_count = 0
 
         kept = []
-        for candidate in sorted_candidates:
-            # Check if too close to any kept candidate
-            too_close = False
-            for kept_candidate in kept:
-                dist = self._haversine_distance(
-                    candidate['lat'], candidate['lng'],
-                    kept_candidate['lat'], kept_candidate['lng']
-                )
-                if dist < min_distance_m:
-                    too_close = True
-                    break
-
-            if not too_close:
-                kept.append(candidate)
+        for i, candidate in enumerate(sorted_candidates):
+            point = xyz[i]
 
-        return kept
+            if tree is not None and tree.query(point, distance_upper_bound=chord)[0] < chord:
+                continue
 
-    @staticmethod
-    def _haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-        """Calculate distance between two points in meters"""
-        R = 6371000  # Earth radius in meters
+            pending = kept_xyz[tree_count:kept_count]
+            if len(pending) and ((pending - point) ** 2).sum(axis=1).min() < chord * chord:
+                continue
 
-        lat1_rad = radians(lat1)
-        lat2_rad = radians(lat2)
-        delta_lat = radians(lat2 - lat1)
-        delta_lng = radians(lng2 - lng1)
+            kept_xyz[kept_count] = point
+            kept_count += 1
+            kept.append(candidate)
 
-        a = sin(delta_lat/2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lng/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
+            if kept_count - tree_count >= DEDUP_TREE_BATCH:
+                tree = cKDTree(kept_xyz[:kept_count])
+                tree_count = kept_count
 
-        return R * c
+        return kept
@@ -0,0 +1,52 @@
+"""
+Concept Cache - cached concept API bodies and their invalidation
+
+Concepts change through the concepts routes (create/update/delete) and through
+outcome learning (ConceptLearner updates counts, weights, base revenue and
+error), so every writer calls invalidate_concept_cache after it commits.
+"""
+
+import threading
+from typing import Optional
+from uuid import UUID
+from cachetools import TTLCache
+
+from services.response_cache import response_cache, CacheTTL
+
+LIST_CACHE_PREFIX = "concepts:list:"
+
+# Per-process cache for hot single-concept reads, used only when Redis is not
+# configured: invalidation can only reach this process's copy, so with several
+# workers behind Redis an L1 would keep serving edited/deleted concepts.
+# Handlers run in the threadpool and TTLCache isn't thread-safe, hence the lock.
+_concept_cache: TTLCache = TTLCache(maxsize=512, ttl=CacheTTL.NORMAL)
+_concept_cache_lock = threading.Lock()
+
+
+def item_cache_key(concept_id: UUID) -> str:
+    return f"concepts:item:{concept_id}"
+
+
+def get_local(concept_id: UUID) -> Optional[bytes]:
+    """Serialized concept from this process's L1, if present (never with Redis)"""
+    if response_cache.client is not None:
+        return None
+    with _concept_cache_lock:
+        return _concept_cache.get(concept_id)
+
+
+def set_local(concept_id: UUID, body: bytes) -> None:
+    if response_cache.client is not None:
+        return
+    with _concept_cache_lock:
+        _concept_cache[concept_id] = body
+
+
+def invalidate_concept_cache(*concept_ids: UUID) -> None:
+    """Drop cached list pages (and the given concepts) after a write"""
+    response_cache.delete_prefix(LIST_CACHE_PREFIX)
+    if concept_ids:
+        with _concept_cache_lock:
+            for concept_id in concept_ids:
+                _concept_cache.pop(concept_id, None)
+        response_cache.delete(*map(item_cache_key, concept_ids))
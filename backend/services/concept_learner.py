@@ -12,12 +12,55 @@ After 10+ outcomes: Concept becomes increasingly accurate for that customer
 After 100+ outcomes: Concept is highly tuned to customer's specific unit economics
 """
 
+from sqlalchemy import case, func, select, update
 from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional
-from datetime import datetime
-import statistics
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+from datetime import datetime, timezone
+import math
+from collections import defaultdict
+import copy
+import numpy as np
 
 from models.database import Concept, ConceptTrainingOutcome, Prediction
+from models.db_init import bulk_insert
+from services.concept_cache import invalidate_concept_cache
+
+
+# Learnable weight factors: (name, feature snapshot key, default when missing)
+FEATURE_SOURCES = (
+    ("population", "population_density", 0),
+    ("income", "median_income", 0),
+    ("access", "nearest_metro_distance_m", 1000),  # Stored as inverse distance
+    ("competition", "competitors_per_1k_residents", 0),
+    ("walkability", "walkability_poi_count", 0),
+)
+FEATURE_NAMES = tuple(name for name, _, _ in FEATURE_SOURCES)
+_ACCESS_COLUMN = FEATURE_NAMES.index("access")
+
+# Bump when the running_stats layout changes; stale stats are rebuilt from history
+RUNNING_STATS_VERSION = 3
+
+# Ridge penalty on the standardized (correlation-scale) normal equations
+RIDGE_LAMBDA = 1e-3
+
+
+def _feature_matrix(snapshots: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    (N, features) float64 matrix from prediction feature snapshots, built one
+    column at a time; explicit nulls become NaN
+    """
+    n = len(snapshots)
+    matrix = np.column_stack([
+        np.fromiter(
+            (np.nan if (v := f.get(key, default)) is None else v for f in snapshots),
+            dtype=np.float64,
+            count=n
+        )
+        for _, key, default in FEATURE_SOURCES
+    ])
+    matrix[:, _ACCESS_COLUMN] = 1.0 / (matrix[:, _ACCESS_COLUMN] + 1.0)  # Inverse distance
+    return matrix
 
 
 class ConceptLearner:
@@ -27,6 +70,8 @@ class ConceptLearner:
     
     MIN_OUTCOMES_FOR_TRAINING = 5  # Need at least 5 outcomes to start learning
     MIN_OUTCOMES_FOR_WEIGHTS = 20  # Need at least 20 to retrain weights
+    RETRAIN_MILESTONES = (5, 10, 20, 50, 100)  # Then after 10% more outcomes than the last retrain
+    RETRAIN_GROWTH = 1.1
     
     def __init__(self, db_session: Session):
         self.db = db_session
@@ -61,6 +106,8 @@ class ConceptLearner:
                 "message": "No concept linked to prediction - cannot learn"
             }
         
+        concept = self.db.query(Concept).filter(Concept.id == prediction.concept_id).first()
+        
         # Calculate variance
         variance_pct = ((actual_revenue - prediction.revenue_mid) / prediction.revenue_mid) * 100
         
@@ -81,21 +128,23 @@ class ConceptLearner:
         self.db.add(training_outcome)
         self.db.flush()
         
-        # Update concept outcomes count
-        concept = self.db.query(Concept).filter(Concept.id == prediction.concept_id).first()
+        # Update concept outcomes count and fold the outcome into the running stats
         concept.outcomes_count += 1
+        stats = self._updated_running_stats(concept, [training_outcome])
         
         # Check if we should retrain
         triggered_retraining = False
         new_accuracy = None
         
-        if concept.outcomes_count >= self.MIN_OUTCOMES_FOR_TRAINING:
-            # Enough data to retrain
-            self._retrain_concept(concept.id)
+        if self._should_retrain(concept.outcomes_count, stats.get("last_retrain_n", 0)):
+            # Enough (new) data to retrain
+            self._retrain_concept(concept, stats)
             triggered_retraining = True
             new_accuracy = concept.avg_prediction_error
         
         self.db.commit()
+        # outcomes_count (and any retrained parameters) changed
+        invalidate_concept_cache(concept.id)
         
         return {
             "training_outcome_id": training_outcome.id,
@@ -105,9 +154,180 @@ class ConceptLearner:
             "outcomes_count": concept.outcomes_count
         }
     
-    def _retrain_concept(self, concept_id: str):
+    def _should_retrain(self, n: int, last_retrain_n: int) -> bool:
+        """
+        Retrain at milestone counts, then once the outcome count has grown 10%
+        past the last retrain (geometric: ~24 retrains per 10x growth); running
+        stats still update on every outcome, only the parameter refresh is throttled
+        """
+        if n < self.MIN_OUTCOMES_FOR_TRAINING:
+            return False
+        if n in self.RETRAIN_MILESTONES:
+            return True
+        return n > self.RETRAIN_MILESTONES[-1] and n >= math.ceil(last_retrain_n * self.RETRAIN_GROWTH)
+    
+    def record_outcomes_bulk(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Retrain concept parameters from all outcomes
+        Record many outcomes at once (e.g. a historical backfill)
+        
+        records: [{"prediction_id": int, "actual_revenue": float, "opened_at": datetime}, ...]
+        
+        All outcomes go in with one multi-row INSERT, then every touched concept
+        has its stats updated and is retrained once - not once per outcome.
+        Predictions without a linked concept are skipped, as in record_outcome.
+        
+        Returns: {"inserted": int, "skipped": int, "concepts_retrained": int}
+        """
+        prediction_ids = [r["prediction_id"] for r in records]
+        predictions = {
+            p.id: p for p in self.db.query(Prediction).filter(Prediction.id.in_(prediction_ids)).all()
+        }
+        missing = [pid for pid in prediction_ids if pid not in predictions]
+        if missing:
+            raise ValueError(f"Predictions {missing} not found")
+        
+        rows = []
+        for r in records:
+            prediction = predictions[r["prediction_id"]]
+            if not prediction.concept_id:
+                continue
+            rows.append({
+                "concept_id": prediction.concept_id,
+                "prediction_id": prediction.id,
+                "predicted_revenue_eur": prediction.revenue_mid,
+                "predicted_score": prediction.score,
+                "features_used": prediction.features,
+                "actual_revenue_eur": r["actual_revenue"],
+                "variance_pct": ((r["actual_revenue"] - prediction.revenue_mid) / prediction.revenue_mid) * 100,
+                "opened_at": r["opened_at"],
+                "used_in_training": False,
+                "training_weight": 1.0
+            })
+        
+        bulk_insert(self.db, ConceptTrainingOutcome, rows)
+        
+        rows_by_concept = defaultdict(list)
+        for row in rows:
+            rows_by_concept[row["concept_id"]].append(row)
+        
+        concepts_retrained = 0
+        for concept in self.db.query(Concept).filter(Concept.id.in_(list(rows_by_concept))).all():
+            new_rows = rows_by_concept[concept.id]
+            concept.outcomes_count = (concept.outcomes_count or 0) + len(new_rows)
+            # Transient rows are only read by the stats fold; they are never added to the session
+            stats = self._updated_running_stats(concept, [ConceptTrainingOutcome(**row) for row in new_rows])
+            if concept.outcomes_count >= self.MIN_OUTCOMES_FOR_TRAINING:
+                self._retrain_concept(concept, stats)
+                concepts_retrained += 1
+        
+        self.db.commit()
+        invalidate_concept_cache(*rows_by_concept)
+        
+        return {
+            "inserted": len(rows),
+            "skipped": len(records) - len(rows),
+            "concepts_retrained": concepts_retrained
+        }
+    
+    def _updated_running_stats(
+        self,
+        concept: Concept,
+        new_outcomes: List[ConceptTrainingOutcome]
+    ) -> Dict[str, Any]:
+        """
+        Fold new (already flushed) outcomes into the concept's running stats and store them
+        Concepts without (current-version) running stats are rebuilt once from their full history
+        """
+        if (concept.running_stats or {}).get("version") != RUNNING_STATS_VERSION:
+            outcomes = self.db.query(ConceptTrainingOutcome).filter(
+                ConceptTrainingOutcome.concept_id == concept.id
+            ).all()
+            stats = self._running_stats_from_history(outcomes)
+        else:
+            # Copy so the JSON column sees a new value and is written back
+            stats = copy.deepcopy(concept.running_stats)
+            for outcome in new_outcomes:
+                self._fold_outcome(stats, outcome)
+        
+        concept.running_stats = stats
+        return stats
+    
+    @staticmethod
+    def _empty_running_stats() -> Dict[str, Any]:
+        # Joint moments over (features..., revenue) for outcomes with a complete feature snapshot
+        dim = len(FEATURE_NAMES) + 1
+        return {
+            "version": RUNNING_STATS_VERSION,
+            "n": 0,
+            "sum_abs_variance_pct": 0.0,
+            "last_retrain_n": 0,  # Outcome count at the last retrain (throttles _should_retrain)
+            "moments": {
+                "n": 0,
+                "mean": [0.0] * dim,
+                "comoment": [[0.0] * dim for _ in range(dim)]
+            }
+        }
+    
+    @classmethod
+    def _running_stats_from_history(cls, outcomes: List[ConceptTrainingOutcome]) -> Dict[str, Any]:
+        """Running stats for a full outcome history in one vectorized pass"""
+        stats = cls._empty_running_stats()
+        n = len(outcomes)
+        if not n:
+            return stats
+        
+        revenues = np.fromiter((o.actual_revenue_eur for o in outcomes), dtype=np.float64, count=n)
+        variances = np.fromiter((o.variance_pct for o in outcomes), dtype=np.float64, count=n)
+        stats["n"] = n
+        stats["sum_abs_variance_pct"] = float(np.abs(variances).sum())
+        
+        # Joint moments over outcomes with a complete feature snapshot
+        with_features = [i for i, o in enumerate(outcomes) if o.features_used]
+        if with_features:
+            z = np.column_stack((
+                _feature_matrix([outcomes[i].features_used for i in with_features]),
+                revenues[with_features]
+            ))
+            z = z[~np.isnan(z).any(axis=1)]
+            if len(z):
+                mean = z.mean(axis=0)
+                centered = z - mean
+                stats["moments"] = {
+                    "n": len(z),
+                    "mean": mean.tolist(),
+                    "comoment": (centered.T @ centered).tolist()
+                }
+        
+        return stats
+    
+    @staticmethod
+    def _fold_outcome(stats: Dict[str, Any], outcome: ConceptTrainingOutcome):
+        """
+        Add one outcome to the running stats in place - O(features²)
+        """
+        revenue = outcome.actual_revenue_eur
+        stats["n"] += 1
+        stats["sum_abs_variance_pct"] += abs(outcome.variance_pct)
+        
+        if not outcome.features_used:
+            return
+        
+        z = np.append(_feature_matrix([outcome.features_used])[0], revenue)
+        if np.isnan(z).any():
+            return
+        
+        # Multivariate Welford update (numerically stable, single pass)
+        m = stats["moments"]
+        mean = np.array(m["mean"])
+        m["n"] += 1
+        delta = z - mean
+        mean += delta / m["n"]
+        m["mean"] = mean.tolist()
+        m["comoment"] = (np.array(m["comoment"]) + np.outer(delta, z - mean)).tolist()
+    
+    def _retrain_concept(self, concept: Concept, stats: Dict[str, Any]):
+        """
+        Retrain concept parameters from the running stats over all outcomes
         
         Updates:
         1. base_revenue_eur → median of actual revenues
@@ -115,25 +335,21 @@ class ConceptLearner:
         3. avg_prediction_error → MAPE
         4. weights → optimize to minimize prediction error (if enough data)
         """
-        concept = self.db.query(Concept).filter(Concept.id == concept_id).first()
-        if not concept:
+        n = stats["n"]
+        if n < self.MIN_OUTCOMES_FOR_TRAINING:
             return
         
-        # Get all training outcomes
-        outcomes = self.db.query(ConceptTrainingOutcome).filter(
-            ConceptTrainingOutcome.concept_id == concept_id
-        ).all()
-        
-        if len(outcomes) < self.MIN_OUTCOMES_FOR_TRAINING:
-            return
-        
-        # 1. Update base_revenue → median of actuals
-        actual_revenues = [o.actual_revenue_eur for o in outcomes]
-        new_base_revenue = statistics.median(actual_revenues)
+        # 1. Update base_revenue → median of actuals; only the middle one or two
+        # rows via ORDER BY/OFFSET (retrains are throttled, so this stays off the per-outcome path)
+        revenue = ConceptTrainingOutcome.actual_revenue_eur
+        middle = self.db.execute(
+            select(revenue).where(ConceptTrainingOutcome.concept_id == concept.id)
+            .order_by(revenue).offset((n - 1) // 2).limit(2 - n % 2)
+        ).scalars().all()
+        new_base_revenue = sum(middle) / len(middle)
         
         # 2. Calculate prediction error (MAPE)
-        absolute_percent_errors = [abs(o.variance_pct) for o in outcomes]
-        mape = statistics.mean(absolute_percent_errors)
+        mape = stats["sum_abs_variance_pct"] / n
         
         # 3. Update revenue_variance (shrinks with more data and better accuracy)
         # Start at 0.20 (±20%), shrink to 0.10 (±10%) as accuracy improves
@@ -144,81 +360,77 @@ class ConceptLearner:
         elif mape < 20:
             new_variance = 0.15
         else:
-            new_variance = max(0.20 - (len(outcomes) * 0.005), 0.15)  # Shrink slowly
+            new_variance = max(0.20 - (n * 0.005), 0.15)  # Shrink slowly
         
         # Update concept
         concept.base_revenue_eur = int(new_base_revenue)
         concept.revenue_variance = new_variance
         concept.avg_prediction_error = mape
-        concept.last_trained_at = datetime.utcnow()
+        concept.last_trained_at = datetime.now(timezone.utc)  # Aware, to match the timezone=True column
+        stats["last_retrain_n"] = n
         
         # 4. Optimize weights (if we have enough data)
-        if len(outcomes) >= self.MIN_OUTCOMES_FOR_WEIGHTS:
-            optimized_weights = self._optimize_weights(outcomes, concept.weights)
+        if n >= self.MIN_OUTCOMES_FOR_WEIGHTS:
+            optimized_weights = self._optimize_weights(stats, concept.weights)
             if optimized_weights:
                 concept.weights = optimized_weights
         
-        # Mark outcomes as used in training
-        for outcome in outcomes:
-            outcome.used_in_training = True
+        # Mark outcomes as used in training (one UPDATE; loaded rows are synced in memory)
+        self.db.execute(
+            update(ConceptTrainingOutcome)
+            .where(
+                ConceptTrainingOutcome.concept_id == concept.id,
+                ConceptTrainingOutcome.used_in_training == False
+            )
+            .values(used_in_training=True)
+        )
         
         self.db.flush()
     
     def _optimize_weights(
         self,
-        outcomes: list,
+        stats: Dict[str, Any],
         current_weights: Dict[str, float]
     ) -> Optional[Dict[str, float]]:
         """
         Optimize scoring weights to minimize prediction error
         
-        Simple approach: For each factor, calculate correlation with revenue
-        Factors with higher correlation get higher weight
+        Ridge regression of revenue on the standardized features (closed form,
+        one 5×5 solve); factors with larger |coefficient| get higher weight
         
-        More sophisticated approach (future): Use gradient descent or random forest feature importance
+        More sophisticated approach (future): random forest feature importance
         """
-        if len(outcomes) < self.MIN_OUTCOMES_FOR_WEIGHTS:
+        if stats["n"] < self.MIN_OUTCOMES_FOR_WEIGHTS:
             return None
         
-        # Extract features and actual revenues
-        feature_names = ["population", "income", "access", "competition", "walkability"]
-        feature_revenues = {name: [] for name in feature_names}
-        actual_revenues = []
-        
-        for outcome in outcomes:
-            if not outcome.features_used:
-                continue
-            
-            actual_revenues.append(outcome.actual_revenue_eur)
-            
-            # Map feature values to revenue
-            features = outcome.features_used
-            feature_revenues["population"].append(features.get("population_density", 0))
-            feature_revenues["income"].append(features.get("median_income", 0))
-            feature_revenues["access"].append(
-                1 / (features.get("nearest_metro_distance_m", 1000) + 1)  # Inverse distance
-            )
-            feature_revenues["competition"].append(
-                features.get("competitors_per_1k_residents", 0)
-            )
-            feature_revenues["walkability"].append(
-                features.get("walkability_poi_count", 0)
-            )
+        moments = stats["moments"]
+        if moments["n"] < 2:
+            return None
         
-        # Calculate correlation for each feature
-        correlations = {}
-        for name in feature_names:
-            corr = self._calculate_correlation(feature_revenues[name], actual_revenues)
-            correlations[name] = abs(corr)  # Use absolute value (positive or negative matters)
+        # Standardized ridge regression on the running co-moments:
+        # w = (Rxx + λI)⁻¹ rxy, where R is the feature/revenue correlation matrix.
+        # Unlike per-feature correlation this accounts for features that move together.
+        comoment = np.array(moments["comoment"])
+        std = np.sqrt(np.diag(comoment))
+        if std[-1] == 0:
+            return None  # Revenue never varied - nothing to fit
+        std[std == 0] = 1.0  # Constant features standardize to 0 and get no weight
+        
+        corr = comoment / np.outer(std, std)
+        coefficients = np.linalg.solve(
+            corr[:-1, :-1] + RIDGE_LAMBDA * np.eye(len(FEATURE_NAMES)),
+            corr[:-1, -1]
+        )
+        importances = dict(zip(FEATURE_NAMES, np.abs(coefficients).tolist()))
         
-        # Normalize correlations to weights (sum to 1.0)
-        total_corr = sum(correlations.values())
-        if total_corr == 0:
+        # Normalize importances to weights (sum to 1.0)
+        total_importance = sum(importances.values())
+        if total_importance == 0:
             return None  # Can't optimize
         
         new_weights = {
-            name: round(corr / total_corr, 2)
-            for name, corr in correlations.items()
+            name: round(importance / total_importance, 2)
+            for name, importance in importances.items()
         }
         
         # Ensure weights sum to exactly 1.0
@@ -230,38 +442,7 @@ class ConceptLearner:
         
         return new_weights
     
-    def _calculate_correlation(self, x: list, y: list) -> float:
-        """
-        Calculate Pearson correlation coefficient
-        Returns: -1 to 1 (0 = no correlation, 1 = perfect positive, -1 = perfect negative)
-        """
-        if len(x) != len(y) or len(x) < 2:
-            return 0.0
-        
-        # Remove None values
-        pairs = [(xi, yi) for xi, yi in zip(x, y) if xi is not None and yi is not None]
-        if len(pairs) < 2:
-            return 0.0
-        
-        x_clean, y_clean = zip(*pairs)
-        
-        # Calculate means
-        x_mean = statistics.mean(x_clean)
-        y_mean = statistics.mean(y_clean)
-        
-        # Calculate correlation
-        numerator = sum((xi - x_mean) * (yi - y_mean) for xi, yi in zip(x_clean, y_clean))
-        x_variance = sum((xi - x_mean) ** 2 for xi in x_clean)
-        y_variance = sum((yi - y_mean) ** 2 for yi in y_clean)
-        
-        denominator = (x_variance * y_variance) ** 0.5
-        
-        if denominator == 0:
-            return 0.0
-        
-        return numerator / denominator
-    
-    def get_concept_stats(self, concept_id: str) -> Dict[str, Any]:
+    def get_concept_stats(self, concept_id: UUID) -> Dict[str, Any]:
         """
         Get training statistics for a concept
         """
@@ -269,11 +450,19 @@ class ConceptLearner:
         if not concept:
             raise ValueError(f"Concept {concept_id} not found")
         
-        outcomes = self.db.query(ConceptTrainingOutcome).filter(
-            ConceptTrainingOutcome.concept_id == concept_id
-        ).all()
-        
-        if not outcomes:
+        # Count, extremes and in-band count aggregated in the database - no rows shipped
+        abs_error = func.abs(ConceptTrainingOutcome.variance_pct)
+        for_concept = ConceptTrainingOutcome.concept_id == concept_id
+        outcomes_count, best, worst, within_band = self.db.execute(
+            select(
+                func.count(),
+                func.min(abs_error),
+                func.max(abs_error),
+                func.coalesce(func.sum(case((abs_error <= concept.revenue_variance * 100, 1), else_=0)), 0)
+            ).where(for_concept)
+        ).one()
+        
+        if not outcomes_count:
             return {
                 "concept_id": concept_id,
                 "concept_name": concept.name,
@@ -284,23 +473,26 @@ class ConceptLearner:
                 "status": "No outcomes yet"
             }
         
-        # Calculate detailed stats
-        variances = [o.variance_pct for o in outcomes]
-        absolute_errors = [abs(v) for v in variances]
+        # Median: only the middle one or two values, via ORDER BY/OFFSET (portable, unlike percentile_cont)
+        middle = self.db.execute(
+            select(abs_error).where(for_concept).order_by(abs_error)
+            .offset((outcomes_count - 1) // 2).limit(2 - outcomes_count % 2)
+        ).scalars().all()
+        median = sum(middle) / len(middle)
         
         return {
             "concept_id": concept_id,
             "concept_name": concept.name,
-            "outcomes_count": len(outcomes),
+            "outcomes_count": outcomes_count,
             "avg_prediction_error": concept.avg_prediction_error,
             "revenue_variance": concept.revenue_variance,
             "base_revenue_eur": concept.base_revenue_eur,
             "last_trained_at": concept.last_trained_at.isoformat() if concept.last_trained_at else None,
-            "median_variance_pct": statistics.median(absolute_errors),
-            "worst_variance_pct": max(absolute_errors),
-            "best_variance_pct": min(absolute_errors),
-            "within_band_count": sum(1 for e in absolute_errors if e <= concept.revenue_variance * 100),
+            "median_variance_pct": median,
+            "worst_variance_pct": worst,
+            "best_variance_pct": best,
+            "within_band_count": int(within_band),
             "weights": concept.weights,
-            "status": "Learning" if len(outcomes) < 50 else "Mature"
+            "status": "Learning" if outcomes_count < 50 else "Mature"
         }
 
@@ -3,20 +3,57 @@ Digitransit Pelias API - Geocoding for Finnish addresses
 https://digitransit.fi/en/developers/apis/2-geocoding-api/
 """
 
+import asyncio
 import httpx
-from typing import Optional, Dict, Any, List
+import numpy as np
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 import os
+from cachetools import TTLCache
 
 
 class DigitransitService:
     """Geocoding service using Digitransit Pelias API"""
 
-    def __init__(self):
+    # Rough bounding box for Helsinki region: (min_lat, max_lat, min_lng, max_lng)
+    # Helsinki coordinates: 60.1699° N, 24.9384° E
+    HELSINKI_BBOX = (60.0, 60.5, 24.6, 25.3)
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # Shared keep-alive client when provided (e.g. by AddressGenerator);
+        # otherwise one pooled client is created on first use and reused
+        self.client = client
+        self._owns_client = False
         self.base_url = os.getenv("DIGITRANSIT_URL", "https://api.digitransit.fi")
         self.geocoding_endpoint = f"{self.base_url}/geocoding/v1"
         # Digitransit now requires a subscription key header (get free key from digitransit.fi)
         self.api_key = os.getenv("DIGITRANSIT_API_KEY")
 
+        # Successful lookups, keyed on normalized address / ~1m-rounded coordinates
+        self._geocode_cache: TTLCache = TTLCache(maxsize=4096, ttl=86400)
+        self._reverse_cache: TTLCache = TTLCache(maxsize=4096, ttl=86400)
+        # "No match" answers, same keys, kept only an hour so new addresses
+        # show up soon; HTTP errors are never cached
+        self._geocode_misses: TTLCache = TTLCache(maxsize=4096, ttl=3600)
+        self._reverse_misses: TTLCache = TTLCache(maxsize=4096, ttl=3600)
+
+    @asynccontextmanager
+    async def _http(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=20),
+                timeout=10.0
+            )
+            self._owns_client = True
+        yield self.client
+
+    async def aclose(self):
+        """Close the pooled client if this service created it"""
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
+
     async def geocode_address(self, address: str) -> Optional[Dict[str, Any]]:
         """
         Geocode a Finnish address to lat/lng
@@ -30,7 +67,13 @@ class DigitransitService:
                 "confidence": 0.95
             }
         """
-        async with httpx.AsyncClient() as client:
+        key = address.lower().strip()
+        if key in self._geocode_cache:
+            return self._geocode_cache[key]
+        if key in self._geocode_misses:
+            return None
+
+        async with self._http() as client:
             try:
                 response = await client.get(
                     f"{self.geocoding_endpoint}/search",
@@ -49,7 +92,7 @@ class DigitransitService:
                     coords = feature["geometry"]["coordinates"]
                     props = feature["properties"]
 
-                    return {
+                    result = {
                         "address": props.get("label", address),
                         "latitude": coords[1],
                         "longitude": coords[0],
@@ -57,12 +100,34 @@ class DigitransitService:
                         "city": props.get("locality", "Helsinki"),
                         "confidence": props.get("confidence", 0.5)
                     }
-                return None
+                else:
+                    self._geocode_misses[key] = True
+                    return None
+
+                self._geocode_cache[key] = result
+                return result
 
             except httpx.HTTPError as e:
                 print(f"Digitransit geocoding error: {e}")
                 return None
 
+    async def geocode_batch(
+        self,
+        addresses: List[str],
+        concurrency: int = 16
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Geocode many addresses concurrently over the pooled client
+        At most `concurrency` requests are in flight; results keep input order
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(address: str) -> Optional[Dict[str, Any]]:
+            async with sem:
+                return await self.geocode_address(address)
+
+        return await asyncio.gather(*(one(address) for address in addresses))
+
     async def reverse_geocode(self, lat: float, lng: float) -> Optional[Dict[str, Any]]:
         """
         Reverse geocode coordinates to address
@@ -77,7 +142,13 @@ class DigitransitService:
                 "city": "Helsinki"
             }
         
-        async with httpx.AsyncClient() as client:
+        key: Tuple[float, float] = (round(lat, 5), round(lng, 5))
+        if key in self._reverse_cache:
+            return self._reverse_cache[key]
+        if key in self._reverse_misses:
+            return None
+
+        async with self._http() as client:
             try:
                 headers = {"digitransit-subscription-key": self.api_key}
                 response = await client.get(
@@ -98,12 +169,17 @@ class DigitransitService:
                     feature = data["features"][0]
                     props = feature["properties"]
 
-                    return {
+                    result = {
                         "address": props.get("label", ""),
                         "postal_code": props.get("postalcode"),
                         "city": props.get("locality", "Helsinki")
                     }
-                return None
+                else:
+                    self._reverse_misses[key] = True
+                    return None
+
+                self._reverse_cache[key] = result
+                return result
 
             except httpx.HTTPError as e:
                 # Fallback to mock on error
@@ -133,7 +209,7 @@ class DigitransitService:
             params["boundary.circle.lon"] = lng
             params["boundary.circle.radius"] = radius_km
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.get(
                     f"{self.geocoding_endpoint}/search",
@@ -163,6 +239,11 @@ class DigitransitService:
 
     def is_helsinki_area(self, lat: float, lng: float) -> bool:
         """Check if coordinates are within Greater Helsinki area"""
-        # Rough bounding box for Helsinki region
-        # Helsinki coordinates: 60.1699° N, 24.9384° E
-        return (60.0 <= lat <= 60.5) and (24.6 <= lng <= 25.3)
+        min_lat, max_lat, min_lng, max_lng = self.HELSINKI_BBOX
+        return (min_lat <= lat <= max_lat) and (min_lng <= lng <= max_lng)
+
+    @classmethod
+    def is_helsinki_area_batch(cls, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Vectorized is_helsinki_area: boolean mask over coordinate arrays"""
+        min_lat, max_lat, min_lng, max_lng = cls.HELSINKI_BBOX
+        return (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
@@ -6,20 +6,88 @@ https://www.hsy.fi/en/environmental-information/open-data/avoin-data---sivut/pop
 import httpx
 from typing import List, Dict, Any, Optional
 import os
+import asyncio
+import logging
+import zlib
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371
+
+# Pre-defined high-opportunity areas in Helsinki (mock heatmap); shared, treat as read-only
+HELSINKI_MOCK_AREAS = (
+    # Kamppi - High score
+    {"latitude": 60.1699, "longitude": 24.9342, "score": 91, "population": 28000},
+    # Kallio - Medium-high score
+    {"latitude": 60.1847, "longitude": 24.9504, "score": 82, "population": 24500},
+    # Pasila - Medium score
+    {"latitude": 60.1989, "longitude": 24.9339, "score": 71, "population": 8500},
+    # Töölö - High score
+    {"latitude": 60.1777, "longitude": 24.9157, "score": 85, "population": 18200},
+    # Punavuori - High score
+    {"latitude": 60.1585, "longitude": 24.9398, "score": 88, "population": 15800},
+    # Kruununhaka - Medium score
+    {"latitude": 60.1729, "longitude": 24.9560, "score": 78, "population": 5200},
+    # Ullanlinna - High score
+    {"latitude": 60.1586, "longitude": 24.9519, "score": 86, "population": 12400},
+    # Eira - Very high score
+    {"latitude": 60.1543, "longitude": 24.9374, "score": 93, "population": 6800},
+)
+
+# HSY publishes the grid yearly; cached grids can live a day
+GRID_CACHE_TTL_SECONDS = 86400
+
+
+def _haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points"""
+    dlat = np.radians(lats - lat)
+    dlng = np.radians(lngs - lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(np.radians(lat)) * np.cos(np.radians(lats)) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
 
 
 class HSYService:
     """Helsinki Region 250m population grid for heatmap data"""
 
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.wfs_url = os.getenv("HSY_WFS_URL", "https://kartta.hsy.fi/geoserver/wfs")
 
+        # One keep-alive client for every WFS request instead of a TLS handshake per call
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=10),
+            timeout=30.0
+        )
+
+        # Grid fetches in progress, keyed like the Redis cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Optional Redis cache for parsed grids (same REDIS_URL as the response cache)
+        self.redis = None
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            try:
+                import redis.asyncio as aioredis
+                self.redis = aioredis.Redis.from_url(redis_url, socket_timeout=0.5)
+            except ImportError:
+                logger.warning("REDIS_URL set but redis package not installed; HSY grid cache disabled")
+
+    async def aclose(self):
+        """Close the HTTP client (if created here) and the cache connection"""
+        if self._owns_client:
+            await self.client.aclose()
+        if self.redis is not None:
+            await self.redis.aclose()
+
     async def get_population_grid(
         self,
         bbox: tuple[float, float, float, float]
     ) -> List[Dict[str, Any]]:
         """
         Get 250m population grid cells within bounding box
+        Cached in Redis (zlib-compressed JSON) on the bbox rounded to 3 decimals
 
         Args:
             bbox: (min_lng, min_lat, max_lng, max_lat)
@@ -27,6 +95,39 @@ class HSYService:
         Returns:
             List of grid cells with population data
         """
+        key = "hsy:grid:" + ":".join(f"{round(v, 3)}" for v in bbox)
+
+        if self.redis is not None:
+            try:
+                cached = await self.redis.get(key)
+                if cached is not None:
+                    return orjson.loads(zlib.decompress(cached))
+            except Exception as e:
+                logger.warning(f"HSY grid cache get failed for {key}: {e}")
+
+        # Concurrent misses for the same bbox await the first caller's fetch
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        inflight = asyncio.ensure_future(self._fetch_population_grid(bbox))
+        self._inflight[key] = inflight
+        inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        grid_cells = await asyncio.shield(inflight)
+
+        if self.redis is not None and grid_cells:
+            try:
+                await self.redis.set(key, zlib.compress(orjson.dumps(grid_cells)), ex=GRID_CACHE_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"HSY grid cache set failed for {key}: {e}")
+
+        return grid_cells
+
+    async def _fetch_population_grid(
+        self,
+        bbox: tuple[float, float, float, float]
+    ) -> List[Dict[str, Any]]:
+        """Fetch and parse grid cells from the HSY WFS"""
         min_lng, min_lat, max_lng, max_lat = bbox
 
         params = {
@@ -39,40 +140,47 @@ class HSYService:
             "bbox": f"{min_lat},{min_lng},{max_lat},{max_lng},EPSG:4326"
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    self.wfs_url,
-                    params=params,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                grid_cells = []
-                for feature in data.get("features", []):
-                    props = feature["properties"]
-                    geometry = feature["geometry"]
-
-                    # Get center of grid cell
-                    if geometry["type"] == "Polygon":
-                        coords = geometry["coordinates"][0]
-                        center_lng = sum(c[0] for c in coords) / len(coords)
-                        center_lat = sum(c[1] for c in coords) / len(coords)
-
-                        grid_cells.append({
-                            "latitude": center_lat,
-                            "longitude": center_lng,
-                            "population": props.get("asukkaita", 0),
-                            "grid_id": props.get("INDEX", "")
-                        })
-
-                return grid_cells
-
-            except httpx.HTTPError as e:
-                print(f"HSY WFS error: {e}")
+        try:
+            response = await self.client.get(
+                self.wfs_url,
+                params=params,
+                timeout=30.0
+            )
+            response.raise_for_status()
+            # orjson straight off the bytes; the grid payload is megabytes of GeoJSON
+            data = orjson.loads(response.content)
+
+            polygons = [
+                feature for feature in data.get("features", [])
+                if feature["geometry"]["type"] == "Polygon"
+            ]
+            if not polygons:
                 return []
 
+            # Center of every grid cell at once: stack all outer rings, then
+            # per-ring vertex means via reduceat over the ring boundaries
+            rings = [feature["geometry"]["coordinates"][0] for feature in polygons]
+            lengths = np.fromiter((len(ring) for ring in rings), dtype=np.intp, count=len(rings))
+            vertices = np.array([c[:2] for ring in rings for c in ring], dtype=np.float64)
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            centers = np.add.reduceat(vertices, starts, axis=0) / lengths[:, None]
+
+            grid_cells = []
+            for feature, (center_lng, center_lat) in zip(polygons, centers.tolist()):
+                props = feature["properties"]
+                grid_cells.append({
+                    "latitude": center_lat,
+                    "longitude": center_lng,
+                    "population": props.get("asukkaita", 0),
+                    "grid_id": props.get("INDEX", "")
+                })
+
+            return grid_cells
+
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            print(f"HSY WFS error: {e}")
+            return []
+
     async def get_population_in_area(
         self,
         lat: float,
@@ -103,29 +211,21 @@ class HSYService:
 
         grid_cells = await self.get_population_grid(bbox)
 
-        # Filter to cells actually within radius
-        from math import radians, sin, cos, sqrt, atan2
-
-        def distance(lat1, lng1, lat2, lng2):
-            R = 6371  # Earth radius in km
-            dlat = radians(lat2 - lat1)
-            dlng = radians(lng2 - lng1)
-            a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng/2)**2
-            c = 2 * atan2(sqrt(a), sqrt(1-a))
-            return R * c
+        # Filter to cells actually within radius (haversine over all cells at once)
+        n = len(grid_cells)
+        lats = np.fromiter((cell["latitude"] for cell in grid_cells), dtype=np.float64, count=n)
+        lngs = np.fromiter((cell["longitude"] for cell in grid_cells), dtype=np.float64, count=n)
+        pops = np.fromiter((cell["population"] or 0 for cell in grid_cells), dtype=np.float64, count=n)
 
-        cells_in_radius = [
-            cell for cell in grid_cells
-            if distance(lat, lng, cell["latitude"], cell["longitude"]) <= radius_km
-        ]
+        in_radius = _haversine_km(lat, lng, lats, lngs) <= radius_km
 
-        total_population = sum(cell["population"] for cell in cells_in_radius)
+        total_population = pops[in_radius].sum()
         area_km2 = 3.14159 * (radius_km ** 2)
         density = total_population / area_km2 if area_km2 > 0 else 0
 
         return {
             "total_population": int(total_population),
-            "grid_cells_count": len(cells_in_radius),
+            "grid_cells_count": int(in_radius.sum()),
             "population_density": int(density)
         }
 
@@ -137,24 +237,4 @@ class HSYService:
         Generate mock heatmap data for MVP demo
         (Use this instead of real HSY data for speed during development)
         """
-        # Pre-defined high-opportunity areas in Helsinki
-        helsinki_areas = [
-            # Kamppi - High score
-            {"latitude": 60.1699, "longitude": 24.9342, "score": 91, "population": 28000},
-            # Kallio - Medium-high score
-            {"latitude": 60.1847, "longitude": 24.9504, "score": 82, "population": 24500},
-            # Pasila - Medium score
-            {"latitude": 60.1989, "longitude": 24.9339, "score": 71, "population": 8500},
-            # Töölö - High score
-            {"latitude": 60.1777, "longitude": 24.9157, "score": 85, "population": 18200},
-            # Punavuori - High score
-            {"latitude": 60.1585, "longitude": 24.9398, "score": 88, "population": 15800},
-            # Kruununhaka - Medium score
-            {"latitude": 60.1729, "longitude": 24.9560, "score": 78, "population": 5200},
-            # Ullanlinna - High score
-            {"latitude": 60.1586, "longitude": 24.9519, "score": 86, "population": 12400},
-            # Eira - Very high score
-            {"latitude": 60.1543, "longitude": 24.9374, "score": 93, "population": 6800},
-        ]
-
-        return helsinki_areas
+        return list(HELSINKI_MOCK_AREAS)
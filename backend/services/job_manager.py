@@ -6,17 +6,36 @@ Handles:
 - Stage-based progress updates
 - SSE event emission
 - Job completion and cleanup
+
+With REDIS_URL set, job status/results and SSE events are also mirrored to
+Redis (a hash per job, a capped stream of events), so any API worker can
+answer status polls and stream events for jobs running on another worker.
 """
 
+import os
 import uuid
 import asyncio
-from typing import Dict, Any, List, Optional, AsyncGenerator
+import heapq
+from typing import Dict, Any, List, Optional, AsyncGenerator, Union, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Per-job SSE buffer; when a slow client lets it fill, the oldest events are dropped
+JOB_QUEUE_MAXSIZE = 256
+
+# Idle SSE streams get a keepalive event this often
+KEEPALIVE_SECONDS = 60.0
+
+# Approximate cap on each job's Redis event stream (XADD MAXLEN ~)
+JOB_EVENTS_MAXLEN = 1024
+
+# How often the background sweep drops expired jobs
+JOB_CLEANUP_INTERVAL_SECONDS = 300.0
+
 
 class JobStatus:
     PENDING = "pending"
@@ -34,22 +53,154 @@ class StageStatus:
     FAIL = "fail"
 
 
+class SPSCRingQueue:
+    """
+    Fixed-size ring buffer for one producer and one consumer coroutine
+
+    Lighter than asyncio.Queue for per-job SSE events: no waiter futures on
+    the fast path, a single Event for wake-up. put_nowait never blocks;
+    when the buffer is full it overwrites the oldest item.
+    """
+
+    def __init__(self, maxsize: int = JOB_QUEUE_MAXSIZE):
+        self._buffer: List[Any] = [None] * maxsize
+        self._maxsize = maxsize
+        self._head = 0
+        self._size = 0
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def put_nowait(self, item: Any) -> bool:
+        """Append `item`; returns True if the oldest item was overwritten to make room"""
+        self._buffer[(self._head + self._size) % self._maxsize] = item
+        dropped = self._size == self._maxsize
+        if dropped:
+            self._head = (self._head + 1) % self._maxsize
+        else:
+            self._size += 1
+        self._ready.set()
+        return dropped
+
+    def get_nowait(self) -> Any:
+        if not self._size:
+            raise asyncio.QueueEmpty
+        item = self._buffer[self._head]
+        self._buffer[self._head] = None
+        self._head = (self._head + 1) % self._maxsize
+        self._size -= 1
+        if not self._size:
+            self._ready.clear()
+        return item
+
+    async def get(self) -> Any:
+        while not self._size:
+            await self._ready.wait()
+        return self.get_nowait()
+
+
 class JobManager:
     """
     Manage background recommendation jobs with SSE streaming
 
-    In-memory storage with TTL cleanup (suitable for MVP)
-    In production, use Redis or similar
+    In-memory storage with TTL cleanup; the worker running a job streams
+    from its local queue. With REDIS_URL set, state and events are mirrored
+    to Redis (expiring with the job) for the other workers.
     """
 
     def __init__(self, ttl_seconds: int = 3600):
         self.jobs: Dict[str, Dict[str, Any]] = {}
-        self.job_queues: Dict[str, asyncio.Queue] = {}
+        self.job_queues: Dict[str, SPSCRingQueue] = {}
         self.ttl_seconds = ttl_seconds
+        # (expires_at, job_id) min-heap so cleanup only touches expired jobs
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+        # Optional Redis mirror (same REDIS_URL as the response cache)
+        self.redis = None
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            try:
+                import redis.asyncio as aioredis
+                self.redis = aioredis.Redis.from_url(redis_url)
+            except ImportError:
+                logger.warning("REDIS_URL set but redis package not installed; job state stays per-process")
+
+    def start_cleanup_task(self):
+        """Start the periodic expired-job sweep (call from app startup)"""
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(JOB_CLEANUP_INTERVAL_SECONDS)
+            try:
+                await self.cleanup_expired_jobs()
+            except Exception as e:
+                logger.warning(f"Expired job cleanup failed: {e}")
+
+    async def aclose(self):
+        """Stop the cleanup sweep and close the Redis connection, if any"""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+        if self.redis is not None:
+            await self.redis.aclose()
+
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    @staticmethod
+    def _events_key(job_id: str) -> str:
+        return f"job:{job_id}:events"
+
+    async def _publish(
+        self,
+        job_id: str,
+        fields: Optional[Dict[str, Any]] = None,
+        events: Optional[List[Optional[Dict[str, Any]]]] = None
+    ):
+        """
+        Mirror job fields and SSE events to Redis in one pipelined round-trip
+        No-op without Redis; failures are logged, never raised into the job
+        """
+        if self.redis is None:
+            return
 
-    def create_job(self, city: str, concept: str, limit: int, include_crime: bool) -> str:
+        job_key = self._job_key(job_id)
+        events_key = self._events_key(job_id)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                if fields:
+                    pipe.hset(job_key, mapping={k: v for k, v in fields.items() if v is not None})
+                    pipe.expire(job_key, self.ttl_seconds)
+                for event in events or ():
+                    # Empty payload marks end of stream (the local queue's None)
+                    payload = b"" if event is None else orjson.dumps(event)
+                    pipe.xadd(events_key, {"e": payload}, maxlen=JOB_EVENTS_MAXLEN, approximate=True)
+                if events:
+                    pipe.expire(events_key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis mirror failed for job {job_id}: {e}")
+
+    async def create_job(self, city: str, concept: str, limit: int, include_crime: bool) -> str:
         """Create a new recommendation job"""
+        # Drop expired jobs first; only pops heap entries that are already due
+        await self.cleanup_expired_jobs()
+
         job_id = str(uuid.uuid4())
+        created_at = datetime.utcnow()
+        expires_at = created_at + timedelta(seconds=self.ttl_seconds)
 
         self.jobs[job_id] = {
             'job_id': job_id,
@@ -58,16 +209,26 @@ class JobManager:
             'concept': concept,
             'limit': limit,
             'include_crime': include_crime,
-            'created_at': datetime.utcnow(),
-            'expires_at': datetime.utcnow() + timedelta(seconds=self.ttl_seconds),
+            'created_at': created_at,
+            'expires_at': expires_at,
             'stages': {},
             'degraded': [],
-            'result': None,
+            'result_json': None,
             'error': None
         }
 
         # Create event queue for SSE
-        self.job_queues[job_id] = asyncio.Queue()
+        self.job_queues[job_id] = SPSCRingQueue(JOB_QUEUE_MAXSIZE)
+        heapq.heappush(self._expiry_heap, (expires_at, job_id))
+
+        await self._publish(job_id, fields={
+            'status': JobStatus.PENDING,
+            'city': city,
+            'concept': concept,
+            'limit': limit,
+            'include_crime': int(include_crime),
+            'created_at': created_at.isoformat()
+        })
 
         logger.info(f"Created job {job_id} for {concept} in {city}")
         return job_id
@@ -101,8 +262,7 @@ class JobManager:
             'status': status,
             'metrics': metrics or {},
             'ms': ms,
-            'cached': cached,
-            'timestamp': datetime.utcnow().isoformat()
+            'cached': cached
         }
 
         # Create SSE event
@@ -116,25 +276,97 @@ class JobManager:
         }
 
         # Push to queue for SSE stream
-        if job_id in self.job_queues:
-            await self.job_queues[job_id].put(event)
+        self._enqueue(job_id, event)
+        await self._publish(job_id, events=[event])
 
         logger.debug(f"Job {job_id}: {stage} → {status} ({ms}ms)")
 
+    async def emit_stage_updates(self, job_id: str, updates: List[Dict[str, Any]]):
+        """
+        Emit several stage updates in one call
+
+        Each update carries the emit_stage_update fields (stage, status and
+        optional metrics/ms/cached). Events are enqueued in order without
+        yielding between them.
+        """
+        if job_id not in self.jobs:
+            logger.warning(f"Attempted to update non-existent job {job_id}")
+            return
+
+        stages = self.jobs[job_id]['stages']
+        events = []
+
+        for update in updates:
+            metrics = update.get('metrics') or {}
+            ms = update.get('ms')
+            cached = update.get('cached', False)
+
+            stages[update['stage']] = {
+                'status': update['status'],
+                'metrics': metrics,
+                'ms': ms,
+                'cached': cached
+            }
+
+            event = {
+                'job_id': job_id,
+                'stage': update['stage'],
+                'status': update['status'],
+                'metrics': metrics,
+                'ms': ms,
+                'cached': cached
+            }
+            self._enqueue(job_id, event)
+            events.append(event)
+
+        await self._publish(job_id, events=events)
+
+        logger.debug(f"Job {job_id}: {len(updates)} stage updates")
+
+    async def emit_address(self, job_id: str, address: Union[Dict[str, Any], orjson.Fragment]):
+        """
+        Emit a single ranked address as its own SSE event
+
+        Lets clients render results progressively instead of waiting for
+        the COMPLETE event's full payload. Pass an orjson.Fragment to embed
+        already-encoded JSON as-is.
+        """
+        if job_id not in self.jobs:
+            return
+
+        event = {
+            'job_id': job_id,
+            'stage': 'ADDRESS',
+            'status': 'done',
+            'address': address
+        }
+
+        self._enqueue(job_id, event)
+        await self._publish(job_id, events=[event])
+
     async def complete_job(
         self,
         job_id: str,
-        result: Dict[str, Any],
+        result: Union[Dict[str, Any], bytes],
         degraded: Optional[List[str]] = None
     ):
-        """Mark job as complete with final result"""
+        """
+        Mark job as complete with final result
+
+        `result` may be a JSON-ready dict or already-encoded JSON bytes.
+        It is stored encoded, and embedded verbatim (orjson.Fragment) in
+        the COMPLETE event and the polling response, so it's encoded once.
+        """
         if job_id not in self.jobs:
             return
 
+        if not isinstance(result, bytes):
+            result = orjson.dumps(result)
+
         self.jobs[job_id]['status'] = (
             JobStatus.DEGRADED if degraded else JobStatus.COMPLETE
         )
-        self.jobs[job_id]['result'] = result
+        self.jobs[job_id]['result_json'] = result
         self.jobs[job_id]['degraded'] = degraded or []
         self.jobs[job_id]['completed_at'] = datetime.utcnow()
 
@@ -143,16 +375,28 @@ class JobManager:
             'job_id': job_id,
             'stage': 'COMPLETE',
             'status': 'done',
-            'result': result
+            'result': orjson.Fragment(result)
         }
 
-        if job_id in self.job_queues:
-            await self.job_queues[job_id].put(completion_event)
-            # Signal end of stream
-            await self.job_queues[job_id].put(None)
+        self._enqueue(job_id, completion_event)
+        # Signal end of stream
+        self._enqueue(job_id, None)
+        await self._publish(job_id, fields={
+            'status': self.jobs[job_id]['status'],
+            'result_json': result,
+            'degraded': orjson.dumps(degraded or [])
+        }, events=[completion_event, None])
 
         logger.info(f"Job {job_id} completed")
 
+    async def mark_running(self, job_id: str):
+        """Move a pending job to RUNNING"""
+        if job_id not in self.jobs:
+            return
+
+        self.jobs[job_id]['status'] = JobStatus.RUNNING
+        await self._publish(job_id, fields={'status': JobStatus.RUNNING})
+
     async def fail_job(self, job_id: str, error: str):
         """Mark job as failed"""
         if job_id not in self.jobs:
@@ -170,60 +414,191 @@ class JobManager:
             'error': error
         }
 
-        if job_id in self.job_queues:
-            await self.job_queues[job_id].put(failure_event)
-            await self.job_queues[job_id].put(None)
+        self._enqueue(job_id, failure_event)
+        self._enqueue(job_id, None)
+        await self._publish(job_id, fields={
+            'status': JobStatus.FAILED,
+            'error': error
+        }, events=[failure_event, None])
 
         logger.error(f"Job {job_id} failed: {error}")
 
-    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get job status and result"""
-        return self.jobs.get(job_id)
+    def _enqueue(self, job_id: str, event: Optional[Dict[str, Any]]):
+        """
+        Push an SSE event without ever blocking the producer
+
+        When the client isn't keeping up and the queue is full, the oldest
+        buffered event is overwritten. COMPLETE/ERROR and the end sentinel are
+        always the newest entries, so they are never the ones dropped.
+        """
+        queue = self.job_queues.get(job_id)
+        if queue is None:
+            return
+
+        if queue.put_nowait(event):
+            logger.warning(f"Slow SSE consumer for job {job_id}: dropped oldest event")
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get job status and result
 
-    async def stream_job_events(self, job_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        Jobs running on this worker come from memory; others from the Redis
+        mirror (status, city, concept, limit, result_json, error, degraded only).
         """
-        Stream SSE events for a job
+        job = self.jobs.get(job_id)
+        if job is not None or self.redis is None:
+            return job
+
+        try:
+            fields = await self.redis.hgetall(self._job_key(job_id))
+        except Exception as e:
+            logger.warning(f"Redis job lookup failed for {job_id}: {e}")
+            return None
+        if not fields:
+            return None
+
+        fields = {k.decode(): v for k, v in fields.items()}
+        return {
+            'job_id': job_id,
+            'status': fields['status'].decode(),
+            'city': fields.get('city', b'').decode(),
+            'concept': fields.get('concept', b'').decode(),
+            'limit': int(fields.get('limit', 0)),
+            'include_crime': fields.get('include_crime') == b'1',
+            'degraded': orjson.loads(fields['degraded']) if 'degraded' in fields else [],
+            'result_json': fields.get('result_json'),
+            'error': fields['error'].decode() if 'error' in fields else None
+        }
 
-        Yields events until job completes or fails
+    async def stream_job_events(self, job_id: str) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """
+        Stream SSE events for a job, in batches
+
+        Each wake-up drains everything already queued and yields it as one
+        list, so a burst of stage updates goes out as one write. COMPLETE and
+        ERROR are always yielded in a batch of their own so they aren't held
+        behind anything. Yields until job completes or fails.
         """
         if job_id not in self.job_queues:
-            logger.warning(f"No event queue for job {job_id}")
+            if self.redis is not None:
+                # Job runs on another worker: follow its mirrored event stream
+                async for batch in self._stream_redis_events(job_id):
+                    yield batch
+            else:
+                logger.warning(f"No event queue for job {job_id}")
             return
 
         queue = self.job_queues[job_id]
 
-        while True:
-            try:
-                # Wait for next event (with timeout)
-                event = await asyncio.wait_for(queue.get(), timeout=60.0)
-
+        # A pending get is held across keepalive ticks rather than re-armed via
+        # wait_for on every event; when events are already queued no task is made
+        get_task: Optional[asyncio.Task] = None
+        keepalive: Optional[asyncio.Task] = None
+
+        try:
+            while True:
+                if not queue.empty():
+                    event = queue.get_nowait()
+                else:
+                    if get_task is None:
+                        get_task = asyncio.create_task(queue.get())
+                    if keepalive is None:
+                        keepalive = asyncio.create_task(asyncio.sleep(KEEPALIVE_SECONDS))
+
+                    await asyncio.wait({get_task, keepalive}, return_when=asyncio.FIRST_COMPLETED)
+
+                    if keepalive.done():
+                        keepalive = None
+                    if not get_task.done():
+                        # Send keepalive
+                        yield [{'type': 'keepalive'}]
+                        continue
+
+                    try:
+                        event = get_task.result()
+                    except Exception as e:
+                        logger.error(f"Error streaming job {job_id}: {e}")
+                        break
+                    finally:
+                        get_task = None
+
+                batch = []
+                while event is not None:
+                    if event.get('stage') in ('COMPLETE', 'ERROR') and batch:
+                        yield batch
+                        batch = []
+                    batch.append(event)
+                    if queue.empty():
+                        break
+                    event = queue.get_nowait()
+
+                if batch:
+                    yield batch
                 if event is None:
                     # End of stream signal
                     break
+        finally:
+            for task in (get_task, keepalive):
+                if task is not None:
+                    task.cancel()
 
-                yield event
+    async def _stream_redis_events(self, job_id: str) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """stream_job_events for a job on another worker: XREAD BLOCK from the start of its stream"""
+        events_key = self._events_key(job_id)
+        last_id = "0"
 
-            except asyncio.TimeoutError:
+        while True:
+            try:
+                response = await self.redis.xread(
+                    {events_key: last_id},
+                    count=JOB_EVENTS_MAXLEN,
+                    block=int(KEEPALIVE_SECONDS * 1000)
+                )
+            except Exception as e:
+                logger.error(f"Error streaming job {job_id} from Redis: {e}")
+                return
+
+            if not response:
                 # Send keepalive
-                yield {'type': 'keepalive'}
+                yield [{'type': 'keepalive'}]
                 continue
-            except Exception as e:
-                logger.error(f"Error streaming job {job_id}: {e}")
-                break
+
+            batch = []
+            for entry_id, fields in response[0][1]:
+                last_id = entry_id
+                payload = fields[b"e"]
+                if not payload:
+                    # End of stream signal
+                    if batch:
+                        yield batch
+                    return
+
+                event = orjson.loads(payload)
+                if event.get('stage') in ('COMPLETE', 'ERROR') and batch:
+                    yield batch
+                    batch = []
+                batch.append(event)
+
+            if batch:
+                yield batch
 
     async def cleanup_expired_jobs(self):
-        """Clean up expired jobs (run periodically)"""
+        """Clean up expired jobs (run periodically); pops only the expired heap entries"""
         now = datetime.utcnow()
-        expired_jobs = [
-            job_id for job_id, job in self.jobs.items()
-            if job['expires_at'] < now
-        ]
+        heap = self._expiry_heap
+        expired_jobs = []
+
+        while heap and heap[0][0] < now:
+            expires_at, job_id = heapq.heappop(heap)
+            job = self.jobs.get(job_id)
+            # Skip stale entries (job already gone or its expiry was moved)
+            if job is None or job['expires_at'] != expires_at:
+                continue
 
-        for job_id in expired_jobs:
             logger.info(f"Cleaning up expired job {job_id}")
+            expired_jobs.append(job_id)
             del self.jobs[job_id]
-            if job_id in self.job_queues:
-                del self.job_queues[job_id]
+            self.job_queues.pop(job_id, None)
 
         if expired_jobs:
             logger.info(f"Cleaned up {len(expired_jobs)} expired jobs")
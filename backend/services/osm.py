@@ -4,16 +4,130 @@ https://wiki.openstreetmap.org/wiki/Overpass_API
 """
 
 import httpx
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from math import radians, cos
 import os
 import asyncio
+import functools
+from string import Template
+import numpy as np
+import orjson
+
+EARTH_RADIUS_M = 6371000
+
+# Concept -> OSM amenity types counted as competitors
+CONCEPT_AMENITIES = {
+    "QSR": ("fast_food", "restaurant"),
+    "FastCasual": ("restaurant", "cafe"),
+    "Coffee": ("cafe",),
+    "CasualDining": ("restaurant",),
+    "FineDining": ("restaurant",)
+}
+DEFAULT_AMENITIES = ("restaurant", "fast_food", "cafe")
+
+# Overpass QL is fixed by (concept, radii); each variant is built once as a
+# Template and only the $lat/$lng coordinates are substituted per request
+
+
+def _amenity_node_queries(amenities: Tuple[str, ...], radius_m: int) -> str:
+    """Overpass QL node queries for multiple amenity types"""
+    return "\n  ".join(
+        f'node["amenity"="{amenity}"](around:{radius_m},$lat,$lng);' for amenity in amenities
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _competitors_query(concept: str, radius_m: int) -> Template:
+    return Template(f"""
+        [out:json][timeout:25];
+        (
+            {_amenity_node_queries(CONCEPT_AMENITIES.get(concept, DEFAULT_AMENITIES), radius_m)}
+        );
+        out body;
+        """)
+
+
+@functools.lru_cache(maxsize=64)
+def _transit_query(radius_m: int) -> Template:
+    return Template(f"""
+        [out:json][timeout:25];
+        (
+            node["railway"="subway_entrance"](around:{radius_m},$lat,$lng);
+            node["railway"="tram_stop"](around:{radius_m},$lat,$lng);
+            node["public_transport"="stop_position"](around:{radius_m},$lat,$lng);
+        );
+        out body;
+        """)
+
+
+@functools.lru_cache(maxsize=64)
+def _walkability_query(radius_m: int) -> Template:
+    return Template(f"""
+        [out:json][timeout:25];
+        (
+            node["amenity"](around:{radius_m},$lat,$lng);
+            node["shop"](around:{radius_m},$lat,$lng);
+        );
+        out count;
+        """)
+
+
+@functools.lru_cache(maxsize=64)
+def _bundle_query(concept: str, comp_radius: int, transit_radius: int, walk_radius: int) -> Template:
+    return Template(f"""
+        [out:json][timeout:25];
+        (
+            {_amenity_node_queries(CONCEPT_AMENITIES.get(concept, DEFAULT_AMENITIES), comp_radius)}
+        )->.comp;
+        (
+            node["railway"="subway_entrance"](around:{transit_radius},$lat,$lng);
+            node["railway"="tram_stop"](around:{transit_radius},$lat,$lng);
+        )->.transit;
+        (
+            node["amenity"](around:{walk_radius},$lat,$lng);
+            node["shop"](around:{walk_radius},$lat,$lng);
+        )->.walk;
+        .comp out body;
+        .comp out count;
+        .transit out body;
+        .transit out count;
+        .walk out count;
+        """)
 
 
 class OSMService:
     """OpenStreetMap data via Overpass API"""
 
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.overpass_url = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+        # Shared keep-alive client when provided; otherwise one pooled client
+        # is created on first use and reused for every Overpass call
+        self.client = client
+        self._owns_client = False
+        # Public Overpass only serves a few concurrent slots per client IP;
+        # every request holds one of these for its duration
+        self._overpass_slots = asyncio.Semaphore(int(os.getenv("OVERPASS_MAX_CONCURRENCY", "3")))
+        # Overpass bundles currently being fetched, keyed on their exact parameters
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    @asynccontextmanager
+    async def _http(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=30.0
+            )
+            self._owns_client = True
+        async with self._overpass_slots:
+            yield self.client
+
+    async def aclose(self):
+        """Close the pooled client if this service created it"""
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
 
     async def get_competitors(
         self,
@@ -33,21 +147,9 @@ class OSMService:
         Returns:
             List of competitor POIs with name, type, distance
         """
-        # Map concepts to OSM tags
-        amenity_filters = self._get_amenity_filters(concept)
+        query = _competitors_query(concept, radius_m).substitute(lat=lat, lng=lng)
 
-        # Build Overpass QL query
-        query = f"""
-        [out:json][timeout:25];
-        (
-            {self._build_node_queries(lat, lng, radius_m, amenity_filters)}
-        );
-        out body;
-        >;
-        out skel qt;
-        """
-
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     self.overpass_url,
@@ -55,43 +157,14 @@ class OSMService:
                     timeout=30.0
                 )
                 response.raise_for_status()
-                data = response.json()
-
-                competitors = []
-                for element in data.get("elements", []):
-                    if element["type"] == "node":
-                        competitors.append({
-                            "name": element.get("tags", {}).get("name", "Unknown"),
-                            "amenity": element.get("tags", {}).get("amenity", ""),
-                            "cuisine": element.get("tags", {}).get("cuisine", ""),
-                            "latitude": element["lat"],
-                            "longitude": element["lon"],
-                            "distance_m": self._haversine_distance(lat, lng, element["lat"], element["lon"])
-                        })
-
-                return sorted(competitors, key=lambda x: x["distance_m"])
-
-            except httpx.HTTPError as e:
-                print(f"OSM Overpass error: {e}")
-                return []
+                data = orjson.loads(response.content)
 
-    def _get_amenity_filters(self, concept: str) -> List[str]:
-        """Map concept to OSM amenity types"""
-        concept_map = {
-            "QSR": ["fast_food", "restaurant"],
-            "FastCasual": ["restaurant", "cafe"],
-            "Coffee": ["cafe"],
-            "CasualDining": ["restaurant"],
-            "FineDining": ["restaurant"]
-        }
-        return concept_map.get(concept, ["restaurant", "fast_food", "cafe"])
+                nodes = [e for e in data.get("elements", []) if e["type"] == "node"]
+                return self._parse_competitors(lat, lng, nodes)
 
-    def _build_node_queries(self, lat: float, lng: float, radius_m: int, amenities: List[str]) -> str:
-        """Build Overpass QL node queries for multiple amenity types"""
-        queries = []
-        for amenity in amenities:
-            queries.append(f'node["amenity"="{amenity}"](around:{radius_m},{lat},{lng});')
-        return "\n  ".join(queries)
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                print(f"OSM Overpass error: {e}")
+                return []
 
     async def get_transit_stops(
         self,
@@ -110,17 +183,9 @@ class OSMService:
                 "nearest_tram_distance_m": 120
             }
         """
-        query = f"""
-        [out:json][timeout:25];
-        (
-            node["railway"="subway_entrance"](around:{radius_m},{lat},{lng});
-            node["railway"="tram_stop"](around:{radius_m},{lat},{lng});
-            node["public_transport"="stop_position"](around:{radius_m},{lat},{lng});
-        );
-        out body;
-        """
+        query = _transit_query(radius_m).substitute(lat=lat, lng=lng)
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     self.overpass_url,
@@ -128,42 +193,13 @@ class OSMService:
                     timeout=30.0
                 )
                 response.raise_for_status()
-                data = response.json()
-
-                metro_stations = []
-                tram_stops = []
-
-                for element in data.get("elements", []):
-                    if element["type"] == "node":
-                        distance = self._haversine_distance(lat, lng, element["lat"], element["lon"])
-                        stop_info = {
-                            "name": element.get("tags", {}).get("name", "Unknown"),
-                            "latitude": element["lat"],
-                            "longitude": element["lon"],
-                            "distance_m": distance
-                        }
-
-                        railway = element.get("tags", {}).get("railway")
-                        if railway == "subway_entrance":
-                            metro_stations.append(stop_info)
-                        elif railway == "tram_stop":
-                            tram_stops.append(stop_info)
-
-                return {
-                    "metro_stations": sorted(metro_stations, key=lambda x: x["distance_m"]),
-                    "tram_stops": sorted(tram_stops, key=lambda x: x["distance_m"]),
-                    "nearest_metro_distance_m": metro_stations[0]["distance_m"] if metro_stations else None,
-                    "nearest_tram_distance_m": tram_stops[0]["distance_m"] if tram_stops else None
-                }
-
-            except httpx.HTTPError as e:
+                data = orjson.loads(response.content)
+
+                return self._parse_transit(lat, lng, data.get("elements", []))
+
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
                 print(f"Transit stops error: {e}")
-                return {
-                    "metro_stations": [],
-                    "tram_stops": [],
-                    "nearest_metro_distance_m": None,
-                    "nearest_tram_distance_m": None
-                }
+                return self._parse_transit(lat, lng, [])
 
     async def get_walkability_pois(
         self,
@@ -175,16 +211,9 @@ class OSMService:
         Count diverse POIs for walkability score
         (shops, cafes, parks, etc.)
         """
-        query = f"""
-        [out:json][timeout:25];
-        (
-            node["amenity"](around:{radius_m},{lat},{lng});
-            node["shop"](around:{radius_m},{lat},{lng});
-        );
-        out count;
-        """
+        query = _walkability_query(radius_m).substitute(lat=lat, lng=lng)
 
-        async with httpx.AsyncClient() as client:
+        async with self._http() as client:
             try:
                 response = await client.post(
                     self.overpass_url,
@@ -192,27 +221,162 @@ class OSMService:
                     timeout=30.0
                 )
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
 
-                # Count total POIs
-                return len(data.get("elements", []))
+                return self._count_total(data.get("elements", []))
 
-            except httpx.HTTPError as e:
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
                 print(f"Walkability POIs error: {e}")
                 return 0
 
-    def _haversine_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-        """Calculate distance between two points in meters"""
-        from math import radians, sin, cos, sqrt, atan2
+    async def get_location_bundle(
+        self,
+        lat: float,
+        lng: float,
+        concept: str = "QSR",
+        comp_radius: int = 1000,
+        transit_radius: int = 500,
+        walk_radius: int = 500
+    ) -> Dict[str, Any]:
+        """
+        Competitors, transit stops and walkability count in one Overpass round-trip
+
+        Same results as get_competitors + get_transit_stops + get_walkability_pois,
+        but the three queries run as named sets of a single request
+
+        Returns:
+            {
+                "competitors": [...],
+                "transit": {...},  # shape of get_transit_stops()
+                "walkability_poi_count": 143
+            }
+
+        Identical concurrent calls share one request (and one result; treat it as read-only).
+        """
+        key = (lat, lng, concept, comp_radius, transit_radius, walk_radius)
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_location_bundle(*key))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shielded so one caller being cancelled doesn't cancel the shared fetch
+        return await asyncio.shield(inflight)
+
+    async def _fetch_location_bundle(
+        self,
+        lat: float,
+        lng: float,
+        concept: str,
+        comp_radius: int,
+        transit_radius: int,
+        walk_radius: int
+    ) -> Dict[str, Any]:
+        """One Overpass request for get_location_bundle (no coalescing)"""
+        query = _bundle_query(concept, comp_radius, transit_radius, walk_radius).substitute(lat=lat, lng=lng)
+
+        async with self._http() as client:
+            try:
+                response = await client.post(
+                    self.overpass_url,
+                    data={"data": query},
+                    timeout=30.0
+                )
+                response.raise_for_status()
+                elements = orjson.loads(response.content).get("elements", [])
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                print(f"OSM Overpass bundle error: {e}")
+                elements = []
 
-        R = 6371000  # Earth radius in meters
+        # Every set is closed by its `out count` element, which splits the
+        # flat element list back into comp / transit / walk
+        groups = [[]]
+        for e in elements:
+            groups[-1].append(e)
+            if e["type"] == "count":
+                groups.append([])
+        comp, transit, walk = (groups + [[], [], []])[:3]
 
-        lat1_rad = radians(lat1)
-        lat2_rad = radians(lat2)
-        delta_lat = radians(lat2 - lat1)
-        delta_lng = radians(lng2 - lng1)
+        return {
+            "competitors": self._parse_competitors(lat, lng, [e for e in comp if e["type"] == "node"]),
+            "transit": self._parse_transit(lat, lng, transit),
+            "walkability_poi_count": self._count_total(walk)
+        }
 
-        a = sin(delta_lat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lng / 2) ** 2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    def _parse_competitors(self, lat: float, lng: float, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Competitor dicts for Overpass nodes, nearest first"""
+        if not nodes:
+            return []
 
-        return R * c
+        # All distances in one vectorized pass, then build dicts in sorted order
+        distances = self._distances_m(lat, lng, nodes)
+        competitors = []
+        for i in np.argsort(distances, kind="stable").tolist():
+            element = nodes[i]
+            tags = element.get("tags", {})
+            competitors.append({
+                "name": tags.get("name", "Unknown"),
+                "amenity": tags.get("amenity", ""),
+                "cuisine": tags.get("cuisine", ""),
+                "latitude": element["lat"],
+                "longitude": element["lon"],
+                "distance_m": float(distances[i])
+            })
+
+        return competitors
+
+    def _parse_transit(self, lat: float, lng: float, elements: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Metro/tram summary for Overpass elements, each list nearest first"""
+        # Only metro entrances and tram stops are reported; measure just those
+        nodes = [
+            e for e in elements
+            if e["type"] == "node" and e.get("tags", {}).get("railway") in ("subway_entrance", "tram_stop")
+        ]
+        distances = self._distances_m(lat, lng, nodes)
+
+        # Walk nodes nearest-first so both lists come out already sorted
+        metro_stations = []
+        tram_stops = []
+
+        for i in np.argsort(distances, kind="stable").tolist():
+            element = nodes[i]
+            tags = element["tags"]
+            stop_info = {
+                "name": tags.get("name", "Unknown"),
+                "latitude": element["lat"],
+                "longitude": element["lon"],
+                "distance_m": float(distances[i])
+            }
+            if tags["railway"] == "subway_entrance":
+                metro_stations.append(stop_info)
+            else:
+                tram_stops.append(stop_info)
+
+        return {
+            "metro_stations": metro_stations,
+            "tram_stops": tram_stops,
+            "nearest_metro_distance_m": metro_stations[0]["distance_m"] if metro_stations else None,
+            "nearest_tram_distance_m": tram_stops[0]["distance_m"] if tram_stops else None
+        }
+
+    @staticmethod
+    def _count_total(elements: List[Dict[str, Any]]) -> int:
+        """POI total from an `out count` result (a single element of type "count")"""
+        for e in elements:
+            if e["type"] == "count":
+                return int(e.get("tags", {}).get("total", 0))
+        return 0
+
+    @staticmethod
+    def _distances_m(lat: float, lng: float, nodes: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Equirectangular distances in meters from (lat, lng) to every node, vectorized
+        Within the ≤1km Overpass search radii this is within a fraction of a meter of haversine
+        """
+        n = len(nodes)
+        lats = np.radians(np.fromiter((e["lat"] for e in nodes), dtype=np.float64, count=n))
+        lngs = np.radians(np.fromiter((e["lon"] for e in nodes), dtype=np.float64, count=n))
+        lat0 = radians(lat)
+        dlat = lats - lat0
+        dlng = (lngs - radians(lng)) * cos(lat0)
+        return EARTH_RADIUS_M * np.sqrt(dlat * dlat + dlng * dlng)
@@ -7,15 +7,76 @@ https://geo.stat.fi/geoserver/vaestoruutu/wfs
 """
 
 import httpx
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 import os
+import asyncio
+from math import radians, sin, cos, pi
 from datetime import datetime
+from cachetools import TTLCache
+import numpy as np
+import orjson
+
+EARTH_RADIUS_KM = 6371
+
+# The 1km grid is published yearly; a fetched bbox stays valid for a day
+GRID_CACHE_TTL_SECONDS = 24 * 3600
+
+# Grid columns: output key -> (WFS property, dtype). Cells are held column-wise
+# (one array per key) so radius filters and sums run as single NumPy calls
+GRID_COLUMNS = {
+    "population": ("vaesto", np.int64),
+    "males": ("miehet", np.int64),
+    "females": ("naiset", np.int64),
+    "age_0_14": ("ika_0_14", np.int64),
+    "age_15_64": ("ika_15_64", np.int64),
+    "age_65_plus": ("ika_65_", np.int64),
+    "grid_id": ("grd_id", object),
+    "municipality": ("kunta", object),
+}
+
+GridArrays = Dict[str, np.ndarray]
+
+
+def _within_radius_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray, radius_km: float) -> np.ndarray:
+    """
+    Mask of points within radius_km (great-circle) of one point
+    Compares the haversine term against sin²(r / 2R) instead of converting it to km,
+    and works in place, so the whole filter is a handful of passes with two temporaries
+    """
+    half_dlat = lats - lat
+    np.radians(half_dlat, out=half_dlat)
+    half_dlat *= 0.5
+    np.sin(half_dlat, out=half_dlat)
+    half_dlat *= half_dlat
+
+    half_dlng = lngs - lng
+    np.radians(half_dlng, out=half_dlng)
+    half_dlng *= 0.5
+    np.sin(half_dlng, out=half_dlng)
+    half_dlng *= half_dlng
+    half_dlng *= np.cos(np.radians(lats))
+    half_dlng *= cos(radians(lat))
+
+    half_dlat += half_dlng
+    return half_dlat <= sin(min(radius_km / (2 * EARTH_RADIUS_KM), pi / 2)) ** 2
+
+
+def _grid_cells(arrays: GridArrays) -> List[Dict[str, Any]]:
+    """Per-cell dicts from grid arrays, for callers that want the row view"""
+    keys = ["latitude", "longitude", *GRID_COLUMNS]
+    columns = [arrays[key].tolist() for key in keys]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
 
 
 class PopulationGridService:
     """Statistics Finland 1km population grid covering all of Finland"""
 
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # Shared keep-alive client when provided; otherwise one pooled client
+        # is created on first use and reused for every WFS call
+        self.client = client
+        self._owns_client = False
         self.wfs_url = os.getenv(
             "STATFIN_WFS_URL",
             "https://geo.stat.fi/geoserver/vaestoruutu/wfs"
@@ -23,7 +84,27 @@ class PopulationGridService:
         # Use latest available year (2023 as of 2025)
         self.current_year = 2023
         self.layer_name = f"vaestoruutu:vaki{self.current_year}_1km"
-        self.cache = {}  # Simple in-memory cache
+        # Bounded grid cache keyed on the bbox rounded to ~100m, so near-identical
+        # bboxes share an entry; one lock per in-flight bbox prevents cold-start dogpiles
+        self.cache: TTLCache = TTLCache(maxsize=512, ttl=GRID_CACHE_TTL_SECONDS)
+        self._cache_locks: Dict[Tuple[float, ...], asyncio.Lock] = {}
+
+    @asynccontextmanager
+    async def _http(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=30.0
+            )
+            self._owns_client = True
+        yield self.client
+
+    async def aclose(self):
+        """Close the pooled client if this service created it"""
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
 
     async def get_population_grid(
         self,
@@ -31,6 +112,7 @@ class PopulationGridService:
     ) -> List[Dict[str, Any]]:
         """
         Get 1km population grid cells within bounding box for ALL of Finland
+        Cached in memory for a day on the bbox rounded to 3 decimals
 
         Args:
             bbox: (min_lng, min_lat, max_lng, max_lat) in WGS84 (EPSG:4326)
@@ -53,13 +135,38 @@ class PopulationGridService:
                 ...
             ]
         """
-        min_lng, min_lat, max_lng, max_lat = bbox
+        return _grid_cells(await self._get_grid_arrays(bbox))
 
-        # Check cache
-        cache_key = f"grid_{min_lng}_{min_lat}_{max_lng}_{max_lat}"
+    async def _get_grid_arrays(
+        self,
+        bbox: tuple[float, float, float, float]
+    ) -> GridArrays:
+        """Grid cells in `bbox` as column arrays (see GRID_COLUMNS), through the cache"""
+        cache_key = tuple(round(v, 3) for v in bbox)
         if cache_key in self.cache:
             return self.cache[cache_key]
 
+        lock = self._cache_locks.setdefault(cache_key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another caller may have fetched this bbox while we waited
+                if cache_key in self.cache:
+                    return self.cache[cache_key]
+                arrays = await self._fetch_population_grid(bbox)
+                if arrays is None:
+                    return self._parse_features([])
+                self.cache[cache_key] = arrays
+                return arrays
+        finally:
+            self._cache_locks.pop(cache_key, None)
+
+    async def _fetch_population_grid(
+        self,
+        bbox: tuple[float, float, float, float]
+    ) -> Optional[GridArrays]:
+        """Fetch and parse grid cells from the WFS; None on request failure (not cached)"""
+        min_lng, min_lat, max_lng, max_lat = bbox
+
         params = {
             "service": "WFS",
             "version": "2.0.0",
@@ -70,43 +177,53 @@ class PopulationGridService:
             "bbox": f"{min_lat},{min_lng},{max_lat},{max_lng},EPSG:4326"
         }
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self._http() as client:
             try:
-                response = await client.get(self.wfs_url, params=params)
+                response = await client.get(self.wfs_url, params=params, timeout=30.0)
                 response.raise_for_status()
-                data = response.json()
-
-                grid_cells = []
-                for feature in data.get("features", []):
-                    props = feature["properties"]
-                    geometry = feature["geometry"]
-
-                    # Get center of grid cell
-                    if geometry["type"] == "Polygon":
-                        coords = geometry["coordinates"][0]
-                        center_lng = sum(c[0] for c in coords) / len(coords)
-                        center_lat = sum(c[1] for c in coords) / len(coords)
-
-                        grid_cells.append({
-                            "latitude": center_lat,
-                            "longitude": center_lng,
-                            "population": props.get("vaesto", 0),
-                            "males": props.get("miehet", 0),
-                            "females": props.get("naiset", 0),
-                            "age_0_14": props.get("ika_0_14", 0),
-                            "age_15_64": props.get("ika_15_64", 0),
-                            "age_65_plus": props.get("ika_65_", 0),
-                            "grid_id": props.get("grd_id", ""),
-                            "municipality": props.get("kunta", "")
-                        })
-
-                # Cache the result
-                self.cache[cache_key] = grid_cells
-                return grid_cells
-
-            except httpx.HTTPError as e:
+                # orjson straight off the bytes; the WFS grid can be megabytes of GeoJSON
+                features = orjson.loads(response.content).get("features", [])
+                # Drop the raw body before the column build so the two never peak together
+                del response
+                return self._parse_features(features)
+
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
                 print(f"Statistics Finland WFS error: {e}")
-                return []
+                return None
+
+    @staticmethod
+    def _parse_features(features: List[Dict[str, Any]]) -> GridArrays:
+        """WFS polygon features -> grid column arrays"""
+        polygons = [feature for feature in features if feature["geometry"]["type"] == "Polygon"]
+
+        # Center of every grid cell at once, computed here so cached grids never
+        # redo it: stack all outer rings, then per-ring vertex means via reduceat
+        if polygons:
+            rings = [feature["geometry"]["coordinates"][0] for feature in polygons]
+            lengths = np.fromiter((len(ring) for ring in rings), dtype=np.intp, count=len(rings))
+            # Flat float stream straight into the array: no per-vertex list copies
+            vertices = np.fromiter(
+                (v for ring in rings for c in ring for v in (c[0], c[1])),
+                dtype=np.float64, count=2 * int(lengths.sum())
+            ).reshape(-1, 2)
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            centers = np.add.reduceat(vertices, starts, axis=0) / lengths[:, None]
+        else:
+            centers = np.empty((0, 2), dtype=np.float64)
+
+        arrays: GridArrays = {
+            "latitude": centers[:, 1].copy(),
+            "longitude": centers[:, 0].copy(),
+        }
+        for key, (prop, dtype) in GRID_COLUMNS.items():
+            if dtype is object:
+                arrays[key] = np.array([feature["properties"].get(prop) or "" for feature in polygons], dtype=object)
+            else:
+                arrays[key] = np.fromiter(
+                    (feature["properties"].get(prop) or 0 for feature in polygons),
+                    dtype=dtype, count=len(polygons)
+                )
+        return arrays
 
     async def get_population_in_area(
         self,
@@ -146,29 +263,16 @@ class PopulationGridService:
             lat + lat_offset
         )
 
-        grid_cells = await self.get_population_grid(bbox)
-
-        # Filter to cells actually within radius using haversine
-        from math import radians, sin, cos, sqrt, atan2
+        grid = await self._get_grid_arrays(bbox)
 
-        def distance(lat1, lng1, lat2, lng2):
-            R = 6371  # Earth radius in km
-            dlat = radians(lat2 - lat1)
-            dlng = radians(lng2 - lng1)
-            a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng/2)**2
-            c = 2 * atan2(sqrt(a), sqrt(1-a))
-            return R * c
-
-        cells_in_radius = [
-            cell for cell in grid_cells
-            if distance(lat, lng, cell["latitude"], cell["longitude"]) <= radius_km
-        ]
+        # Filter to cells actually within radius (haversine over all cells at once)
+        in_radius = _within_radius_km(lat, lng, grid["latitude"], grid["longitude"], radius_km)
 
         # Aggregate demographics
-        total_population = sum(cell["population"] for cell in cells_in_radius)
-        age_0_14 = sum(cell["age_0_14"] for cell in cells_in_radius)
-        age_15_64 = sum(cell["age_15_64"] for cell in cells_in_radius)
-        age_65_plus = sum(cell["age_65_plus"] for cell in cells_in_radius)
+        total_population = int(grid["population"][in_radius].sum())
+        age_0_14 = int(grid["age_0_14"][in_radius].sum())
+        age_15_64 = int(grid["age_15_64"][in_radius].sum())
+        age_65_plus = int(grid["age_65_plus"][in_radius].sum())
 
         # Calculate percentages
         age_0_14_pct = (age_0_14 / total_population * 100) if total_population > 0 else 0
@@ -179,12 +283,12 @@ class PopulationGridService:
         density = total_population / area_km2 if area_km2 > 0 else 0
 
         return {
-            "total_population": int(total_population),
-            "grid_cells_count": len(cells_in_radius),
+            "total_population": total_population,
+            "grid_cells_count": int(in_radius.sum()),
             "population_density": int(density),
-            "age_0_14": int(age_0_14),
-            "age_15_64": int(age_15_64),
-            "age_65_plus": int(age_65_plus),
+            "age_0_14": age_0_14,
+            "age_15_64": age_15_64,
+            "age_65_plus": age_65_plus,
             "demographics": {
                 "age_0_14_percent": round(age_0_14_pct, 1),
                 "age_15_64_percent": round(age_15_64_pct, 1),
@@ -222,18 +326,21 @@ class PopulationGridService:
             lat + lat_offset
         )
 
-        grid_cells = await self.get_population_grid(bbox)
+        grid = await self._get_grid_arrays(bbox)
 
         # Transform for heatmap (include population density as intensity)
-        heatmap_data = []
-        for cell in grid_cells:
-            if cell["population"] > 0:  # Only show inhabited cells
-                heatmap_data.append({
-                    "latitude": cell["latitude"],
-                    "longitude": cell["longitude"],
-                    "population": cell["population"],
-                    "intensity": min(cell["population"] / 100, 50)  # Normalize for heatmap
-                })
+        inhabited = grid["population"] > 0  # Only show inhabited cells
+        populations = grid["population"][inhabited]
+        intensities = np.minimum(populations / 100, 50)  # Normalize for heatmap
+        heatmap_data = [
+            {"latitude": cell_lat, "longitude": cell_lng, "population": population, "intensity": intensity}
+            for cell_lat, cell_lng, population, intensity in zip(
+                grid["latitude"][inhabited].tolist(),
+                grid["longitude"][inhabited].tolist(),
+                populations.tolist(),
+                intensities.tolist()
+            )
+        ]
 
         print(f"Generated heatmap for {city_name}: {len(heatmap_data)} populated cells")
         return heatmap_data
@@ -0,0 +1,89 @@
+"""
+Response Cache - Redis-backed cache for serialized API responses
+
+Stores ready-to-send JSON bodies under short TTLs so hot read endpoints
+skip the DB round-trip and Pydantic serialization on a hit.
+Disabled (every call is a miss / no-op) when REDIS_URL is unset or the
+redis package is not installed.
+"""
+
+import os
+import hashlib
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheTTL:
+    SHORT = 30
+    NORMAL = 60
+    LONG = 300
+
+
+class ResponseCache:
+    """Thin wrapper over a sync Redis client; callers run in FastAPI's threadpool"""
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or os.getenv("REDIS_URL")
+        self.client = None
+
+        if not self.url:
+            return
+
+        try:
+            import redis
+            self.client = redis.Redis.from_url(self.url, socket_timeout=0.5)
+        except ImportError:
+            logger.warning("REDIS_URL set but redis package not installed; response cache disabled")
+
+    @staticmethod
+    def key(namespace: str, *parts: Any) -> str:
+        """Stable key for a set of query params: `{namespace}:{blake2b(parts)}`"""
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+        return f"{namespace}:{digest}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        if self.client is None:
+            return None
+        try:
+            return self.client.get(key)
+        except Exception as e:
+            logger.warning(f"Cache get failed for {key}: {e}")
+            return None
+
+    def set(self, key: str, body: bytes, ttl: int = CacheTTL.NORMAL) -> None:
+        if self.client is None:
+            return
+        try:
+            self.client.set(key, body, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Cache set failed for {key}: {e}")
+
+    def delete(self, *keys: str) -> None:
+        if self.client is None or not keys:
+            return
+        try:
+            self.client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Cache delete failed: {e}")
+
+    def delete_prefix(self, prefix: str) -> None:
+        """SCAN + DEL every key under `prefix` (never KEYS, which blocks Redis)"""
+        if self.client is None:
+            return
+        try:
+            batch = []
+            for key in self.client.scan_iter(match=f"{prefix}*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    self.client.delete(*batch)
+                    batch = []
+            if batch:
+                self.client.delete(*batch)
+        except Exception as e:
+            logger.warning(f"Cache prefix delete failed for {prefix}: {e}")
+
+
+# Global instance
+response_cache = ResponseCache()
@@ -6,21 +6,232 @@ PAAVO API Documentation:
 https://pxdata.stat.fi/PxWeb/api/v1/en/Postinumeroalueittainen_avoin_tieto/
 """
 
+import asyncio
 import httpx
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Final, Mapping, AsyncIterator
+import logging
 import os
+import re
 import json
-from datetime import datetime, timedelta
+import orjson
+from cachetools import TTLCache
+from pyproj import Transformer
+import numpy as np
+
+
+class _RepeatFilter(logging.Filter):
+    """
+    Drop warnings/errors from a call site already logged within `interval` seconds
+    Keeps a PXWeb outage from printing one message (or traceback) per request
+    """
+
+    def __init__(self, interval: float = 60.0):
+        super().__init__()
+        self.interval = interval
+        self._last_logged: Dict[tuple, float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        last = self._last_logged.get(key)
+        if last is not None and record.created - last < self.interval:
+            return False
+        self._last_logged[key] = record.created
+        return True
+
+
+logger = logging.getLogger(__name__)
+logger.addFilter(_RepeatFilter())
+
+# Finnish postal codes are exactly five ASCII digits; anything else can't
+# exist in PAAVO, so it is rejected before the cache or network
+_POSTAL_CODE_RE: Final = re.compile(r"[0-9]{5}")
+
+
+# Hardcoded demographics for common Helsinki postal codes (for MVP speed)
+# Data approximated from Statistics Finland PAAVO 2023
+_HELSINKI_FALLBACK: Final[Mapping[str, Dict[str, Any]]] = MappingProxyType({
+    # Central Helsinki
+    "00100": {
+        "postal_code": "00100",
+        "area_name": "Keskusta",
+        "population": 2850,
+        "population_density": 4200,
+        "median_income": 48000,
+        "mean_income": 55000,
+        "age_0_14_percent": 8.5,
+        "age_15_64_percent": 75.2,
+        "age_65_plus_percent": 16.3,
+        "higher_education_percent": 52.1
+    },
+    "00120": {
+        "postal_code": "00120",
+        "area_name": "Punavuori",
+        "population": 6200,
+        "population_density": 8100,
+        "median_income": 51000,
+        "mean_income": 62000,
+        "age_0_14_percent": 12.1,
+        "age_15_64_percent": 72.8,
+        "age_65_plus_percent": 15.1,
+        "higher_education_percent": 58.3
+    },
+    # Kamppi area
+    "00180": {
+        "postal_code": "00180",
+        "area_name": "Kamppi",
+        "population": 28000,
+        "population_density": 12500,
+        "median_income": 54000,
+        "mean_income": 64000,
+        "age_0_14_percent": 11.2,
+        "age_15_64_percent": 73.5,
+        "age_65_plus_percent": 15.3,
+        "age_18_24_percent": 18.5,
+        "higher_education_percent": 55.7
+    },
+    # Kallio
+    "00530": {
+        "postal_code": "00530",
+        "area_name": "Kallio",
+        "population": 24500,
+        "population_density": 11200,
+        "median_income": 42000,
+        "mean_income": 48000,
+        "age_0_14_percent": 14.8,
+        "age_15_64_percent": 71.2,
+        "age_65_plus_percent": 14.0,
+        "age_18_24_percent": 16.2,
+        "higher_education_percent": 48.3
+    },
+    # Pasila
+    "00520": {
+        "postal_code": "00520",
+        "area_name": "Pasila",
+        "population": 8500,
+        "population_density": 3200,
+        "median_income": 45000,
+        "mean_income": 52000,
+        "age_0_14_percent": 13.5,
+        "age_15_64_percent": 72.8,
+        "age_65_plus_percent": 13.7,
+        "age_18_24_percent": 14.1,
+        "higher_education_percent": 51.2
+    },
+    # Espoo - Tapiola
+    "02100": {
+        "postal_code": "02100",
+        "area_name": "Tapiola",
+        "population": 18200,
+        "population_density": 5600,
+        "median_income": 58000,
+        "mean_income": 72000,
+        "age_0_14_percent": 16.2,
+        "age_15_64_percent": 68.5,
+        "age_65_plus_percent": 15.3,
+        "age_18_24_percent": 8.5,
+        "higher_education_percent": 62.1
+    }
+})
+
+# Population column of the table above, for radius sums without touching the row dicts
+_HELSINKI_FALLBACK_POPULATION = {pc: row["population"] for pc, row in _HELSINKI_FALLBACK.items()}
 
 
 class StatFinService:
     """Statistics Finland PAAVO postal code demographics"""
 
-    def __init__(self):
+    # EPSG:3067 (EUREF-FIN) to EPSG:4326 (WGS84); building the PROJ pipeline
+    # is slow and the CRS pair never changes, so it's done once
+    _EUREF_TO_WGS84 = Transformer.from_crs("EPSG:3067", "EPSG:4326", always_xy=True)
+
+    # PAAVO "Tiedot" fields requested and read back, by code
+    PAAVO_FIELDS = (
+        "euref_x",       # X coordinate (EUREF-FIN)
+        "euref_y",       # Y coordinate (EUREF-FIN)
+        "pinta_ala",     # Surface area (m²)
+        "he_vakiy",      # Total population
+        "he_kika",       # Average age
+        "he_0_2",        # Age 0-2
+        "he_3_6",        # Age 3-6
+        "he_7_12",       # Age 7-12
+        "he_13_15",      # Age 13-15
+        "he_16_17",      # Age 16-17
+        "he_18_19",      # Age 18-19
+        "he_20_24",      # Age 20-24
+        "he_65_69",      # Age 65-69
+        "he_70_74",      # Age 70-74
+        "he_75_79",      # Age 75-79
+        "he_80_84",      # Age 80-84
+        "he_85_",        # Age 85+
+        "ko_ika18y",     # Adults 18+
+        "ko_yl_kork",    # Higher university degree
+        "ko_al_kork",    # Lower tertiary education
+        "hr_ktu",        # Average income
+        "hr_mtu",        # Median income
+        "pt_tyoll",      # Employed
+        "pt_tyott",      # Unemployed
+    )
+
+    # Column of each field in the per-batch value matrix, and the age-band groups
+    _FIELD_COLUMNS = {code: j for j, code in enumerate(PAAVO_FIELDS)}
+    _AGE_0_14_COLUMNS = list(map(_FIELD_COLUMNS.get, ("he_0_2", "he_3_6", "he_7_12", "he_13_15")))
+    _AGE_65_PLUS_COLUMNS = list(map(_FIELD_COLUMNS.get, ("he_65_69", "he_70_74", "he_75_79", "he_80_84", "he_85_")))
+
+    # PXWeb query body, identical for every request except the postal code list:
+    # encoded once and split around that list
+    _PXWEB_QUERY_PARTS = tuple(orjson.dumps({
+        "query": [
+            {
+                "code": "Postinumeroalue",
+                "selection": {"filter": "item", "values": "$POSTAL_CODES"}
+            },
+            {
+                "code": "Tiedot",
+                "selection": {"filter": "item", "values": list(PAAVO_FIELDS)}
+            },
+            {
+                "code": "Vuosi",
+                "selection": {"filter": "top", "values": ["1"]}  # Get the most recent year
+            }
+        ],
+        "response": {"format": "json-stat2"}  # Modern JSON-Stat 2.0 format
+    }).split(b'"$POSTAL_CODES"'))
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # Shared keep-alive client when provided; otherwise one pooled client
+        # is created on first use and reused for every PXWeb call
+        self.client = client
+        self._owns_client = False
         self.base_url = os.getenv("STATFIN_BASE_URL", "https://pxdata.stat.fi/PxWeb/api/v1")
         self.paavo_path = "en/Postinumeroalueittainen_avoin_tieto"
-        self.cache = {}  # Simple in-memory cache
-        self.cache_ttl = timedelta(days=30)  # PAAVO updates annually
+        # Bounded per-postal-code cache; PAAVO updates annually, so entries live 30 days
+        self.cache: TTLCache = TTLCache(maxsize=4096, ttl=30 * 86400)
+        # Postal codes PXWeb answered with no data (e.g. rural codes missing from
+        # the table); short TTL so a new PAAVO release is picked up within the hour
+        self._negative_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+        # In-flight single-code fetches so concurrent misses share one request
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @asynccontextmanager
+    async def _http(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                timeout=30.0
+            )
+            self._owns_client = True
+        yield self.client
+
+    async def aclose(self):
+        """Close the pooled client if this service created it"""
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
 
     async def get_demographics_by_postal_code(self, postal_code: str) -> Optional[Dict[str, Any]]:
         """
@@ -40,294 +251,272 @@ class StatFinService:
                 "higher_education_percent": 42.1
             }
         """
+        if not _POSTAL_CODE_RE.fullmatch(postal_code):
+            return None
+
         # Check cache first
-        cache_key = f"paavo_{postal_code}"
-        if cache_key in self.cache:
-            cached_data, cached_time = self.cache[cache_key]
-            if datetime.now() - cached_time < self.cache_ttl:
-                return cached_data
+        cached_data = self.cache.get(postal_code)
+        if cached_data is not None:
+            return cached_data
 
-        # Fetch from PXWeb API
-        try:
-            data = await self._fetch_from_pxweb_api(postal_code)
-            if data:
-                # Cache the result
-                self.cache[cache_key] = (data, datetime.now())
-                return data
-        except Exception as e:
-            print(f"Error fetching PAAVO data for {postal_code}: {e}")
+        # Fetch from PXWeb API unless it recently had nothing for this code
+        if postal_code not in self._negative_cache:
+            inflight = self._inflight.get(postal_code)
+            if inflight is None:
+                inflight = asyncio.ensure_future(self._fetch_from_pxweb_api(postal_code))
+                self._inflight[postal_code] = inflight
+                inflight.add_done_callback(lambda _: self._inflight.pop(postal_code, None))
+            try:
+                data = await asyncio.shield(inflight)
+                if data:
+                    return data
+            except Exception:
+                logger.exception(f"Error fetching PAAVO data for {postal_code}")
 
         # Fallback to hardcoded data for common areas (backwards compatibility)
         fallback_data = self._get_demo_data_helsinki(postal_code)
         if fallback_data:
-            print(f"Using fallback data for {postal_code}")
+            logger.debug(f"Using fallback data for {postal_code}")
             return fallback_data
 
         return None
 
     def _get_demo_data_helsinki(self, postal_code: str) -> Optional[Dict[str, Any]]:
+        """Row from the hardcoded Helsinki fallback table (shared; treat as read-only)"""
+        return _HELSINKI_FALLBACK.get(postal_code)
+
+    async def get_demographics_batch(self, postal_codes: List[str]) -> Dict[str, Dict[str, Any]]:
         """
-        Hardcoded demographics for common Helsinki postal codes (for MVP speed)
-        Data approximated from Statistics Finland PAAVO 2023
+        Demographics for many postal codes with one PXWeb request for all cache misses
+
+        Same per-code data and fallbacks as get_demographics_by_postal_code;
+        malformed codes and codes with no data at all are left out of the result.
         """
-        data_map = {
-            # Central Helsinki
-            "00100": {
-                "postal_code": "00100",
-                "area_name": "Keskusta",
-                "population": 2850,
-                "population_density": 4200,
-                "median_income": 48000,
-                "mean_income": 55000,
-                "age_0_14_percent": 8.5,
-                "age_15_64_percent": 75.2,
-                "age_65_plus_percent": 16.3,
-                "higher_education_percent": 52.1
-            },
-            "00120": {
-                "postal_code": "00120",
-                "area_name": "Punavuori",
-                "population": 6200,
-                "population_density": 8100,
-                "median_income": 51000,
-                "mean_income": 62000,
-                "age_0_14_percent": 12.1,
-                "age_15_64_percent": 72.8,
-                "age_65_plus_percent": 15.1,
-                "higher_education_percent": 58.3
-            },
-            # Kamppi area
-            "00100": {
-                "postal_code": "00100",
-                "area_name": "Kamppi",
-                "population": 28000,
-                "population_density": 12500,
-                "median_income": 54000,
-                "mean_income": 64000,
-                "age_0_14_percent": 11.2,
-                "age_15_64_percent": 73.5,
-                "age_65_plus_percent": 15.3,
-                "age_18_24_percent": 18.5,
-                "higher_education_percent": 55.7
-            },
-            # Kallio
-            "00530": {
-                "postal_code": "00530",
-                "area_name": "Kallio",
-                "population": 24500,
-                "population_density": 11200,
-                "median_income": 42000,
-                "mean_income": 48000,
-                "age_0_14_percent": 14.8,
-                "age_15_64_percent": 71.2,
-                "age_65_plus_percent": 14.0,
-                "age_18_24_percent": 16.2,
-                "higher_education_percent": 48.3
-            },
-            # Pasila
-            "00520": {
-                "postal_code": "00520",
-                "area_name": "Pasila",
-                "population": 8500,
-                "population_density": 3200,
-                "median_income": 45000,
-                "mean_income": 52000,
-                "age_0_14_percent": 13.5,
-                "age_15_64_percent": 72.8,
-                "age_65_plus_percent": 13.7,
-                "age_18_24_percent": 14.1,
-                "higher_education_percent": 51.2
-            },
-            # Espoo - Tapiola
-            "02100": {
-                "postal_code": "02100",
-                "area_name": "Tapiola",
-                "population": 18200,
-                "population_density": 5600,
-                "median_income": 58000,
-                "mean_income": 72000,
-                "age_0_14_percent": 16.2,
-                "age_15_64_percent": 68.5,
-                "age_65_plus_percent": 15.3,
-                "age_18_24_percent": 8.5,
-                "higher_education_percent": 62.1
-            }
-        }
+        results = {}
+        missing = []
+        known_misses = []
+        for postal_code in dict.fromkeys(postal_codes):
+            if not _POSTAL_CODE_RE.fullmatch(postal_code):
+                continue
+            cached_data = self.cache.get(postal_code)
+            if cached_data is not None:
+                results[postal_code] = cached_data
+            elif postal_code in self._negative_cache:
+                known_misses.append(postal_code)
+            else:
+                missing.append(postal_code)
 
-        return data_map.get(postal_code)
+        fetched = None
+        if missing:
+            try:
+                fetched = await self._fetch_pxweb_batch(missing)
+            except Exception:
+                logger.exception(f"Error fetching PAAVO data for {len(missing)} postal codes")
+            self._cache_rows(missing, fetched)
+
+        for postal_code in missing + known_misses:
+            data = (fetched or {}).get(postal_code) or self._get_demo_data_helsinki(postal_code)
+            if data:
+                results[postal_code] = data
+
+        return results
 
     async def _fetch_from_pxweb_api(self, postal_code: str) -> Optional[Dict[str, Any]]:
+        """Fetch one postal code from the PXWeb API (see _fetch_pxweb_batch) and cache the outcome"""
+        rows = await self._fetch_pxweb_batch([postal_code])
+        self._cache_rows([postal_code], rows)
+        return rows.get(postal_code) if rows else None
+
+    def _cache_rows(
+        self,
+        postal_codes: List[str],
+        rows: Optional[Dict[str, Dict[str, Any]]]
+    ) -> None:
+        """Cache fetched rows; codes PXWeb answered without go to the negative cache"""
+        if rows is None:
+            # Request failed (network / 5xx / bad payload): nothing learned, retry next time
+            return
+        for postal_code in postal_codes:
+            data = rows.get(postal_code)
+            if data:
+                self.cache[postal_code] = data
+            else:
+                self._negative_cache[postal_code] = True
+
+    async def _fetch_pxweb_batch(self, postal_codes: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
         """
         Fetch from Statistics Finland PXWeb API
         Uses PAAVO dataset: Postinumeroalueittainen avoin tieto
-        
+        All postal codes go in one query; rows come back keyed by postal code.
+        Returns None when the request itself failed, as opposed to PXWeb
+        answering without (some of) the codes.
+
         API Documentation: https://pxdata.stat.fi/api1.html
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self._http() as client:
                 # Step 1: Query the latest PAAVO table (uusin = most recent)
                 # Table 12f7 = "All data groups" (comprehensive dataset)
                 table_url = f"{self.base_url}/{self.paavo_path}/uusin/paavo_pxt_12f7.px"
 
-                # Step 2: Build PXWeb query for this postal code
-                query = {
-                    "query": [
-                        {
-                            "code": "Postinumeroalue",
-                            "selection": {
-                                "filter": "item",
-                                "values": [postal_code]
-                            }
-                        },
-                        {
-                            "code": "Tiedot",
-                            "selection": {
-                                "filter": "item",
-                                "values": [
-                                    "euref_x",       # X coordinate (EUREF-FIN)
-                                    "euref_y",       # Y coordinate (EUREF-FIN)
-                                    "pinta_ala",     # Surface area (m²)
-                                    "he_vakiy",      # Total population
-                                    "he_kika",       # Average age
-                                    "he_0_2",        # Age 0-2
-                                    "he_3_6",        # Age 3-6
-                                    "he_7_12",       # Age 7-12
-                                    "he_13_15",      # Age 13-15
-                                    "he_16_17",      # Age 16-17
-                                    "he_18_19",      # Age 18-19
-                                    "he_20_24",      # Age 20-24
-                                    "he_65_69",      # Age 65-69
-                                    "he_70_74",      # Age 70-74
-                                    "he_75_79",      # Age 75-79
-                                    "he_80_84",      # Age 80-84
-                                    "he_85_",        # Age 85+
-                                    "ko_ika18y",     # Adults 18+
-                                    "ko_yl_kork",    # Higher university degree
-                                    "ko_al_kork",    # Lower tertiary education
-                                    "hr_ktu",        # Average income
-                                    "hr_mtu",        # Median income
-                                    "pt_tyoll",      # Employed
-                                    "pt_tyott",      # Unemployed
-                                ]
-                            }
-                        },
-                        {
-                            "code": "Vuosi",
-                            "selection": {
-                                "filter": "top",
-                                "values": ["1"]  # Get the most recent year
-                            }
-                        }
-                    ],
-                    "response": {"format": "json-stat2"}  # Modern JSON-Stat 2.0 format
-                }
+                # Step 2: Splice the postal codes into the pre-encoded query
+                prefix, suffix = self._PXWEB_QUERY_PARTS
+                body = prefix + orjson.dumps(postal_codes) + suffix
 
                 # Step 3: POST query to API
-                response = await client.post(table_url, json=query)
+                response = await client.post(
+                    table_url,
+                    content=body,
+                    headers={"Content-Type": "application/json"},
+                    timeout=30.0
+                )
 
                 if response.status_code != 200:
-                    print(f"PXWeb API error: {response.status_code} for postal code {postal_code}")
+                    logger.warning(f"PXWeb API error: {response.status_code} for postal codes {postal_codes}")
+                    # PXWeb rejects values missing from the table with 400/404;
+                    # only a single-code query pins that on a specific code
+                    if response.status_code in (400, 404) and len(postal_codes) == 1:
+                        return {}
                     return None
 
-                # Step 4: Parse JSON-Stat 2.0 response
-                result = response.json()
+                # Step 4: Parse JSON-Stat 2.0 response (orjson straight off the bytes)
+                result = orjson.loads(response.content)
 
                 if "value" not in result or not result["value"]:
-                    print(f"No data found for postal code {postal_code}")
-                    return None
+                    logger.debug(f"No data found for postal codes {postal_codes}")
+                    return {}
 
-                # Extract values from JSON-Stat 2.0 format
-                # Values are in same order as requested in "Tiedot" filter
-                values = result["value"]
-                dimensions = result["dimension"]["Tiedot"]["category"]["index"]
-                
-                # Create a mapping of field code to value
-                value_map = {}
-                for field_code, index in dimensions.items():
-                    value_map[field_code] = values[index]
-
-                # Extract postal code label (includes area name)
-                postal_labels = result["dimension"]["Postinumeroalue"]["category"]["label"]
-                area_label = postal_labels.get(postal_code, postal_code)
-                # Format: "00100  Helsinki keskusta - Etu-Töölö (Helsinki)"
-                area_name = area_label.split("  ", 1)[1] if "  " in area_label else postal_code
-
-                # Calculate derived metrics
-                population = float(value_map.get("he_vakiy", 0))
-                area_m2 = float(value_map.get("pinta_ala", 1))
-                area_km2 = area_m2 / 1_000_000 if area_m2 > 0 else 0.01  # Convert m² to km²
-                density = population / area_km2 if area_km2 > 0 else 0
-
-                # Calculate age percentages
-                age_0_14 = (
-                    float(value_map.get("he_0_2", 0)) +
-                    float(value_map.get("he_3_6", 0)) +
-                    float(value_map.get("he_7_12", 0)) +
-                    float(value_map.get("he_13_15", 0))
-                )
-                age_65_plus = (
-                    float(value_map.get("he_65_69", 0)) +
-                    float(value_map.get("he_70_74", 0)) +
-                    float(value_map.get("he_75_79", 0)) +
-                    float(value_map.get("he_80_84", 0)) +
-                    float(value_map.get("he_85_", 0))
-                )
-                age_15_64 = population - age_0_14 - age_65_plus
-
-                # Calculate education percentage (of adults 18+)
-                adults_18_plus = float(value_map.get("ko_ika18y", population))
-                higher_ed = float(value_map.get("ko_yl_kork", 0)) + float(value_map.get("ko_al_kork", 0))
-                higher_ed_percent = (higher_ed / adults_18_plus * 100) if adults_18_plus > 0 else 0
-
-                # Calculate employment rate
-                employed = float(value_map.get("pt_tyoll", 0))
-                unemployed = float(value_map.get("pt_tyott", 0))
-                employment_rate = (employed / (employed + unemployed) * 100) if (employed + unemployed) > 0 else 0
-
-                # Convert EUREF-FIN coordinates to WGS84 (lat/lng)
-                euref_x = float(value_map.get("euref_x", 0))
-                euref_y = float(value_map.get("euref_y", 0))
-                
-                latitude, longitude = None, None
-                if euref_x > 0 and euref_y > 0:
-                    try:
-                        from pyproj import Transformer
-                        # EPSG:3067 (EUREF-FIN) to EPSG:4326 (WGS84)
-                        transformer = Transformer.from_crs("EPSG:3067", "EPSG:4326", always_xy=True)
-                        longitude, latitude = transformer.transform(euref_x, euref_y)
-                    except Exception as e:
-                        print(f"Coordinate conversion error for {postal_code}: {e}")
-
-                # Parse demographics
-                return {
-                    "postal_code": postal_code,
-                    "area_name": area_name,
-                    "latitude": latitude,
-                    "longitude": longitude,
-                    "population": int(population),
-                    "population_density": int(density),
-                    "median_income": int(float(value_map.get("hr_mtu", 0))),
-                    "mean_income": int(float(value_map.get("hr_ktu", 0))),
-                    "age_0_14_percent": round(age_0_14 / population * 100, 1) if population > 0 else 0,
-                    "age_15_64_percent": round(age_15_64 / population * 100, 1) if population > 0 else 0,
-                    "age_65_plus_percent": round(age_65_plus / population * 100, 1) if population > 0 else 0,
-                    "higher_education_percent": round(higher_ed_percent, 1),
-                    "employment_rate": round(employment_rate, 1),
-                    "average_age": float(value_map.get("he_kika", 0)),
-                }
+                # JSON-Stat 2.0 stores one flat row-major value array over the
+                # dimensions in result["id"]; stride of each = product of later sizes
+                strides = {}
+                stride = 1
+                for dim_id, size in zip(reversed(result["id"]), reversed(result["size"])):
+                    strides[dim_id] = stride
+                    stride *= size
+
+                postal_category = result["dimension"]["Postinumeroalue"]["category"]
+                field_index = result["dimension"]["Tiedot"]["category"]["index"]
+                codes = list(postal_category["index"])
+
+                # Gather the known fields for every postal code into one
+                # (codes x PAAVO_FIELDS) matrix; absent fields / nulls stay NaN
+                values = np.array(result["value"], dtype=np.float64)
+                postal_offsets = np.fromiter(
+                    postal_category["index"].values(), dtype=np.intp, count=len(codes)
+                ) * strides["Postinumeroalue"]
+                columns = [j for j, code in enumerate(self.PAAVO_FIELDS) if code in field_index]
+                field_offsets = np.array(
+                    [field_index[self.PAAVO_FIELDS[j]] for j in columns], dtype=np.intp
+                ) * strides["Tiedot"]
+                matrix = np.full((len(codes), len(self.PAAVO_FIELDS)), np.nan)
+                matrix[:, columns] = values[postal_offsets[:, None] + field_offsets[None, :]]
+
+                # Postal code labels include the area name
+                labels = [postal_category["label"].get(code, code) for code in codes]
+                return self._demographics_from_matrix(codes, labels, matrix)
 
         except httpx.HTTPError as e:
-            print(f"HTTP error fetching PAAVO data: {e}")
+            logger.warning(f"HTTP error fetching PAAVO data: {e}")
             return None
-        except KeyError as e:
-            print(f"Error parsing PAAVO response for {postal_code}: {e}")
-            return None
-        except Exception as e:
-            print(f"Unexpected error fetching data for {postal_code}: {e}")
-            import traceback
-            traceback.print_exc()
+        except (KeyError, ValueError, IndexError):
+            # Malformed JSON-Stat payload (orjson.JSONDecodeError is a ValueError)
+            logger.warning(f"Error parsing PAAVO response for {postal_codes}", exc_info=True)
             return None
 
+    def _demographics_from_matrix(
+        self,
+        postal_codes: List[str],
+        area_labels: List[str],
+        matrix: np.ndarray
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Demographics dicts from a (postal codes x PAAVO_FIELDS) value matrix
+        Every derived metric is computed column-wise for all rows at once
+        """
+        def column(code: str, default: Any = 0.0) -> np.ndarray:
+            values = matrix[:, self._FIELD_COLUMNS[code]]
+            return np.where(np.isnan(values), default, values)
+
+        # Calculate derived metrics
+        population = column("he_vakiy")
+        area_m2 = column("pinta_ala", 1.0)
+        area_km2 = np.where(area_m2 > 0, area_m2 / 1_000_000, 0.01)  # Convert m² to km²
+        density = population / area_km2
+
+        # Calculate age percentages
+        values = np.nan_to_num(matrix)
+        age_0_14 = values[:, self._AGE_0_14_COLUMNS].sum(axis=1)
+        age_65_plus = values[:, self._AGE_65_PLUS_COLUMNS].sum(axis=1)
+        age_15_64 = population - age_0_14 - age_65_plus
+
+        # Calculate education percentage (of adults 18+) and employment rate
+        adults_18_plus = column("ko_ika18y", population)
+        higher_ed = column("ko_yl_kork") + column("ko_al_kork")
+        employed = column("pt_tyoll")
+        labour_force = employed + column("pt_tyott")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            def percent(part: np.ndarray, whole: np.ndarray) -> np.ndarray:
+                return np.where(whole > 0, np.round(part / whole * 100, 1), 0)
+
+            age_0_14_pct = percent(age_0_14, population)
+            age_15_64_pct = percent(age_15_64, population)
+            age_65_plus_pct = percent(age_65_plus, population)
+            higher_ed_pct = percent(higher_ed, adults_18_plus)
+            employment_rate = percent(employed, labour_force)
+
+        # Convert EUREF-FIN coordinates to WGS84 (lat/lng), all rows in one call
+        euref_x = column("euref_x")
+        euref_y = column("euref_y")
+        latitudes = [None] * len(postal_codes)
+        longitudes = [None] * len(postal_codes)
+        has_coords = np.flatnonzero((euref_x > 0) & (euref_y > 0))
+        if has_coords.size:
+            try:
+                lngs, lats = self._EUREF_TO_WGS84.transform(euref_x[has_coords], euref_y[has_coords])
+                for i, lat, lng in zip(has_coords.tolist(), np.asarray(lats).tolist(), np.asarray(lngs).tolist()):
+                    latitudes[i], longitudes[i] = lat, lng
+            except Exception as e:
+                logger.warning(f"Coordinate conversion error for {postal_codes}: {e}")
+
+        # Parse demographics
+        rows = {}
+        for i, (postal_code, area_label, pop, dens, median_income, mean_income,
+                p0, p15, p65, edu, emp, avg_age) in enumerate(zip(
+            postal_codes,
+            area_labels,
+            population.astype(np.int64).tolist(),
+            density.astype(np.int64).tolist(),
+            column("hr_mtu").astype(np.int64).tolist(),
+            column("hr_ktu").astype(np.int64).tolist(),
+            age_0_14_pct.tolist(),
+            age_15_64_pct.tolist(),
+            age_65_plus_pct.tolist(),
+            higher_ed_pct.tolist(),
+            employment_rate.tolist(),
+            column("he_kika").tolist(),
+        )):
+            # Format: "00100  Helsinki keskusta - Etu-Töölö (Helsinki)"
+            area_name = area_label.split("  ", 1)[1] if "  " in area_label else postal_code
+            rows[postal_code] = {
+                "postal_code": postal_code,
+                "area_name": area_name,
+                "latitude": latitudes[i],
+                "longitude": longitudes[i],
+                "population": pop,
+                "population_density": dens,
+                "median_income": median_income,
+                "mean_income": mean_income,
+                "age_0_14_percent": p0,
+                "age_15_64_percent": p15,
+                "age_65_plus_percent": p65,
+                "higher_education_percent": edu,
+                "employment_rate": emp,
+                "average_age": avg_age,
+            }
+
+        return rows
+
     def estimate_population_in_radius(
         self,
         postal_codes: list[str],
@@ -337,14 +526,8 @@ class StatFinService:
         Estimate population within radius by aggregating postal codes
         (Rough estimate for MVP)
         """
-        total_pop = 0
-        for pc in postal_codes:
-            data = self._get_demo_data_helsinki(pc)
-            if data:
-                # Weight by approximate overlap (simplified)
-                total_pop += data["population"]
-
-        return total_pop
+        population = _HELSINKI_FALLBACK_POPULATION
+        return sum(population.get(pc, 0) for pc in postal_codes)
 
     def calculate_income_fit_score(
         self,
@@ -374,3 +557,27 @@ class StatFinService:
             max_distance = (target_max - target_min) / 2
             score = 100 - (distance_from_middle / max_distance * 15)
             return max(score, 85)
+
+    def calculate_income_fit_batch(
+        self,
+        median_incomes: np.ndarray,
+        target_min: float,
+        target_max: float
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_income_fit_score over many areas at once
+        Same three-band scoring, evaluated branch-free with np.where
+        """
+        incomes = np.asarray(median_incomes, dtype=np.float64)
+
+        # Below target - penalty based on gap
+        below = np.maximum(50 - np.minimum((target_min - incomes) / target_min * 100, 50), 0)
+        # Above target - smaller penalty (high income not bad)
+        above = np.maximum(75 - np.minimum((incomes - target_max) / target_max * 50, 25), 50)
+        # Within target range - bonus for being in middle of range
+        middle = (target_min + target_max) / 2
+        max_distance = (target_max - target_min) / 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            within = np.fmax(100 - np.abs(incomes - middle) / max_distance * 15, 85)
+
+        return np.where(incomes < target_min, below, np.where(incomes > target_max, above, within))
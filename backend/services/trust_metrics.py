@@ -2,16 +2,88 @@
 Trust Metrics Calculator
 Computes confidence, coverage, and method info for transparency
 """
-from typing import Dict, Any
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Mapping, Tuple
 from datetime import datetime
 from models.schemas import DataCoverage, MethodInfo
 
 
+# Feature groups checked by calculate_coverage
+_DEMO_FIELDS = ("population_1km", "population_density", "median_income")
+_COMP_FIELDS = ("competitors_count", "competitors_per_1k_residents")
+_TRANSIT_FIELDS = ("nearest_metro_distance_m", "nearest_tram_distance_m", "walkability_poi_count")
+_COVERAGE_FIELDS = _DEMO_FIELDS + _COMP_FIELDS + _TRANSIT_FIELDS
+
+# Features whose presence in score_components feeds calculate_confidence
+_REQUIRED_FEATURES = (
+    "population_1km", "median_income", "competitors_count",
+    "nearest_metro_distance_m", "walkability_poi_count"
+)
+
+
+# Why-bullet tiers: sorted thresholds plus one bound str.format per tier,
+# ordered lowest tier first so bisect picks the template directly
+_POP_THRESHOLDS = (10000, 20000)  # > threshold moves up a tier
+_POP_TEMPLATES = (
+    "Limited population: {:,} people in 1km radius".format,
+    "Moderate population: {:,} people in 1km radius".format,
+    "High population density: {:,} people in 1km radius".format,
+)
+_INCOME_THRESHOLDS = (35000, 50000)  # > threshold moves up a tier
+_INCOME_TEMPLATES = (
+    "Lower median income: €{:,}/year may limit spending".format,
+    "Median income: €{:,}/year matches target market".format,
+    "High median income: €{:,}/year supports premium pricing".format,
+)
+_COMP_THRESHOLDS = (5, 15)  # >= threshold moves up a tier
+_COMP_TEMPLATES = (
+    "Low competition: Only {} competitors nearby".format,
+    "Moderate competition: {} competitors in area".format,
+    "High competition: {} competitors may dilute market".format,
+)
+
+
+def _presence_mask(values: Mapping[str, Any], fields: Tuple[str, ...]) -> int:
+    """Bit i is set when fields[i] is present (not None) in values"""
+    mask = 0
+    for i, field in enumerate(fields):
+        if values.get(field) is not None:
+            mask |= 1 << i
+    return mask
+
+
+def _group_share(mask: int, offset: int, size: int) -> float:
+    """Share of a field group's bits set in mask"""
+    return ((mask >> offset) & ((1 << size) - 1)).bit_count() / size
+
+
+@dataclass(slots=True, frozen=True)
+class CoverageScores:
+    """
+    Internal coverage scores used inside the scoring pipeline
+    Cheaper than a Pydantic model; convert with to_schema() at the API boundary
+    """
+    demographics: float
+    competition: float
+    transit: float
+    overall: float
+
+    def to_schema(self) -> DataCoverage:
+        return DataCoverage.model_construct(
+            demographics=self.demographics,
+            competition=self.competition,
+            transit=self.transit,
+            overall=self.overall
+        )
+
+
 class TrustMetrics:
     """Calculate trust metrics for predictions"""
     
     @staticmethod
-    def calculate_coverage(features: Dict[str, Any]) -> DataCoverage:
+    def calculate_coverage(features: Dict[str, Any]) -> CoverageScores:
         """
         Calculate data coverage based on available features
         
@@ -21,25 +93,20 @@ class TrustMetrics:
         - 0.4-0.6 = Partial data
         - 0.0-0.3 = Limited data
         """
-        # Demographics coverage
-        demo_fields = ["population_1km", "population_density", "median_income"]
-        demo_present = sum(1 for f in demo_fields if features.get(f) is not None)
-        demographics = demo_present / len(demo_fields)
-        
-        # Competition coverage
-        comp_fields = ["competitors_count", "competitors_per_1k_residents"]
-        comp_present = sum(1 for f in comp_fields if features.get(f) is not None)
-        competition = comp_present / len(comp_fields)
-        
-        # Transit coverage
-        transit_fields = ["nearest_metro_distance_m", "nearest_tram_distance_m", "walkability_poi_count"]
-        transit_present = sum(1 for f in transit_fields if features.get(f) is not None)
-        transit = transit_present / len(transit_fields)
+        return TrustMetrics._coverage_from_mask(_presence_mask(features, _COVERAGE_FIELDS))
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _coverage_from_mask(mask: int) -> CoverageScores:
+        """Coverage depends only on which fields are present, so cache it per bitmask"""
+        demographics = _group_share(mask, 0, len(_DEMO_FIELDS))
+        competition = _group_share(mask, len(_DEMO_FIELDS), len(_COMP_FIELDS))
+        transit = _group_share(mask, len(_DEMO_FIELDS) + len(_COMP_FIELDS), len(_TRANSIT_FIELDS))
         
         # Overall coverage (weighted average)
         overall = (demographics * 0.4 + competition * 0.3 + transit * 0.3)
         
-        return DataCoverage(
+        return CoverageScores(
             demographics=round(demographics, 2),
             competition=round(competition, 2),
             transit=round(transit, 2),
@@ -49,7 +116,7 @@ class TrustMetrics:
     @staticmethod
     def calculate_confidence(
         score_components: Dict[str, float],
-        coverage: DataCoverage
+        coverage: CoverageScores
     ) -> float:
         """
         Calculate prediction confidence based on:
@@ -64,27 +131,22 @@ class TrustMetrics:
         
         # Component 2: Score consistency (30%)
         # If all component scores are similar, confidence is higher
-        scores = [
-            score_components.get("population", 50),
-            score_components.get("income", 50),
-            score_components.get("access", 50),
-            score_components.get("competition", 50)
-        ]
-        avg_score = sum(scores) / len(scores)
-        variance = sum((s - avg_score) ** 2 for s in scores) / len(scores)
-        std_dev = variance ** 0.5
+        a = score_components.get("population", 50)
+        b = score_components.get("income", 50)
+        c = score_components.get("access", 50)
+        d = score_components.get("competition", 50)
+        mean = (a + b + c + d) * 0.25
+        da, db, dc, dd = a - mean, b - mean, c - mean, d - mean
+        std_dev = ((da * da + db * db + dc * dc + dd * dd) * 0.25) ** 0.5
         
         # Lower std dev = higher consistency
-        consistency = max(0, 1 - (std_dev / 50))  # Normalize by max possible std dev
+        consistency = max(0.0, 1.0 - std_dev * 0.02)  # Normalize by max possible std dev (50)
         consistency_score = consistency * 0.3
         
         # Component 3: Feature completeness (30%)
-        required_features = [
-            "population_1km", "median_income", "competitors_count",
-            "nearest_metro_distance_m", "walkability_poi_count"
-        ]
-        features_present = sum(1 for f in required_features if score_components.get(f) is not None)
-        completeness = features_present / len(required_features)
+        completeness = _group_share(
+            _presence_mask(score_components, _REQUIRED_FEATURES), 0, len(_REQUIRED_FEATURES)
+        )
         completeness_score = completeness * 0.3
         
         # Total confidence
@@ -141,22 +203,12 @@ class TrustMetrics:
         # Population
         pop = features.get("population_1km")
         if pop:
-            if pop > 20000:
-                bullets.append(f"High population density: {pop:,} people in 1km radius")
-            elif pop > 10000:
-                bullets.append(f"Moderate population: {pop:,} people in 1km radius")
-            else:
-                bullets.append(f"Limited population: {pop:,} people in 1km radius")
+            bullets.append(_POP_TEMPLATES[bisect_left(_POP_THRESHOLDS, pop)](pop))
         
         # Income
         income = features.get("median_income")
         if income:
-            if income > 50000:
-                bullets.append(f"High median income: €{income:,}/year supports premium pricing")
-            elif income > 35000:
-                bullets.append(f"Median income: €{income:,}/year matches target market")
-            else:
-                bullets.append(f"Lower median income: €{income:,}/year may limit spending")
+            bullets.append(_INCOME_TEMPLATES[bisect_left(_INCOME_THRESHOLDS, income)](income))
         
         # Transit
         metro_dist = features.get("nearest_metro_distance_m")
@@ -169,12 +221,7 @@ class TrustMetrics:
         # Competition
         comp_count = features.get("competitors_count")
         if comp_count is not None:
-            if comp_count < 5:
-                bullets.append(f"Low competition: Only {comp_count} competitors nearby")
-            elif comp_count < 15:
-                bullets.append(f"Moderate competition: {comp_count} competitors in area")
-            else:
-                bullets.append(f"High competition: {comp_count} competitors may dilute market")
+            bullets.append(_COMP_TEMPLATES[bisect_right(_COMP_THRESHOLDS, comp_count)](comp_count))
         
         return bullets[:5]  # Max 5 bullets
 
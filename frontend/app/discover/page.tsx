@@ -3,6 +3,7 @@
 import { useEffect, useState, Suspense } from 'react';
 import { useSearchParams, useRouter } from 'next/navigation';
 import api from '@/lib/api';
+import type { HeatmapData } from '@/lib/types';
 import { grainTexture } from '@/lib/design-system';
 import { ArrowLeftIcon, MapPinIcon } from '@heroicons/react/24/outline';
 
@@ -21,7 +22,7 @@ interface AreaOpportunity {
 interface DiscoveryResult {
   city: string;
   concept: string;
-  heatmap_data: any[];
+  heatmap_data: HeatmapData;
   top_opportunities: AreaOpportunity[];
   total_areas_scored: number;
 }
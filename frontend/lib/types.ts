@@ -41,18 +41,19 @@ export interface AreaOpportunity {
   coverage: DataCoverage;
 }
 
-export interface HeatmapPoint {
-  latitude: number;
-  longitude: number;
-  score: number;
-  weight: number;
-  confidence?: number;
+// Parallel arrays: index i across all arrays describes one grid point
+export interface HeatmapData {
+  latitudes: number[];
+  longitudes: number[];
+  scores: number[];
+  weights: number[];
+  confidences: number[];
 }
 
 export interface DiscoveryResponse {
   city: string;
   concept: string;
-  heatmap_data: HeatmapPoint[];
+  heatmap_data: HeatmapData;
   top_opportunities: AreaOpportunity[];
   total_areas_scored: number;
   method: MethodInfo;